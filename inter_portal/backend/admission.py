@@ -0,0 +1,221 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+# Admission control in front of the database, checked before a request is
+# given a pooled connection (main.get_db):
+#   rate limits   token buckets per user and route, and optionally one per
+#                 route shared by all users. A user over their limit gets 429;
+#                 a route over its total gets 503.
+#   concurrency   at most `concurrency` requests hold a connection at once. The
+#                 rest wait in a bounded FIFO queue for up to queue_timeout
+#                 seconds and get 503 when it is full or the wait runs out.
+#                 A queued request costs a coroutine rather than a threadpool
+#                 thread blocked in ConnectionPool.acquire, and a shed one
+#                 never reaches SQL Server.
+# Rejections carry Retry-After. Everything runs on the event loop thread, so
+# the state is plain dicts and ints with no locks (as in metrics.py).
+
+USER_RATE = "user_rate"
+ROUTE_RATE = "route_rate"
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+
+
+class Overloaded(Exception):
+    def __init__(self, status_code, detail, retry_after):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RateLimit:
+    __slots__ = ("rate", "burst")
+
+    def __init__(self, count, seconds):
+        if count < 1 or seconds <= 0:
+            raise ValueError(f"Invalid rate limit {count}/{seconds}")
+        self.rate = count / seconds
+        self.burst = count
+
+
+def parse_limit(spec):
+    # "N/S" is N requests per S seconds in bursts of up to N ("N" alone is
+    # per second); None for "" or "0", meaning no limit
+    spec = (spec or "").strip()
+    if spec in ("", "0"):
+        return None
+    count, _, seconds = spec.partition("/")
+    return RateLimit(float(count), float(seconds or 1))
+
+
+class TokenBuckets:
+    # One limit's buckets by key. Past max_keys the least recently used are
+    # dropped; that only refills them, so at worst a user gets an extra burst.
+    def __init__(self, limit, max_keys=100_000):
+        self.limit = limit
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+
+    def take(self, key, now):
+        # 0 when a token was taken, else the seconds until one will be
+        limit = self.limit
+        tokens, updated_at = self._buckets.pop(key, (limit.burst, now))
+        tokens = min(limit.burst, tokens + (now - updated_at) * limit.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / limit.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class ConcurrencyLimiter:
+    # FIFO: a released slot is handed straight to the oldest waiter, so a
+    # burst of new arrivals cannot overtake requests already queued
+    def __init__(self, limit, max_queue, queue_timeout):
+        if limit < 1 or max_queue < 0:
+            raise ValueError("Invalid concurrency limit configuration")
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters = deque()
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    async def acquire(self):
+        # Seconds spent queued, None when there was no wait; raises Overloaded
+        # with the reason as detail
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return None
+        if len(self._waiters) >= self.max_queue:
+            raise Overloaded(503, QUEUE_FULL, self.retry_after())
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        started = loop.time()
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if not waiter.done():
+            self._abandon(waiter)
+            raise Overloaded(503, QUEUE_TIMEOUT, self.retry_after())
+        return loop.time() - started
+
+    def _abandon(self, waiter):
+        if waiter.done() and not waiter.cancelled():
+            # The slot was handed over as we gave up: pass it on
+            self.release()
+            return
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def retry_after(self):
+        return max(1, math.ceil(self.queue_timeout))
+
+
+class AdmissionControl:
+    # limits: {(method, route template): (per user, route total)} as
+    # parse_limit specs; default applies to routes not listed. user keys come
+    # from the caller (main.rate_limit_key).
+    def __init__(self, limits=None, default=("0", "0"), concurrency=10, max_queue=100,
+                 queue_timeout=2.0, rate_limits_enabled=True, max_keys=100_000, clock=time.monotonic):
+        self.limits = {route: tuple(parse_limit(spec) for spec in specs) for route, specs in (limits or {}).items()}
+        self.default = tuple(parse_limit(spec) for spec in default)
+        self.rate_limits_enabled = rate_limits_enabled
+        self.max_keys = max_keys
+        self.clock = clock
+        self.gate = ConcurrencyLimiter(concurrency, max_queue, queue_timeout)
+        self._buckets = {}  # (method, route) -> (per user TokenBuckets or None, total TokenBuckets or None)
+
+        # Counters exposed through stats() and /metrics
+        self.shed = {}  # (method, route, reason) -> count
+        self.queued = {}  # (method, route) -> count
+        self.queue_wait_total = 0.0
+
+    def _route_buckets(self, key):
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            limits = self.limits.get(key, self.default)
+            buckets = self._buckets[key] = tuple(
+                TokenBuckets(limit, self.max_keys) if limit is not None else None for limit in limits
+            )
+        return buckets
+
+    def _shed(self, key, reason):
+        shed_key = key + (reason,)
+        self.shed[shed_key] = self.shed.get(shed_key, 0) + 1
+
+    def check_rate(self, method, route, user):
+        if not self.rate_limits_enabled:
+            return
+        key = (method, route)
+        per_user, total = self._route_buckets(key)
+        now = self.clock()
+        if per_user is not None:
+            wait = per_user.take(user, now)
+            if wait:
+                self._shed(key, USER_RATE)
+                raise Overloaded(429, "Too many requests, please retry later", max(1, math.ceil(wait)))
+        if total is not None:
+            wait = total.take("*", now)
+            if wait:
+                self._shed(key, ROUTE_RATE)
+                raise Overloaded(503, "Service is busy, please retry", max(1, math.ceil(wait)))
+
+    @asynccontextmanager
+    async def admit(self, method, route, user, rate_limited=True):
+        # async with admission.admit(...): hold a connection. rate_limited=False
+        # for a request's second connection, already counted by its first.
+        if rate_limited:
+            self.check_rate(method, route, user)
+        try:
+            waited = await self.gate.acquire()
+        except Overloaded as e:
+            self._shed((method, route), str(e))
+            raise Overloaded(503, "Service is busy, please retry", e.retry_after)
+        if waited is not None:
+            key = (method, route)
+            self.queued[key] = self.queued.get(key, 0) + 1
+            self.queue_wait_total += waited
+        try:
+            yield
+        finally:
+            self.gate.release()
+
+    def stats(self):
+        return {
+            "in_flight": self.gate.active,
+            "queued": self.gate.queued,
+            "concurrency": self.gate.limit,
+            "max_queue": self.gate.max_queue,
+            "queued_total": sum(self.queued.values()),
+            "queue_wait_seconds": round(self.queue_wait_total, 3),
+            "shed_total": sum(self.shed.values()),
+            "rate_limit_buckets": sum(len(b) for buckets in self._buckets.values() for b in buckets if b is not None),
+        }
@@ -0,0 +1,68 @@
+from progress import refresh_progress
+
+# Set-based task assignment. bulk_assign runs on the DB executor through
+# AsyncConnection.run and leaves committing to the caller, so it can share a
+# transaction with whatever created the task.
+
+ASSIGNED = "assigned"
+ALREADY_ASSIGNED = "already_assigned"
+NOT_AN_INTERNEE = "not_an_internee"
+
+
+def bulk_assign(cursor, task_id, internee_ids=None, approved_applicants=False):
+    # Assigns task_id to every id in internee_ids, or to every approved
+    # applicant of the task's internship, skipping existing assignments.
+    # Returns [(internee_id, result)] ordered by internee id. Both sources are
+    # merged before filling #BulkAssign, which is keyed by internee.
+    ids = set(internee_ids or ())
+    if approved_applicants:
+        cursor.execute('''
+            SELECT DISTINCT a.InterneeId
+            FROM InternshipApplications a JOIN Tasks t ON t.InternshipId = a.InternshipId
+            WHERE t.TaskId = ? AND a.Status = 'approved'
+        ''', (task_id,))
+        ids.update(row[0] for row in cursor.fetchall())
+    if not ids:
+        return []
+
+    cursor.execute("IF OBJECT_ID('tempdb..#BulkAssign') IS NOT NULL DROP TABLE #BulkAssign")
+    cursor.execute("CREATE TABLE #BulkAssign (InterneeId INT PRIMARY KEY)")
+    try:
+        if hasattr(cursor, "fast_executemany"):
+            cursor.fast_executemany = True
+        cursor.executemany("INSERT INTO #BulkAssign (InterneeId) VALUES (?)", [(i,) for i in sorted(ids)])
+
+        # HOLDLOCK on the existence check keeps concurrent calls from both
+        # inserting the same pair.
+        cursor.execute('''
+            INSERT INTO TaskAssignments (TaskId, InterneeId, Status)
+            OUTPUT inserted.InterneeId
+            SELECT ?, b.InterneeId, 'pending'
+            FROM #BulkAssign b
+            JOIN Users u ON u.UserId = b.InterneeId AND u.Role = 'internee'
+            WHERE NOT EXISTS (
+                SELECT 1 FROM TaskAssignments ta WITH (UPDLOCK, HOLDLOCK)
+                WHERE ta.TaskId = ? AND ta.InterneeId = b.InterneeId
+            )
+        ''', (task_id, task_id))
+        assigned = {row[0] for row in cursor.fetchall()}
+        refresh_progress(cursor, assigned)
+
+        cursor.execute('''
+            SELECT b.InterneeId, CASE WHEN u.UserId IS NULL THEN 0 ELSE 1 END
+            FROM #BulkAssign b
+            LEFT JOIN Users u ON u.UserId = b.InterneeId AND u.Role = 'internee'
+            ORDER BY b.InterneeId
+        ''')
+        results = []
+        for internee_id, is_internee in cursor.fetchall():
+            if internee_id in assigned:
+                results.append((internee_id, ASSIGNED))
+            elif is_internee:
+                results.append((internee_id, ALREADY_ASSIGNED))
+            else:
+                results.append((internee_id, NOT_AN_INTERNEE))
+        return results
+    finally:
+        # Guarded so a failure that already lost the table is not masked
+        cursor.execute("IF OBJECT_ID('tempdb..#BulkAssign') IS NOT NULL DROP TABLE #BulkAssign")
@@ -0,0 +1,166 @@
+# Intake-spike benchmark for admission control (admission.py).
+#
+# A burst of apply requests arrives within --ramp seconds, each taking a
+# pooled connection and running a statement that keeps the "server" busy for
+# --work-ms. The server is a SQLite function that holds one of --server-cores
+# slots while it works, so throughput is capped the way a 4-core SQL Server
+# Express caps it. The burst is run twice through db.Database:
+#   pool only   every request goes straight to ConnectionPool.acquire and
+#               waits there (a blocked threadpool thread each) until the
+#               checkout timeout turns it into a 503
+#   admission   requests pass AdmissionControl first: per-user token buckets,
+#               then a bounded FIFO queue in front of the pool
+# While the burst runs, a probe calls a no-op function through the threadpool
+# every 50 ms, as a sync endpoint (e.g. /health/ready) would, to show what
+# blocked checkouts do to the rest of the app.
+#
+#   python benchmarks/bench_admission.py [--requests 600] [--users 300] [--ramp 1] [--pool-size 10]
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.concurrency import run_in_threadpool
+
+from admission import AdmissionControl, Overloaded
+from db import Database
+from db_pool import ConnectionPool, PoolTimeout
+
+ROUTE = ("POST", "/internships/{internship_id}/apply")
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def make_connect(path, cores):
+    def work(ms):
+        with cores:
+            time.sleep(ms / 1000)
+        return 1
+
+    def connect():
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.create_function("server_work", 1, work)
+        return conn
+    return connect
+
+
+async def probe(stop, latencies):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await run_in_threadpool(lambda: None)
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.05)
+
+
+async def run_burst(path, args, admission):
+    pool = ConnectionPool(make_connect(path, threading.Semaphore(args.server_cores)),
+                          min_size=args.pool_size, max_size=args.pool_size,
+                          checkout_timeout=args.checkout_timeout)
+    database = Database(pool)
+    rng = random.Random(args.seed)
+    users = [f"user{rng.randrange(args.users)}" for _ in range(args.requests)]
+    outcomes = {}
+    ok_latency = []
+    rejected_latency = []
+
+    async def apply(user):
+        await asyncio.sleep(rng.uniform(0, args.ramp))
+        started = time.perf_counter()
+        try:
+            if admission is None:
+                await handle()
+            else:
+                async with admission.admit(*ROUTE, user):
+                    await handle()
+            outcome = "200"
+        except Overloaded as e:
+            outcome = f"{e.status_code} {'rate limited' if e.status_code == 429 else 'shed'}"
+        except PoolTimeout:
+            outcome = "503 pool timeout"
+        elapsed = time.perf_counter() - started
+        (ok_latency if outcome == "200" else rejected_latency).append(elapsed)
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    async def handle():
+        conn = await database.acquire()
+        try:
+            await conn.fetchone("SELECT server_work(?)", (args.work_ms,))
+        finally:
+            await database.release(conn)
+
+    stop = asyncio.Event()
+    probe_latency = []
+    probe_task = asyncio.create_task(probe(stop, probe_latency))
+    started = time.perf_counter()
+    await asyncio.gather(*(apply(user) for user in users))
+    wall = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    database.close()
+    return {
+        "outcomes": outcomes, "ok": ok_latency, "rejected": rejected_latency,
+        "probe": probe_latency, "wall": wall, "pool": pool.stats(),
+    }
+
+
+def report(name, result):
+    ok, rejected, probe_latency = result["ok"], result["rejected"], result["probe"]
+    print(f"{name}  ({result['wall']:.1f}s wall, {result['pool']['timeouts']} pool checkout timeouts)")
+    for outcome, count in sorted(result["outcomes"].items()):
+        print(f"  {outcome:<18} {count:>5}")
+    print(f"  accepted latency   p50 {percentile(ok, 50) * 1000:7.0f} ms  p99 {percentile(ok, 99) * 1000:7.0f} ms")
+    if rejected:
+        print(f"  time to reject     p50 {percentile(rejected, 50) * 1000:7.0f} ms  "
+              f"p99 {percentile(rejected, 99) * 1000:7.0f} ms")
+    print(f"  threadpool probe   p50 {percentile(probe_latency, 50) * 1000:7.1f} ms  "
+          f"max {max(probe_latency) * 1000:7.1f} ms")
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        sqlite3.connect(path).close()
+        print(f"{args.requests} applies from {args.users} users within {args.ramp:g}s; "
+              f"pool {args.pool_size}, {args.server_cores} server cores, {args.work_ms} ms of server work each "
+              f"(capacity ~{args.server_cores * 1000 / args.work_ms:.0f}/s)")
+        print()
+        report("pool only", await run_burst(path, args, None))
+        print()
+        admission = AdmissionControl(
+            limits={ROUTE: (args.user_limit, "0")},
+            concurrency=args.pool_size,
+            max_queue=args.max_queue,
+            queue_timeout=args.queue_timeout,
+        )
+        report("admission", await run_burst(path, args, admission))
+        stats = admission.stats()
+        print(f"  queued {stats['queued_total']}, mean wait "
+              f"{stats['queue_wait_seconds'] / max(1, stats['queued_total']) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--ramp", type=float, default=1.0)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--server-cores", type=int, default=4)
+    parser.add_argument("--work-ms", type=float, default=20.0)
+    parser.add_argument("--checkout-timeout", type=float, default=5.0)
+    parser.add_argument("--user-limit", default="5/60")
+    parser.add_argument("--max-queue", type=int, default=100)
+    parser.add_argument("--queue-timeout", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,593 @@
+# End-to-end API benchmark: runs main.py in process against a generated
+# SQLite database (datagen.py, translated by standin.py), with Firebase ID
+# tokens signed by a throwaway local key, and drives every endpoint through
+# httpx's ASGI transport. Reports requests/s and p50/p95/p99 latency per
+# route and compares them with the saved baseline.
+#
+# Not covered: /events (see bench_events.py) and /token (always 405).
+# Requests go through the whole ASGI stack but no sockets, and SQLite is not
+# SQL Server: compare runs with each other, not with production.
+#
+#   python benchmarks/bench_api.py [--requests 200] [--concurrency 10] [--only search] [--save-baseline]
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import httpx
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+import datagen
+import standin
+
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+PROJECT_ID = "bench-project"
+KEY_ID = "bench-key"
+PDF = b"%PDF-1.4\n" + b"0" * 2048 + b"\n%%EOF\n"
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+# --- Firebase stand-in -------------------------------------------------------
+
+class FirebaseKeys:
+    # One RSA key serves as both the service account's private key (so
+    # firebase_admin.initialize_app accepts the credential file) and the ID
+    # token signing key that FirebaseTokenVerifier checks against.
+    def __init__(self):
+        self.key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "bench")])
+        now = datetime.now(timezone.utc)
+        cert = (x509.CertificateBuilder()
+                .subject_name(name).issuer_name(name).public_key(self.key.public_key())
+                .serial_number(x509.random_serial_number())
+                .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=1))
+                .sign(self.key, hashes.SHA256()))
+        self.cert_pem = cert.public_bytes(serialization.Encoding.PEM).decode("ascii")
+
+    def write_credentials(self, path):
+        pem = self.key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                     serialization.NoEncryption()).decode("ascii")
+        with open(path, "w") as f:
+            json.dump({
+                "type": "service_account",
+                "project_id": PROJECT_ID,
+                "private_key_id": KEY_ID,
+                "private_key": pem,
+                "client_email": f"bench@{PROJECT_ID}.iam.gserviceaccount.com",
+                "client_id": "0",
+                "token_uri": "https://oauth2.googleapis.com/token",
+            }, f)
+
+    def fetch_keys(self):
+        # Replaces fetch_google_keys: ({kid: pem_certificate}, max_age)
+        return {KEY_ID: self.cert_pem}, 3600
+
+    def id_token(self, uid):
+        now = int(time.time())
+        return jwt.encode({
+            "iss": f"https://securetoken.google.com/{PROJECT_ID}", "aud": PROJECT_ID,
+            "sub": uid, "iat": now, "exp": now + 3600, "auth_time": now,
+            "email": f"{uid}@example.com",
+        }, self.key, algorithm="RS256", headers={"kid": KEY_ID})
+
+
+# --- Scenarios ---------------------------------------------------------------
+
+SCENARIOS = []
+
+
+def scenario(name, share=1.0, expect=(200,)):
+    # `share` scales --requests for routes too heavy to run at full count
+    def register(fn):
+        SCENARIOS.append((name, fn, share, frozenset(expect)))
+        return fn
+    return register
+
+
+class Context:
+    def __init__(self, client, keys, rng, db_path, summary):
+        self.client = client
+        self.keys = keys
+        self.rng = rng
+        self.summary = summary
+        self.admins = []  # (user_id, headers)
+        self.internees = []
+        self.created_internships = []
+        self.created_tasks = []
+        self.submissions = {}  # (internee, task) -> (headers, logical path)
+        self.watermarks = {}  # user id -> last X-Sync-Watermark
+        self.registered = 0
+        conn = sqlite3.connect(db_path)
+        self.assigned = {}  # internee -> [task ids]
+        for task_id, internee_id in conn.execute("SELECT TaskId, InterneeId FROM TaskAssignments"):
+            self.assigned.setdefault(internee_id, []).append(task_id)
+        self.applications = [row[0] for row in conn.execute("SELECT ApplicationId FROM InternshipApplications")]
+        self.approved = {}  # task -> internees approved for its internship
+        for task_id, internee_id in conn.execute('''
+            SELECT t.TaskId, a.InterneeId FROM Tasks t
+            JOIN InternshipApplications a ON a.InternshipId = t.InternshipId AND a.Status = 'approved'
+        '''):
+            self.approved.setdefault(task_id, []).append(internee_id)
+        conn.close()
+
+    async def login(self, user_id):
+        response = await self.client.post(
+            "/firebase-login", json={"token": self.keys.id_token(datagen.firebase_uid(user_id))}
+        )
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def admin(self):
+        return self.rng.choice(self.admins)[1]
+
+    def internee(self):
+        return self.rng.choice(self.internees)
+
+    def internship(self):
+        return self.rng.randint(1, self.summary["internships"])
+
+    def task(self):
+        return self.rng.randint(1, self.summary["tasks"])
+
+    def words(self, n):
+        return datagen.phrase(self.rng, n)
+
+
+@scenario("POST /firebase-login")
+async def firebase_login(ctx):
+    user_id = ctx.rng.choice(ctx.summary["internees"])
+    return await ctx.client.post("/firebase-login", json={"token": ctx.keys.id_token(datagen.firebase_uid(user_id))})
+
+
+@scenario("POST /firebase-register")
+async def firebase_register(ctx):
+    ctx.registered += 1
+    uid = f"bench-new-{ctx.registered}"
+    return await ctx.client.post("/firebase-register", json={
+        "token": ctx.keys.id_token(uid), "username": uid, "role": "internee", "name": f"New {ctx.registered}",
+    })
+
+
+@scenario("GET /users/me")
+async def users_me(ctx):
+    return await ctx.client.get("/users/me", headers=ctx.internee()[1])
+
+
+@scenario("GET /internships/available")
+async def internships_available(ctx):
+    return await ctx.client.get("/internships/available", headers=ctx.internee()[1])
+
+
+@scenario("GET /tasks/assigned")
+async def tasks_assigned(ctx):
+    return await ctx.client.get("/tasks/assigned", params={"limit": 20}, headers=ctx.internee()[1])
+
+
+@scenario("GET /internships/all")
+async def internships_all(ctx):
+    return await ctx.client.get("/internships/all", params={"limit": 50}, headers=ctx.admin())
+
+
+@scenario("GET /users/internees")
+async def users_internees(ctx):
+    return await ctx.client.get("/users/internees", params={"limit": 50}, headers=ctx.admin())
+
+
+@scenario("GET /search")
+async def search(ctx):
+    user = ctx.internee()[1] if ctx.rng.random() < 0.5 else ctx.admin()
+    return await ctx.client.get("/search", params={"q": ctx.words(ctx.rng.randint(1, 2))}, headers=user)
+
+
+@scenario("POST /internships/")
+async def create_internship(ctx):
+    response = await ctx.client.post("/internships/", headers=ctx.admin(), json={
+        "title": ctx.words(3).title(), "description": ctx.words(40), "status": "available",
+    })
+    if response.status_code == 200:
+        ctx.created_internships.append(response.json()["internship_id"])
+    return response
+
+
+@scenario("PUT /internships/{internship_id}")
+async def update_internship(ctx):
+    return await ctx.client.put(f"/internships/{ctx.internship()}", headers=ctx.admin(), json={
+        "title": ctx.words(3).title(), "description": ctx.words(40), "status": "available",
+    })
+
+
+@scenario("POST /tasks/")
+async def create_task(ctx):
+    response = await ctx.client.post("/tasks/", headers=ctx.admin(), json={
+        "title": ctx.words(4).capitalize(), "description": ctx.words(25), "internship_id": ctx.internship(),
+        "due_date": (datetime(2025, 1, 1) + timedelta(days=ctx.rng.randrange(365))).isoformat(),
+    })
+    if response.status_code == 200:
+        ctx.created_tasks.append(response.json()["task_id"])
+    return response
+
+
+@scenario("PUT /tasks/{task_id}")
+async def update_task(ctx):
+    return await ctx.client.put(f"/tasks/{ctx.task()}", headers=ctx.admin(), json={
+        "title": ctx.words(4).capitalize(), "description": ctx.words(25), "internship_id": ctx.internship(),
+        "due_date": None,
+    })
+
+
+@scenario("GET /tasks/admin")
+async def tasks_admin(ctx):
+    return await ctx.client.get("/tasks/admin", params={"limit": 50}, headers=ctx.admin())
+
+
+@scenario("POST /tasks/{task_id}/assign")
+async def assign_task(ctx):
+    return await ctx.client.post(f"/tasks/{ctx.task()}/assign", headers=ctx.admin(),
+                                 params={"internee_id": ctx.rng.choice(ctx.summary["internees"])})
+
+
+@scenario("POST /tasks/{task_id}/assign/bulk", share=0.25)
+async def bulk_assign(ctx):
+    return await ctx.client.post(f"/tasks/{ctx.task()}/assign/bulk", headers=ctx.admin(), json={
+        "internee_ids": ctx.rng.sample(ctx.summary["internees"], 50),
+    })
+
+
+@scenario("POST /tasks/{task_id}/assign/bulk approved", share=0.25)
+async def bulk_assign_approved(ctx):
+    # Explicit ids overlapping the approved applicants, who are added too
+    task_id = ctx.rng.choice(list(ctx.approved))
+    approved = ctx.approved[task_id]
+    return await ctx.client.post(f"/tasks/{task_id}/assign/bulk", headers=ctx.admin(), json={
+        "internee_ids": ctx.rng.sample(approved, min(10, len(approved))) + ctx.rng.sample(ctx.summary["internees"], 10),
+        "approved_applicants": True,
+    })
+
+
+@scenario("POST /tasks/{task_id}/submit")
+async def submit_task(ctx):
+    user_id, headers = ctx.internee()
+    task_id = ctx.rng.choice(ctx.assigned.get(user_id) or [ctx.task()])
+    name = f"report{ctx.rng.randrange(1000)}.txt"
+    response = await ctx.client.post(f"/tasks/{task_id}/submit", headers=headers,
+                                     files={"file": (name, ctx.words(200).encode(), "text/plain")})
+    if response.status_code == 200:
+        # A resubmission replaces the earlier file
+        ctx.submissions[user_id, task_id] = (headers, f"uploads/{user_id}/tasks/{task_id}/{name}")
+    return response
+
+
+@scenario("GET /files/{file_path:path}")
+async def download_file(ctx):
+    headers, path = ctx.rng.choice(list(ctx.submissions.values()))
+    return await ctx.client.get(f"/files/{path}", headers=headers)
+
+
+@scenario("POST /files/urls")
+async def file_urls(ctx):
+    # A client refreshing the URLs of the files in its synced rows
+    headers, path = ctx.rng.choice(list(ctx.submissions.values()))
+    return await ctx.client.post("/files/urls", headers=headers, json={"paths": [path]})
+
+
+@scenario("GET /uploads/{file_path:path}")
+async def serve_upload(ctx):
+    _, path = ctx.rng.choice(list(ctx.submissions.values()))
+    return await ctx.client.get(f"/{path}")
+
+
+@scenario("POST /internships/{internship_id}/apply", expect=(200, 400))
+async def apply(ctx):
+    # 400 is the "already applied" answer, still a full round-trip
+    return await ctx.client.post(f"/internships/{ctx.internship()}/apply", headers=ctx.internee()[1])
+
+
+@scenario("POST /internships/{internship_id}/apply_with_details")
+async def apply_with_details(ctx):
+    return await ctx.client.post(
+        f"/internships/{ctx.internship()}/apply_with_details", headers=ctx.internee()[1],
+        data={"name": "Bench User", "university_name": "Bench University", "degree": "BSCS", "semester": "5"},
+        files={"resume": ("resume.pdf", PDF, "application/pdf")},
+    )
+
+
+@scenario("GET /applications")
+async def applications(ctx):
+    params = {"limit": 50}
+    if ctx.rng.random() < 0.5:
+        params["internship_id"] = ctx.internship()
+    return await ctx.client.get("/applications", params=params, headers=ctx.admin())
+
+
+@scenario("GET /applications/export", share=0.25)
+async def export_applications(ctx):
+    return await ctx.client.get("/applications/export", params={"format": ctx.rng.choice(("ndjson", "csv"))},
+                                headers=ctx.admin())
+
+
+@scenario("PUT /applications/{application_id}/status")
+async def application_status(ctx):
+    return await ctx.client.put(f"/applications/{ctx.rng.choice(ctx.applications)}/status", headers=ctx.admin(),
+                                json={"status": ctx.rng.choice(("approved", "rejected", "pending"))})
+
+
+@scenario("POST /applications/status/batch", share=0.25)
+async def application_status_batch(ctx):
+    return await ctx.client.post("/applications/status/batch", headers=ctx.admin(), json={"updates": [
+        {"application_id": application_id, "status": ctx.rng.choice(("approved", "rejected"))}
+        for application_id in ctx.rng.sample(ctx.applications, 100)
+    ]})
+
+
+@scenario("GET /internees/progress", share=0.25)
+async def internees_progress(ctx):
+    return await ctx.client.get("/internees/progress", headers=ctx.admin())
+
+
+@scenario("GET /internees/progress/export", share=0.25)
+async def export_progress(ctx):
+    return await ctx.client.get("/internees/progress/export", params={"format": "csv"}, headers=ctx.admin())
+
+
+@scenario("POST /admin/progress/rebuild", share=0.05)
+async def rebuild_progress(ctx):
+    return await ctx.client.post("/admin/progress/rebuild", params={"dry_run": "true"}, headers=ctx.admin())
+
+
+@scenario("POST /admin/storage/gc", share=0.05)
+async def storage_gc(ctx):
+    return await ctx.client.post("/admin/storage/gc", headers=ctx.admin())
+
+
+@scenario("POST /admin/storage/previews", share=0.05)
+async def backfill_previews(ctx):
+    return await ctx.client.post("/admin/storage/previews", params={"limit": 1000}, headers=ctx.admin())
+
+
+@scenario("GET /admin/jobs", share=0.25)
+async def job_status(ctx):
+    return await ctx.client.get("/admin/jobs", headers=ctx.admin())
+
+
+@scenario("DELETE /tasks/{task_id}")
+async def delete_task(ctx):
+    return await ctx.client.delete(f"/tasks/{ctx.created_tasks.pop()}", headers=ctx.admin())
+
+
+@scenario("DELETE /internships/{internship_id}")
+async def delete_internship(ctx):
+    return await ctx.client.delete(f"/internships/{ctx.created_internships.pop()}", headers=ctx.admin())
+
+
+@scenario("GET /sync", expect=(200, 204))
+async def delta_sync(ctx):
+    # Mostly deltas since the user's previous sync, after the writes above;
+    # a full snapshot for users seen for the first time and one in five
+    user_id, headers = ctx.rng.choice(ctx.internees + ctx.admins)
+    params = {}
+    if user_id in ctx.watermarks and ctx.rng.random() >= 0.2:
+        params["since"] = ctx.watermarks[user_id]
+    response = await ctx.client.get("/sync", params=params, headers=headers)
+    if "X-Sync-Watermark" in response.headers:
+        ctx.watermarks[user_id] = response.headers["X-Sync-Watermark"]
+    return response
+
+
+@scenario("GET /health/ready")
+async def readiness(ctx):
+    return await ctx.client.get("/health/ready")
+
+
+@scenario("GET /metrics")
+async def metrics(ctx):
+    return await ctx.client.get("/metrics")
+
+
+# --- Runner ------------------------------------------------------------------
+
+async def run_scenario(ctx, fn, count, concurrency, expect, warmup):
+    # Warm-up requests run first, one at a time, and are not recorded
+    for _ in range(warmup):
+        with contextlib.suppress(Exception):
+            await fn(ctx)
+
+    latencies, errors = [], []
+    jobs = iter(range(count))
+
+    async def worker():
+        for _ in jobs:
+            start = time.perf_counter()
+            try:
+                response = await fn(ctx)
+                error = None if response.status_code in expect else f"HTTP {response.status_code}: {response.text[:200]}"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            latencies.append((time.perf_counter() - start) * 1000)
+            if error:
+                errors.append(error)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "rps": round(len(latencies) / wall, 1),
+        "p50": round(percentile(latencies, 50), 3),
+        "p95": round(percentile(latencies, 95), 3),
+        "p99": round(percentile(latencies, 99), 3),
+    }
+
+
+def machine_info():
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    # Per route: the relative change in p95 and throughput against the
+    # baseline, and whether either moved the wrong way by more than threshold
+    changes = {}
+    for name, result in results.items():
+        base = baseline.get("routes", {}).get(name)
+        if not base or not base["p95"] or not base["rps"]:
+            continue
+        p95 = result["p95"] / base["p95"] - 1
+        rps = result["rps"] / base["rps"] - 1
+        changes[name] = (p95, rps, p95 > threshold or rps < -threshold)
+    return changes
+
+
+def report(results, changes):
+    print(f"{'route':<52} {'reqs':>5} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  vs baseline")
+    for name, r in results.items():
+        line = (f"{name:<52} {r['requests']:>5} {r['errors']:>4} {r['rps']:>8.1f} "
+                f"{r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f}")
+        if name in changes:
+            p95, rps, regressed = changes[name]
+            line += f"  p95 {p95:+.0%} req/s {rps:+.0%}" + ("  REGRESSION" if regressed else "")
+        print(line)
+    for name, r in results.items():
+        if r["first_error"]:
+            print(f"{name}: first error: {r['first_error']}")
+
+
+async def start_app(tmp, args):
+    db_path = os.path.join(tmp, "bench.db")
+    start = time.perf_counter()
+    summary = datagen.generate_from_args(db_path, args)
+    print(f"data: {len(summary['internees'])} internees, {summary['internships']} internships, "
+          f"{summary['tasks']} tasks, {summary['applications']} applications, "
+          f"{summary['assignments']} assignments ({time.perf_counter() - start:.1f}s)")
+
+    keys = FirebaseKeys()
+    credentials_path = os.path.join(tmp, "service-account.json")
+    keys.write_credentials(credentials_path)
+    os.environ.update({
+        "FIREBASE_CREDENTIALS": credentials_path,
+        "FIREBASE_PROJECT_ID": PROJECT_ID,
+        "RUN_MIGRATIONS": "0",  # datagen created the schema
+        "SEARCH_REFRESH_SECONDS": "0",
+        "DB_POOL_MAX_SIZE": str(args.pool_size),
+        # Measures the handlers, not admission control: a few users make
+        # every request, and --concurrency can exceed the admission queue
+        "RATE_LIMITS_ENABLED": "0",
+        "ADMISSION_MAX_QUEUE": str(args.concurrency),
+        "PUBLIC_UPLOADS": "1",  # so the legacy /uploads route is measured too
+    })
+    os.chdir(tmp)  # uploads/ is created relative to the working directory
+
+    import main
+    # Benchmark-only patches: the pool opens stand-in connections and the
+    # verifier trusts the local signing key instead of Google's
+    main.db_pool._connect = lambda: standin.connect(db_path)
+    main.firebase_verifier.fetch_keys = keys.fetch_keys
+    await main.startup_event()
+    await main.warmup_task  # startup only schedules the warm-up
+    return main, keys, db_path, summary
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        main, keys, db_path, summary = await start_app(tmp, args)
+        rng = random.Random(args.seed)
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            ctx = Context(client, keys, rng, db_path, summary)
+            for user_id in rng.sample(summary["admins"], min(5, len(summary["admins"]))):
+                ctx.admins.append((user_id, await ctx.login(user_id)))
+            with_tasks = [user_id for user_id in summary["internees"] if user_id in ctx.assigned]
+            for user_id in rng.sample(with_tasks, min(args.users, len(with_tasks))):
+                ctx.internees.append((user_id, await ctx.login(user_id)))
+
+            results = {}
+            # The app prints per request; keep it out of the report unless asked
+            quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+            with quiet:
+                for name, fn, share, expect in SCENARIOS:
+                    if args.only and not any(part in name for part in args.only):
+                        continue
+                    count = max(1, int(args.requests * share))
+                    results[name] = await run_scenario(ctx, fn, count, args.concurrency, expect,
+                                                       min(args.warmup, count))
+        await main.shutdown_event()
+    return summary, results
+
+
+def main(args):
+    summary, results = asyncio.run(run(args))
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != machine_info() or baseline.get("settings") != settings(args):
+            print(f"note: {args.baseline} was recorded with different settings or on another machine")
+    changes = compare(results, baseline, args.threshold) if baseline else {}
+    report(results, changes)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "machine": machine_info(),
+                "settings": settings(args),
+                "routes": {name: {k: r[k] for k in ("rps", "p50", "p95", "p99")} for name, r in results.items()},
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline saved to {args.baseline}")
+
+    failed = any(r["errors"] for r in results.values())
+    regressed = [name for name, (_, _, bad) in changes.items() if bad]
+    if regressed:
+        print(f"{len(regressed)} route(s) regressed by more than {args.threshold:.0%}")
+    return 1 if failed or (regressed and args.fail_on_regression) else 0
+
+
+def settings(args):
+    # What a baseline is only comparable under
+    names = ("internees", "admins", "internships", "tasks_per_internship", "applications_per_internee",
+             "approval_rate", "seed", "requests", "concurrency", "users", "pool_size")
+    return {name: getattr(args, name) for name in names}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    datagen.add_arguments(parser)
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--users", type=int, default=50, help="signed-in internees to spread requests over")
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--only", nargs="+",
+                        help="run routes whose name contains any of these (deletes and downloads need "
+                             "the create and submit routes too)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="show the app's own output")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+# Event-loop latency benchmark for the async data-access layer.
+#
+# Runs a stream of cheap queries while slow queries are in flight, once with
+# blocking calls made directly from coroutines (the old handler style) and
+# once through db.Database. SQLite stands in for SQL Server; `slow_query`
+# sleeps inside the driver just like a long-running statement would.
+#
+#   python benchmarks/bench_async_db.py [--slow 4] [--slow-ms 500] [--cheap 400]
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_pool import ConnectionPool
+from db import Database
+
+
+def make_connect(path):
+    def connect():
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.create_function("slow_query", 1, lambda ms: time.sleep(ms / 1000) or 1)
+        return conn
+    return connect
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def run_blocking(pool, args):
+    # Old style: blocking driver calls directly inside async handlers
+    async def slow():
+        with pool.connection() as conn:
+            conn.execute("SELECT slow_query(?)", (args.slow_ms,)).fetchone()
+
+    async def cheap():
+        with pool.connection() as conn:
+            conn.execute("SELECT 1").fetchone()
+
+    return await drive(slow, cheap, args)
+
+
+async def run_async(database, args):
+    async def slow():
+        conn = await database.acquire()
+        try:
+            await conn.fetchone("SELECT slow_query(?)", (args.slow_ms,))
+        finally:
+            await database.release(conn)
+
+    async def cheap():
+        conn = await database.acquire()
+        try:
+            await conn.fetchone("SELECT 1")
+        finally:
+            await database.release(conn)
+
+    return await drive(slow, cheap, args)
+
+
+async def drive(slow, cheap, args):
+    latencies = []
+
+    async def slow_loop():
+        for _ in range(args.rounds):
+            await slow()
+
+    async def cheap_loop():
+        # Open loop: latency is measured from when the request was due, so
+        # time spent waiting for a blocked event loop is counted too.
+        start = time.perf_counter()
+        for i in range(args.cheap):
+            due = start + i * args.interval_ms / 1000
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            await cheap()
+            latencies.append(time.perf_counter() - due)
+
+    await asyncio.gather(cheap_loop(), *[slow_loop() for _ in range(args.slow)])
+    return latencies
+
+
+def report(name, latencies):
+    ms = [v * 1000 for v in latencies]
+    print(
+        f"{name:<10} n={len(ms):<5} p50={percentile(ms, 50):8.2f}ms "
+        f"p95={percentile(ms, 95):8.2f}ms p99={percentile(ms, 99):8.2f}ms max={max(ms):8.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slow", type=int, default=4, help="concurrent slow query streams")
+    parser.add_argument("--slow-ms", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=4, help="slow queries per stream")
+    parser.add_argument("--cheap", type=int, default=400, help="cheap queries to time")
+    parser.add_argument("--interval-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        size = args.slow + 2
+
+        pool = ConnectionPool(make_connect(path), min_size=size, max_size=size)
+        pool.warm()
+        report("blocking", asyncio.run(run_blocking(pool, args)))
+        pool.close()
+
+        pool = ConnectionPool(make_connect(path), min_size=size, max_size=size)
+        pool.warm()
+        database = Database(pool, query_timeout=60)
+        report("async", asyncio.run(run_async(database, args)))
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# SSE fan-out load test: holds N event streams open against events.EventHub
+# and measures delivery latency for events published to random users.
+#
+# Each connection is a direct ASGI call into a FastAPI app whose /events
+# route is the same StreamingResponse(event_hub.stream(...)) as main.py (minus
+# auth), so the hub, the response and disconnect handling are all exercised
+# without sockets. Reports connections held, memory per idle connection and
+# publish-to-receive latency percentiles.
+#
+#   python benchmarks/bench_events.py [--connections 5000] [--events 2000] [--rate 500]
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from events import EventHub
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def make_app(hub):
+    app = FastAPI()
+
+    @app.get("/events")
+    async def events(user: int):
+        return StreamingResponse(hub.stream([f"user:{user}"]), media_type="text/event-stream")
+
+    return app
+
+
+async def connect(app, user, latencies, ready, closed):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/events", "raw_path": b"/events", "root_path": "",
+        "query_string": f"user={user}".encode(), "headers": [], "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 8000),
+    }
+
+    async def receive():
+        await closed.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] != "http.response.body":
+            return
+        body = message.get("body", b"")
+        if body.startswith(b"retry:"):
+            ready.release()
+        for block in body.split(b"\n\n"):
+            for line in block.split(b"\n"):
+                if line.startswith(b"data: {"):
+                    latencies.append(time.perf_counter() - json.loads(line[6:])["sent"])
+
+    await app(scope, receive, send)
+
+
+async def main(args):
+    hub = EventHub(heartbeat=args.heartbeat, max_connections=args.connections)
+    app = make_app(hub)
+    latencies = []
+    ready = asyncio.Semaphore(0)
+    closed = asyncio.Event()
+
+    base = rss_mb()
+    tasks = [asyncio.create_task(connect(app, u, latencies, ready, closed)) for u in range(args.connections)]
+    for _ in range(args.connections):
+        await ready.acquire()
+    held = hub.stats()["connections"]
+    per_conn_kb = (rss_mb() - base) * 1024 / max(held, 1)
+    print(f"connections held   {held}  (+{rss_mb() - base:.1f} MB RSS, {per_conn_kb:.1f} KB each)")
+
+    rng = random.Random(1)
+    interval = 1 / args.rate
+    start = time.perf_counter()
+    for i in range(args.events):
+        hub.publish([f"user:{rng.randrange(args.connections)}"], "task.assigned",
+                    {"task_id": i, "sent": time.perf_counter()})
+        await asyncio.sleep(max(0.0, start + (i + 1) * interval - time.perf_counter()))
+    while len(latencies) < args.events and time.perf_counter() - start < args.events / args.rate + 10:
+        await asyncio.sleep(0.01)
+
+    ms = [v * 1000 for v in latencies]
+    print(f"events delivered   {len(ms)}/{args.events} at {args.rate}/s")
+    print(f"latency ms         p50 {percentile(ms, 50):.2f}  p99 {percentile(ms, 99):.2f}  max {max(ms):.2f}")
+
+    closed.set()
+    await asyncio.gather(*tasks)
+    print(f"after disconnect   {hub.stats()['connections']} connections")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=500)
+    parser.add_argument("--heartbeat", type=float, default=15.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,126 @@
+# Export benchmark: streaming NDJSON/CSV vs. fetchall + one JSON document.
+#
+# Builds a SQLite stand-in with N synthetic applications (1M by default) and
+# runs each mode in a fresh subprocess so peak RSS is measured per mode.
+#
+#   python benchmarks/bench_export.py [--rows 1000000]
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_pool import ConnectionPool
+from db import Database
+from export import export_chunks
+
+COLUMNS = [
+    "application_id", "internship_id", "internee_id", "status", "applied_at",
+    "internship_title", "internee_name", "internee_email",
+    "name", "universityname", "resumepath", "degree", "semester",
+]
+QUERY = """
+    SELECT a.ApplicationId, a.InternshipId, a.InterneeId, a.Status, a.AppliedAt,
+           i.Title, u.Username, u.Email,
+           a.Name, a.UniversityName, a.ResumePath, a.Degree, a.Semester
+    FROM InternshipApplications a
+    JOIN Internships i ON a.InternshipId = i.InternshipId
+    JOIN Users u ON a.InterneeId = u.UserId
+    ORDER BY a.AppliedAt DESC, a.ApplicationId DESC
+"""
+
+
+def build(path, rows):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE Users (UserId INTEGER PRIMARY KEY, Username TEXT, Email TEXT);
+        CREATE TABLE Internships (InternshipId INTEGER PRIMARY KEY, Title TEXT);
+        CREATE TABLE InternshipApplications (
+            ApplicationId INTEGER PRIMARY KEY, InternshipId INT, InterneeId INT, Status TEXT,
+            AppliedAt TIMESTAMP, Name TEXT, UniversityName TEXT, ResumePath TEXT, Degree TEXT, Semester TEXT);
+        CREATE INDEX IX_Applied ON InternshipApplications (AppliedAt DESC, ApplicationId DESC);
+    """)
+    users = 5000
+    conn.executemany("INSERT INTO Users VALUES (?, ?, ?)",
+                     ((i, f"user{i}", f"user{i}@example.com") for i in range(1, users + 1)))
+    conn.executemany("INSERT INTO Internships VALUES (?, ?)",
+                     ((i, f"Internship {i}") for i in range(1, 101)))
+    start = datetime(2024, 1, 1)
+    conn.executemany(
+        "INSERT INTO InternshipApplications VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ((i, i % 100 + 1, i % users + 1, ("pending", "approved", "rejected")[i % 3],
+          (start + timedelta(seconds=i)).isoformat(" "), f"Applicant {i}", "University of Somewhere",
+          f"uploads/{i % users + 1}/{i}_resume.pdf", "BSCS", str(i % 8 + 1))
+         for i in range(1, rows + 1)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def stream_mode(path, fmt):
+    pool = ConnectionPool(lambda: sqlite3.connect(path, check_same_thread=False), min_size=1, max_size=1)
+    database = Database(pool, query_timeout=600)
+    conn = await database.acquire()
+    total = 0
+    try:
+        chunks, _ = export_chunks(fmt, conn.stream(QUERY, (), batch_size=1000), COLUMNS)
+        async for chunk in chunks:
+            total += len(chunk)
+    finally:
+        await database.release(conn)
+        database.close()
+    return total
+
+
+def fetchall_mode(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute(QUERY).fetchall()
+    body = json.dumps([dict(zip(COLUMNS, row)) for row in rows], default=str).encode("utf-8")
+    return len(body)
+
+
+def child(path, mode):
+    start = time.perf_counter()
+    if mode == "fetchall":
+        size = fetchall_mode(path)
+    else:
+        size = asyncio.run(stream_mode(path, mode))
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"mode": mode, "seconds": elapsed, "bytes": size, "peak_rss_mb": peak_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.db")
+        start = time.perf_counter()
+        build(path, args.rows)
+        print(f"built {args.rows} applications in {time.perf_counter() - start:.1f}s")
+        for mode in ("fetchall", "ndjson", "csv"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", path, mode],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out)
+            print(f"{r['mode']:<9} {r['seconds']:7.2f}s  {args.rows / r['seconds']:9.0f} rows/s  "
+                  f"{r['bytes'] / 1e6:8.1f} MB out  peak RSS {r['peak_rss_mb']:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Bytes served and CPU time for previews (previews.py) against the original
+# uploads they stand in for.
+#
+# Inputs are the sample images under uploads/, a synthetic phone photo
+# (4032x3024, as from a 12 MP camera) and a synthetic resume PDF with a photo
+# on its first page. For each file it reports:
+#   - the bytes a screen downloads to show it: original vs thumb / preview
+#   - the CPU a client spends decoding what it downloaded (Pillow decode for
+#     images, rasterizing the first page at preview size for PDFs)
+#   - the one-off CPU the previews job spends making the derivatives
+# and totals for one page of the admin applications screen, where each row
+# shows a resume thumbnail.
+#
+#   python benchmarks/bench_previews.py [--rows 50] [--repeat 5]
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pymupdf
+from PIL import Image
+
+from previews import PREVIEW_SIZE, render_derivatives
+
+BACKEND = Path(__file__).resolve().parent.parent
+SAMPLES = ["uploads/3/5_pexels-enginakyurt-1446948.jpg", "uploads/14/3_oturtjnfj8421.jpg"]
+
+
+def phone_photo(path, seed=1):
+    # Smooth gradients plus sensor-like noise compress about like a real photo
+    random.seed(seed)
+    width, height = 4032, 3024
+    small = Image.new("RGB", (64, 48))
+    small.putdata([(random.randrange(256), random.randrange(256), random.randrange(256)) for _ in range(64 * 48)])
+    image = small.resize((width, height), Image.BICUBIC)
+    noise = Image.effect_noise((width, height), 24).convert("RGB")
+    Image.blend(image, noise, 0.15).save(path, "JPEG", quality=92)
+
+
+def resume_pdf(path, photo):
+    doc = pymupdf.open()
+    for number in range(2):
+        page = doc.new_page()
+        if number == 0:
+            page.insert_image(pymupdf.Rect(400, 40, 560, 160), filename=str(photo))
+        text = "\n".join(f"Experience {i}: built REST services with FastAPI and SQL Server." for i in range(40))
+        page.insert_textbox(pymupdf.Rect(40, 180, 560, 800), text, fontsize=9)
+    doc.save(path)
+
+
+def best_cpu(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def decode_image(data):
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+
+
+def render_page(data):
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        page = doc[0]
+        scale = PREVIEW_SIZE / max(page.rect.width, page.rect.height)
+        page.get_pixmap(matrix=pymupdf.Matrix(scale, scale), alpha=False)
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        photo = tmp / "phone_photo.jpg"
+        phone_photo(photo)
+        resume = tmp / "resume.pdf"
+        resume_pdf(resume, photo)
+        files = [BACKEND / name for name in SAMPLES] + [photo, resume]
+
+        print(f"best of {args.repeat}; CPU times in ms (process time)")
+        print(f"{'file':<36} {'variant':<9} {'bytes':>10} {'client CPU':>11}")
+        results = {}
+        for path in files:
+            original = path.read_bytes()
+            is_pdf = original.startswith(b"%PDF-")
+            derivatives = render_derivatives(path)
+            make_cpu = best_cpu(lambda: render_derivatives(path), args.repeat)
+            rows = [("original", original, render_page if is_pdf else decode_image)]
+            rows += [(v, derivatives[v], decode_image) for v in ("thumb", "preview") if v in derivatives]
+            for variant, data, decode in rows:
+                cpu = best_cpu(lambda: decode(data), args.repeat)
+                print(f"{path.name[:36]:<36} {variant:<9} {len(data):>10,} {cpu:>11.1f}")
+            if "text" in derivatives:
+                print(f"{path.name[:36]:<36} {'text':<9} {len(derivatives['text']):>10,}")
+            print(f"{'':<36} {'(job)':<9} {'':>10} {make_cpu:>11.1f}  to make the derivatives, once per upload")
+            results[path] = (original, derivatives)
+
+        original, derivatives = results[resume]
+        before = len(original) * args.rows
+        after = len(derivatives["thumb"]) * args.rows
+        print()
+        print(f"applications screen, {args.rows} rows with a resume thumbnail:")
+        print(f"  full resumes  {before / 1024 / 1024:8.2f} MiB")
+        print(f"  thumbnails    {after / 1024 / 1024:8.2f} MiB  ({before / after:.0f}x fewer bytes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,121 @@
+# Batch review benchmark: N single-application status updates vs. one batch.
+#
+# SQLite stands in for SQL Server, so the batch path is reviews.update_statuses
+# translated to SQLite syntax (TEMP table, RETURNING instead of OUTPUT). Each
+# driver round-trip sleeps --rtt-ms to model the network hop to the database,
+# which is what per-click updates mostly pay for. The per-item mode also does
+# the user lookup that every authenticated request costs.
+#
+#   python benchmarks/bench_review.py [--rows 10000] [--rtt-ms 0.5] [--chunk 1000]
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reviews import APPLICATION_STATUSES
+
+
+class LatencyCursor:
+    def __init__(self, cursor, rtt):
+        self.cursor = cursor
+        self.rtt = rtt
+        self.round_trips = 0
+
+    def execute(self, sql, params=()):
+        self.round_trips += 1
+        time.sleep(self.rtt)
+        return self.cursor.execute(sql, params)
+
+    def executemany(self, sql, rows):
+        # fast_executemany sends the whole parameter array in one round-trip
+        self.round_trips += 1
+        time.sleep(self.rtt)
+        return self.cursor.executemany(sql, rows)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def commit(self):
+        self.round_trips += 1
+        time.sleep(self.rtt)
+        self.cursor.connection.commit()
+
+
+def setup(path, rows):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE Users (UserId INTEGER PRIMARY KEY, FirebaseUID TEXT, Role TEXT);
+        CREATE TABLE InternshipApplications (
+            ApplicationId INTEGER PRIMARY KEY, InternshipId INT, InterneeId INT, Status TEXT NOT NULL
+        );
+        CREATE INDEX IX_Users_FirebaseUID ON Users (FirebaseUID);
+    ''')
+    conn.execute("INSERT INTO Users VALUES (1, 'admin-uid', 'admin')")
+    conn.executemany(
+        "INSERT INTO InternshipApplications VALUES (?, ?, ?, 'pending')",
+        [(i, i % 50, i) for i in range(1, rows + 1)],
+    )
+    conn.commit()
+    return conn
+
+
+def per_item(cursor, changes):
+    for application_id, status in changes:
+        cursor.execute("SELECT UserId, Role FROM Users WHERE FirebaseUID = ?", ("admin-uid",))
+        cursor.fetchall()
+        cursor.execute(
+            "UPDATE InternshipApplications SET Status = ? WHERE ApplicationId = ?", (status, application_id)
+        )
+        cursor.commit()
+
+
+def batch(cursor, changes, chunk_size):
+    cursor.execute("SELECT UserId, Role FROM Users WHERE FirebaseUID = ?", ("admin-uid",))
+    cursor.fetchall()
+    cursor.execute("CREATE TEMP TABLE StatusBatch (ApplicationId INTEGER PRIMARY KEY, Status TEXT NOT NULL)")
+    rows = sorted(dict(changes).items())
+    for i in range(0, len(rows), chunk_size):
+        cursor.executemany("INSERT INTO StatusBatch VALUES (?, ?)", rows[i:i + chunk_size])
+    cursor.execute('''
+        UPDATE InternshipApplications AS a SET Status = b.Status
+        FROM StatusBatch b WHERE b.ApplicationId = a.ApplicationId AND a.Status <> b.Status
+        RETURNING ApplicationId
+    ''')
+    updated = len(cursor.fetchall())
+    cursor.execute("DROP TABLE StatusBatch")
+    cursor.commit()
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    parser.add_argument("--chunk", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    changes = [(i, rng.choice(APPLICATION_STATUSES[1:])) for i in range(1, args.rows + 1)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("per-item", "batch"):
+            conn = setup(os.path.join(tmp, f"{mode}.db"), args.rows)
+            cursor = LatencyCursor(conn.cursor(), args.rtt_ms / 1000)
+            start = time.perf_counter()
+            if mode == "per-item":
+                per_item(cursor, changes)
+            else:
+                batch(cursor, changes, args.chunk)
+            elapsed = time.perf_counter() - start
+            changed = conn.execute("SELECT COUNT(*) FROM InternshipApplications WHERE Status <> 'pending'").fetchone()[0]
+            print(f"{mode:8s} {args.rows} updates in {elapsed:7.2f}s  "
+                  f"{args.rows / elapsed:9.0f}/s  round-trips {cursor.round_trips:6d}  changed {changed}")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
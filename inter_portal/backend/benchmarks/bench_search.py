@@ -0,0 +1,112 @@
+# Search index benchmark: builds search.SearchIndex from 100k synthetic
+# internships and tasks streamed out of SQLite (standing in for SQL Server,
+# same build_index code path), then times queries and incremental updates.
+#
+#   python benchmarks/bench_search.py [--docs 100000] [--queries 200]
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search import build_index, INTERNSHIP, TASK
+
+# Zipf-ish vocabulary: a few very common words, a long tail of rare ones
+COMMON = ("the and for with to of in a on develop build team project data user report".split())
+TOPICS = ("python java flutter react django fastapi kotlin swift sql azure firebase docker kubernetes "
+          "android ios backend frontend mobile design testing security analytics marketing finance "
+          "research cloud machine learning api dashboard migration documentation onboarding").split()
+
+
+def word(rng, rare):
+    r = rng.random()
+    if r < 0.5:
+        return rng.choice(COMMON)
+    if r < 0.85:
+        return rng.choice(TOPICS)
+    return rng.choice(rare)
+
+
+def text(rng, rare, n):
+    return " ".join(word(rng, rare) for _ in range(n))
+
+
+def populate(path, docs, rng):
+    rare = [f"term{i}" for i in range(20000)]
+    internships = docs // 5
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE Internships (InternshipId INTEGER PRIMARY KEY, Title TEXT, Description TEXT, Status TEXT);
+        CREATE TABLE Tasks (TaskId INTEGER PRIMARY KEY, Title TEXT, Description TEXT, InternshipId INTEGER);
+    ''')
+    conn.executemany("INSERT INTO Internships VALUES (?, ?, ?, ?)", (
+        (i, text(rng, rare, 5), text(rng, rare, rng.randint(30, 120)), rng.choice(("available", "closed")))
+        for i in range(1, internships + 1)
+    ))
+    conn.executemany("INSERT INTO Tasks VALUES (?, ?, ?, ?)", (
+        (i, text(rng, rare, 6), text(rng, rare, rng.randint(10, 60)), rng.randint(1, internships))
+        for i in range(1, docs - internships + 1)
+    ))
+    conn.commit()
+    return conn
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main(args):
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = populate(os.path.join(tmp, "search.db"), args.docs, rng)
+        start = time.perf_counter()
+        index = build_index(conn, args.batch)
+        build = time.perf_counter() - start
+        stats = index.stats()
+        print(f"build              {build:.2f}s  {stats['documents']} docs, {stats['terms']} terms, "
+              f"{stats['postings']} postings")
+
+        queries = {
+            "rare term": lambda: index.search(f"term{rng.randrange(20000)}"),
+            "topic term": lambda: index.search(rng.choice(TOPICS)),
+            "two topics": lambda: index.search(f"{rng.choice(TOPICS)} {rng.choice(TOPICS)}"),
+            "common + topic": lambda: index.search(f"project {rng.choice(TOPICS)}"),
+            "prefix 'term12'": lambda: index.search("term12"),
+            "prefix 'ku'": lambda: index.search("ku"),
+            "page 5 of topic": lambda: index.search(rng.choice(TOPICS), limit=20, offset=80),
+            "internships only": lambda: index.search(rng.choice(TOPICS), kinds={INTERNSHIP}),
+            "visible filter": lambda: index.search(
+                rng.choice(TOPICS), allow=lambda kind, doc_id, f: kind == TASK or f["status"] == "available"
+            ),
+        }
+        for name, query in queries.items():
+            p50, p99 = timed(query, args.queries)
+            print(f"{name:<18} p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+
+        next_id = args.docs * 10
+        def update():
+            nonlocal next_id
+            next_id += 1
+            index.upsert(TASK, next_id, "new python task", "write a fastapi endpoint for the dashboard",
+                         internship_id=1)
+            index.remove(TASK, next_id - 1)
+        p50, p99 = timed(update, args.queries)
+        print(f"{'upsert + remove':<18} p50 {p50:7.3f} ms  p99 {p99:7.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=5000)
+    main(parser.parse_args())
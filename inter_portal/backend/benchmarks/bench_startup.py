@@ -0,0 +1,118 @@
+# Startup-time benchmark: how long a fresh process takes to import main.py,
+# to finish the startup event (when uvicorn starts accepting connections),
+# to answer /health/live and to report ready on /health/ready. Each run is a
+# new interpreter, since import cost is most of a cold start.
+#
+# The database is the SQLite stand-in (datagen.py / standin.py), so the
+# schema check is skipped as in bench_api.py (RUN_MIGRATIONS=0); on SQL
+# Server it is one round-trip when the schema is current. Fetching Google's
+# signing keys is simulated with a --keys-ms delay. With --db-down the first
+# connection attempts fail for that many seconds, as during a database
+# restart: the process must still start, stay live and become ready once the
+# database is back.
+#
+#   python benchmarks/bench_startup.py [--runs 5] [--db-down 3] [--keys-ms 150]
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+PHASES = ("import", "startup", "live", "ready")
+
+
+async def child(args):
+    # One cold start; prints the phase timings as JSON
+    started = time.perf_counter()
+    import httpx
+    import standin
+    import main
+    imported = time.perf_counter()
+
+    db_down_until = time.monotonic() + args.db_down
+
+    def connect():
+        if time.monotonic() < db_down_until:
+            raise ConnectionError("database unreachable")
+        return standin.connect(args.db)
+
+    def fetch_keys():
+        time.sleep(args.keys_ms / 1000)
+        return {}, 3600
+
+    main.db_pool._connect = connect
+    main.firebase_verifier.fetch_keys = fetch_keys
+    await main.startup_event()
+    startup_done = time.perf_counter()
+
+    timings = {"import": imported - started, "startup": startup_done - started}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        while "ready" not in timings:
+            if "live" not in timings and (await client.get("/health/live")).status_code == 200:
+                timings["live"] = time.perf_counter() - started
+            if (await client.get("/health/ready")).status_code == 200:
+                timings["ready"] = time.perf_counter() - started
+            else:
+                await asyncio.sleep(0.01)
+    await main.shutdown_event()
+    print(json.dumps(timings))
+
+
+def run_child(args, tmp, db_down):
+    env = dict(os.environ)
+    env.update({
+        "FIREBASE_PROJECT_ID": "bench-project",
+        "RUN_MIGRATIONS": "0",  # datagen created the schema
+        "SEARCH_REFRESH_SECONDS": "0",
+        "JOB_WORKERS_ENABLED": "0",
+    })
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", "--db", args.db,
+         "--db-down", str(db_down), "--keys-ms", str(args.keys_ms)],
+        cwd=tmp, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process"] = time.perf_counter() - started
+    return timings
+
+
+def main(args):
+    import datagen
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.db = os.path.join(tmp, "bench.db")
+        datagen.generate(args.db, internees=200, admins=5, internships=50, tasks_per_internship=5)
+        print(f"median of {args.runs} cold starts, seconds from interpreter start "
+              f"(process = until the child exits)")
+        print(f"{'scenario':<22}" + "".join(f"{phase:>10}" for phase in PHASES + ("process",)))
+        scenarios = [("database up", 0.0)]
+        if args.db_down:
+            scenarios.append((f"database down {args.db_down:g}s", args.db_down))
+        for name, db_down in scenarios:
+            runs = [run_child(args, tmp, db_down) for _ in range(args.runs)]
+            medians = [statistics.median(run[phase] for run in runs) for phase in PHASES + ("process",)]
+            print(f"{name:<22}" + "".join(f"{value:>10.3f}" for value in medians))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db-down", type=float, default=3.0)
+    parser.add_argument("--keys-ms", type=float, default=150.0)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        asyncio.run(child(args))
+    else:
+        main(args)
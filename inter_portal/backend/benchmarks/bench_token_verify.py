@@ -0,0 +1,103 @@
+# Offline throughput benchmark for firebase_verifier.FirebaseTokenVerifier.
+#
+# Generates a local RSA key and self-signed certificate, mints Firebase-style
+# ID tokens with it and measures:
+#   cold - every token is new, so each call does a full RS256 verification
+#   warm - tokens repeat, so calls are served from the verified-token cache
+#
+#   python benchmarks/bench_token_verify.py [--tokens 2000] [--concurrency 50]
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from firebase_verifier import FirebaseTokenVerifier
+
+PROJECT_ID = "bench-project"
+KID = "bench-key"
+
+
+def make_key_set():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken.bench")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    pem = cert.public_bytes(serialization.Encoding.PEM).decode("utf-8")
+    return key, {KID: pem}
+
+
+def mint(key, uid):
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": uid,
+        "auth_time": now - 10,
+        "iat": now - 10,
+        "exp": now + 3600,
+        "email": f"{uid}@example.com",
+    }
+    return jwt.encode(claims, key, algorithm="RS256", headers={"kid": KID})
+
+
+async def measure(verifier, tokens, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(token):
+        async with semaphore:
+            await verifier.verify(token)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(t) for t in tokens))
+    return time.perf_counter() - start
+
+
+async def run(args):
+    key, certs = make_key_set()
+    fetches = []
+
+    def fetch_keys():
+        fetches.append(time.perf_counter())
+        return certs, 3600
+
+    verifier = FirebaseTokenVerifier(PROJECT_ID, fetch_keys=fetch_keys)
+    await verifier.start()
+    tokens = [mint(key, f"user-{i}") for i in range(args.tokens)]
+
+    cold = await measure(verifier, tokens, args.concurrency)
+    warm = await measure(verifier, tokens, args.concurrency)
+    await verifier.stop()
+
+    for name, elapsed in (("cold", cold), ("warm", warm)):
+        print(f"{name:<5} {len(tokens)} tokens in {elapsed:.3f}s -> {len(tokens) / elapsed:10.0f} verifications/s")
+    print(f"key fetches: {len(fetches)}  stats: {verifier.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# Concurrent upload benchmark: uploads.receive_upload vs. the old
+# UploadFile + shutil.copyfileobj handler.
+#
+# Sends N concurrent multipart uploads (50 MB each by default) through an
+# in-process ASGI transport and reports throughput and the worst event-loop
+# stall seen by a 10 ms ticker while the uploads run.
+#
+#   python benchmarks/bench_uploads.py [--uploads 8] [--size-mb 50]
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI, File, Request, UploadFile
+
+from uploads import receive_upload, io_executor
+from blobstore import BlobStore
+
+BOUNDARY = "benchboundary7MA4YWxkTrZu0gW"
+CHUNK = 64 * 1024
+
+
+def make_app(root):
+    app = FastAPI()
+
+    @app.post("/old/{n}")
+    async def old(n: int, file: UploadFile = File(...)):
+        user_dir = root / "old" / str(n)
+        user_dir.mkdir(parents=True, exist_ok=True)
+        with (user_dir / f"1_{file.filename}").open("wb") as buffer:
+            shutil.copyfileobj(file.file, buffer)
+        return {}
+
+    store = BlobStore(root / "new")
+
+    @app.post("/new/{n}")
+    async def new(n: int, request: Request):
+        _, upload = await receive_upload(request, "file", root / "new" / ".incoming", max_bytes=1 << 40)
+        await asyncio.get_running_loop().run_in_executor(io_executor, store.put, upload.path, upload.sha256)
+        return {}
+
+    return app
+
+
+def body(size):
+    head = (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.bin\"\r\n"
+            "Content-Type: application/octet-stream\r\n\r\n").encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+    block = os.urandom(CHUNK)
+
+    async def gen():
+        yield head
+        sent = 0
+        while sent < size:
+            n = min(CHUNK, size - sent)
+            yield block[:n]
+            sent += n
+        yield tail
+
+    return gen(), len(head) + size + len(tail)
+
+
+async def run(kind, app, args):
+    size = args.size_mb * 1024 * 1024
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            stalls.append(time.perf_counter() - start - 0.01)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                 timeout=None) as client:
+        async def one(n):
+            content, length = body(size)
+            r = await client.post(f"/{kind}/{n}", content=content, headers={
+                "Content-Type": f"multipart/form-data; boundary={BOUNDARY}",
+                "Content-Length": str(length),
+            })
+            r.raise_for_status()
+
+        tick = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(args.uploads)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await tick
+
+    total_mb = args.uploads * args.size_mb
+    print(f"{kind:<4} {args.uploads} x {args.size_mb} MB in {elapsed:6.2f}s  {total_mb / elapsed:7.1f} MB/s  "
+          f"max loop stall {max(stalls) * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=50)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(Path(tmp))
+        for kind in ("old", "new"):
+            asyncio.run(run(kind, app, args))
+
+
+if __name__ == "__main__":
+    main()
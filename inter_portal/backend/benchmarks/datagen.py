@@ -0,0 +1,298 @@
+# Synthetic data for the benchmark suite: the schema of migrations 1-10 in
+# SQLite form (see standin.py) filled with users, internships, tasks,
+# applications and assignments at a configurable scale. Deterministic for a
+# given seed, so runs compare like with like.
+#
+#   python benchmarks/datagen.py out.db [--internees 2000] [--admins 20] [--internships 200] ...
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import standin  # noqa: F401  (registers the datetime adapters)
+
+SCHEMA = '''
+    CREATE TABLE Users (
+        UserId INTEGER PRIMARY KEY AUTOINCREMENT,
+        Name VARCHAR(100) NOT NULL,
+        FirebaseUID VARCHAR(100) UNIQUE NOT NULL,
+        Username VARCHAR(50) UNIQUE NOT NULL,
+        Password VARCHAR(100) NULL,
+        Email VARCHAR(100) UNIQUE NOT NULL,
+        Role VARCHAR(10) NOT NULL,
+        CreatedAt DATETIME DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+    );
+    CREATE TABLE Internships (
+        InternshipId INTEGER PRIMARY KEY AUTOINCREMENT,
+        Title VARCHAR(100) NOT NULL,
+        Description TEXT,
+        Status VARCHAR(20) NOT NULL,
+        CreatedBy INT REFERENCES Users(UserId),
+        CreatedAt DATETIME DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+        RowVer INTEGER
+    );
+    CREATE TABLE Tasks (
+        TaskId INTEGER PRIMARY KEY AUTOINCREMENT,
+        InternshipId INT REFERENCES Internships(InternshipId) ON DELETE CASCADE,
+        Title VARCHAR(100) NOT NULL,
+        Description TEXT,
+        DueDate DATETIME,
+        CreatedBy INT REFERENCES Users(UserId),
+        CreatedAt DATETIME DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+        RowVer INTEGER
+    );
+    CREATE TABLE InternshipApplications (
+        ApplicationId INTEGER PRIMARY KEY AUTOINCREMENT,
+        InternshipId INT REFERENCES Internships(InternshipId) ON DELETE CASCADE,
+        InterneeId INT REFERENCES Users(UserId),
+        Status VARCHAR(20) NOT NULL,
+        AppliedAt DATETIME DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+        Name VARCHAR(100) NULL,
+        UniversityName VARCHAR(200) NULL,
+        ResumePath VARCHAR(255) NULL,
+        Degree VARCHAR(100) NULL,
+        Semester VARCHAR(20) NULL,
+        RowVer INTEGER
+    );
+    CREATE TABLE TaskAssignments (
+        AssignmentId INTEGER PRIMARY KEY AUTOINCREMENT,
+        TaskId INT REFERENCES Tasks(TaskId) ON DELETE CASCADE,
+        InterneeId INT REFERENCES Users(UserId),
+        Status VARCHAR(20) NOT NULL,
+        SubmissionPath VARCHAR(255),
+        SubmittedAt DATETIME,
+        CreatedAt DATETIME DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+        RowVer INTEGER
+    );
+    CREATE TABLE FileBlobs (
+        Sha256 CHAR(64) PRIMARY KEY,
+        Size BIGINT NOT NULL,
+        RefCount INT NOT NULL,
+        CreatedAt DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+        UpdatedAt DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+        Derivatives VARCHAR(100) NULL
+    );
+    CREATE TABLE StoredFiles (
+        LogicalPath VARCHAR(255) PRIMARY KEY,
+        Sha256 CHAR(64) NOT NULL REFERENCES FileBlobs(Sha256),
+        OwnerId INT NOT NULL,
+        ContentType VARCHAR(100) NULL,
+        CreatedAt DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+    );
+    CREATE TABLE InterneeProgress (
+        InterneeId INT PRIMARY KEY,
+        Total INT NOT NULL,
+        Completed INT NOT NULL,
+        Pending INT NOT NULL,
+        InProgress INT NOT NULL,
+        UpdatedAt DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+    );
+    CREATE TABLE Jobs (
+        JobId INTEGER PRIMARY KEY AUTOINCREMENT,
+        Kind VARCHAR(100) NOT NULL,
+        Payload TEXT NOT NULL,
+        Priority INT NOT NULL DEFAULT 0,
+        IdempotencyKey VARCHAR(200) NULL,
+        Status VARCHAR(10) NOT NULL DEFAULT 'queued',
+        Attempts INT NOT NULL DEFAULT 0,
+        MaxAttempts INT NOT NULL,
+        RunAt DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+        LockedUntil DATETIME NULL,
+        LastError VARCHAR(2000) NULL,
+        CreatedAt DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+        StartedAt DATETIME NULL,
+        FinishedAt DATETIME NULL
+    );
+    CREATE TABLE Tombstones (
+        TombstoneId INTEGER PRIMARY KEY AUTOINCREMENT,
+        TableName VARCHAR(30) NOT NULL,
+        RowId INT NOT NULL,
+        InterneeId INT NULL,
+        RowVer INTEGER,
+        DeletedAt DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+    );
+    CREATE TABLE SyncHorizon (
+        Id INT PRIMARY KEY,
+        PurgedThrough BIGINT NOT NULL
+    );
+    INSERT INTO SyncHorizon (Id, PurgedThrough) VALUES (1, 0);
+
+    -- ROWVERSION: one database-wide counter, bumped by triggers on every
+    -- insert and update (see standin.py for MIN_ACTIVE_ROWVERSION)
+    CREATE TABLE DbRowVersion (Value INTEGER NOT NULL);
+    INSERT INTO DbRowVersion (Value) VALUES (0);
+
+    -- Same key columns as migration 4 (SQLite has no INCLUDE)
+    CREATE INDEX IX_TaskAssignments_InterneeId ON TaskAssignments (InterneeId, TaskId, Status);
+    CREATE INDEX IX_TaskAssignments_TaskId_InterneeId ON TaskAssignments (TaskId, InterneeId);
+    CREATE INDEX IX_InternshipApplications_InternshipId_InterneeId
+        ON InternshipApplications (InternshipId, InterneeId, Status);
+    CREATE INDEX IX_InternshipApplications_AppliedAt ON InternshipApplications (AppliedAt DESC, ApplicationId DESC);
+    CREATE INDEX IX_InternshipApplications_InterneeId ON InternshipApplications (InterneeId);
+    CREATE INDEX IX_Users_Role ON Users (Role, CreatedAt DESC, UserId DESC);
+    CREATE INDEX IX_Internships_Status ON Internships (Status, CreatedAt DESC, InternshipId DESC);
+    CREATE INDEX IX_Internships_CreatedAt ON Internships (CreatedAt DESC, InternshipId DESC);
+    CREATE INDEX IX_Tasks_CreatedBy ON Tasks (CreatedBy, CreatedAt DESC, TaskId DESC);
+    CREATE INDEX IX_Tasks_InternshipId ON Tasks (InternshipId);
+    CREATE INDEX IX_FileBlobs_Unreferenced ON FileBlobs (UpdatedAt) WHERE RefCount <= 0;
+    CREATE INDEX IX_StoredFiles_Sha256 ON StoredFiles (Sha256);
+    CREATE INDEX IX_Jobs_Queue ON Jobs (Status, Priority DESC, RunAt, JobId);
+    CREATE UNIQUE INDEX UX_Jobs_IdempotencyKey ON Jobs (IdempotencyKey) WHERE IdempotencyKey IS NOT NULL;
+    CREATE INDEX IX_Internships_RowVer ON Internships (RowVer);
+    CREATE INDEX IX_Tasks_RowVer ON Tasks (RowVer);
+    CREATE INDEX IX_InternshipApplications_RowVer ON InternshipApplications (RowVer);
+    CREATE INDEX IX_Tombstones_RowVer ON Tombstones (RowVer);
+'''
+
+ROWVERSION_TRIGGERS = '''
+    CREATE TRIGGER {table}_RowVer_{event} AFTER {event} ON {table}
+    BEGIN
+        UPDATE DbRowVersion SET Value = Value + 1;
+        UPDATE {table} SET RowVer = (SELECT Value FROM DbRowVersion) WHERE rowid = NEW.rowid;
+    END;
+'''
+ROWVERSION_TABLES = {
+    "Internships": ("INSERT", "UPDATE"),
+    "Tasks": ("INSERT", "UPDATE"),
+    "TaskAssignments": ("INSERT", "UPDATE"),
+    "InternshipApplications": ("INSERT", "UPDATE"),
+    "Tombstones": ("INSERT",),
+}
+
+WORDS = ("python java flutter react backend frontend mobile data cloud security design testing api "
+         "dashboard analytics research marketing finance docs onboarding migration review report").split()
+
+
+def create_schema(conn):
+    conn.executescript(SCHEMA)
+    # The nested UPDATE does not fire the UPDATE trigger again: SQLite's
+    # recursive_triggers is off by default
+    for table, events in ROWVERSION_TABLES.items():
+        for event in events:
+            conn.executescript(ROWVERSION_TRIGGERS.format(table=table, event=event))
+    conn.execute("PRAGMA journal_mode=WAL")
+
+
+def firebase_uid(user_id):
+    # Users are numbered from 1 in insertion order: admins first
+    return f"bench-uid-{user_id}"
+
+
+def phrase(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def generate(path, internees=2000, admins=20, internships=200, tasks_per_internship=10,
+             applications_per_internee=3, approval_rate=0.5, seed=1):
+    # Returns a summary dict with the id ranges the load scenarios draw from
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    create_schema(conn)
+    base = datetime(2024, 1, 1)
+
+    def moment():
+        return base + timedelta(seconds=rng.randrange(365 * 86400), milliseconds=rng.randrange(1000))
+
+    users = []
+    for user_id in range(1, admins + internees + 1):
+        role = "admin" if user_id <= admins else "internee"
+        users.append((f"User {user_id}", firebase_uid(user_id), f"user{user_id}", f"user{user_id}@example.com",
+                      role, moment()))
+    conn.executemany(
+        "INSERT INTO Users (Name, FirebaseUID, Username, Email, Role, CreatedAt) VALUES (?, ?, ?, ?, ?, ?)", users
+    )
+
+    conn.executemany(
+        "INSERT INTO Internships (Title, Description, Status, CreatedBy, CreatedAt) VALUES (?, ?, ?, ?, ?)",
+        [(phrase(rng, 3).title(), phrase(rng, 40), "available" if rng.random() < 0.7 else "not available",
+          rng.randint(1, admins), moment()) for _ in range(internships)],
+    )
+
+    tasks = []
+    for internship_id in range(1, internships + 1):
+        for _ in range(tasks_per_internship):
+            tasks.append((internship_id, phrase(rng, 4).capitalize(), phrase(rng, 25),
+                          moment() if rng.random() < 0.8 else None, rng.randint(1, admins), moment()))
+    conn.executemany(
+        "INSERT INTO Tasks (InternshipId, Title, Description, DueDate, CreatedBy, CreatedAt) VALUES (?, ?, ?, ?, ?, ?)",
+        tasks,
+    )
+
+    applications, assignments = [], []
+    for internee_id in range(admins + 1, admins + internees + 1):
+        for internship_id in rng.sample(range(1, internships + 1), min(applications_per_internee, internships)):
+            approved = rng.random() < approval_rate
+            status = "approved" if approved else rng.choice(("pending", "rejected"))
+            applications.append((internship_id, internee_id, status, moment(), f"User {internee_id}",
+                                 "Bench University", "BSCS", str(rng.randint(1, 8))))
+            if approved:
+                first_task = (internship_id - 1) * tasks_per_internship + 1
+                for task_id in range(first_task, first_task + tasks_per_internship):
+                    assignments.append((task_id, internee_id,
+                                        rng.choice(("pending", "pending", "in_progress", "completed")), moment()))
+    conn.executemany('''
+        INSERT INTO InternshipApplications
+            (InternshipId, InterneeId, Status, AppliedAt, Name, UniversityName, Degree, Semester)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', applications)
+    conn.executemany(
+        "INSERT INTO TaskAssignments (TaskId, InterneeId, Status, CreatedAt) VALUES (?, ?, ?, ?)", assignments
+    )
+
+    # Seeded like migration 6
+    conn.execute('''
+        INSERT INTO InterneeProgress (InterneeId, Total, Completed, Pending, InProgress)
+        SELECT u.UserId, COUNT(ta.AssignmentId),
+               IFNULL(SUM(CASE WHEN ta.Status = 'completed' THEN 1 ELSE 0 END), 0),
+               IFNULL(SUM(CASE WHEN ta.Status = 'pending' THEN 1 ELSE 0 END), 0),
+               IFNULL(SUM(CASE WHEN ta.Status = 'in_progress' THEN 1 ELSE 0 END), 0)
+        FROM Users u LEFT JOIN TaskAssignments ta ON ta.InterneeId = u.UserId
+        WHERE u.Role = 'internee'
+        GROUP BY u.UserId
+    ''')
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return {
+        "admins": list(range(1, admins + 1)),
+        "internees": list(range(admins + 1, admins + internees + 1)),
+        "internships": internships,
+        "tasks": len(tasks),
+        "applications": len(applications),
+        "assignments": len(assignments),
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument("--internees", type=int, default=2000)
+    parser.add_argument("--admins", type=int, default=20)
+    parser.add_argument("--internships", type=int, default=200)
+    parser.add_argument("--tasks-per-internship", type=int, default=10)
+    parser.add_argument("--applications-per-internee", type=int, default=3)
+    parser.add_argument("--approval-rate", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def generate_from_args(path, args):
+    return generate(path, args.internees, args.admins, args.internships, args.tasks_per_internship,
+                    args.applications_per_internee, args.approval_rate, args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    add_arguments(parser)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    summary = generate_from_args(args.path, args)
+    print(f"{args.path}: {len(summary['admins'])} admins, {len(summary['internees'])} internees, "
+          f"{summary['internships']} internships, {summary['tasks']} tasks, "
+          f"{summary['applications']} applications, {summary['assignments']} assignments "
+          f"in {time.perf_counter() - start:.1f}s")
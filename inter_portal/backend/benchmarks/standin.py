@@ -0,0 +1,309 @@
+# SQLite stand-in for the SQL Server database, for running the real app
+# (main.py) in benchmarks without a server.
+#
+# connect(path) returns a DB-API connection that looks enough like pyodbc for
+# db_pool/db.py: every statement is rewritten from the T-SQL this code base
+# actually uses into SQLite before it runs. It is not a general translator:
+# anything outside the shapes below raises TranslationError. The schema comes
+# from datagen.create_schema, not from the T-SQL migrations.
+#
+#   T-SQL                                   SQLite
+#   SELECT TOP n ...                        ... LIMIT n
+#   ISNULL / GETDATE() / @@IDENTITY         IFNULL / strftime(now) / last_insert_rowid()
+#   DATEADD / DATEDIFF(unit, x, GETDATE())  strftime(now, modifier) / julianday arithmetic
+#   WITH (UPDLOCK, HOLDLOCK) table hints    dropped (SQLite serializes writers)
+#   OUTPUT inserted.X / deleted.X [INTO @t] RETURNING X [copied into the temp table]
+#   UPDATE a SET ... FROM T a JOIN s b ON c UPDATE T AS a SET ... FROM s AS b WHERE c
+#   MERGE ... WHEN MATCHED / NOT MATCHED    INSERT ... ON CONFLICT DO UPDATE
+#   #temp tables, DECLARE @t TABLE          temp.* tables
+#   (VALUES ...) AS v(a, b)                 (SELECT column1 AS a, ... FROM (VALUES ...)) AS v
+#   ROWVERSION, MIN_ACTIVE_ROWVERSION()     INTEGER set by triggers from a counter table (datagen)
+#   BEGIN TRANSACTION                       no-op (sqlite3 opens transactions implicitly)
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+
+NOW_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+
+sqlite3.register_adapter(datetime, lambda v: v.isoformat(" ", timespec="milliseconds"))
+sqlite3.register_adapter(date, lambda v: v.isoformat())
+sqlite3.register_converter("DATETIME", lambda v: datetime.fromisoformat(v.decode()))
+
+
+class TranslationError(ValueError):
+    pass
+
+
+class _Statement:
+    __slots__ = ("sql", "params", "into")
+
+    def __init__(self, sql, params, into=None):
+        self.sql = sql
+        self.params = params  # number of ? placeholders
+        self.into = into  # temp table receiving the RETURNING rows
+
+
+def _scan(sql):
+    # Yields (index, char, depth) for characters outside string literals
+    depth = 0
+    quoted = False
+    for i, ch in enumerate(sql):
+        if ch == "'":
+            quoted = not quoted
+            continue
+        if quoted:
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        yield i, ch, depth
+
+
+def _split_top(sql, sep):
+    parts, start = [], 0
+    for i, ch, depth in _scan(sql):
+        if ch == sep and depth == 0:
+            parts.append(sql[start:i])
+            start = i + 1
+    parts.append(sql[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _find_top(sql, keyword, start=0):
+    # Index of " keyword " at paren depth 0, or -1
+    word = f" {keyword} "
+    for i, ch, depth in _scan(sql):
+        if i >= start and depth == 0 and ch == " " and sql.startswith(word, i):
+            return i
+    return -1
+
+
+def _count_params(sql):
+    return sum(1 for _, ch, _ in _scan(sql) if ch == "?")
+
+
+def _expressions(sql):
+    # DATEADD and DATEDIFF first, since they match on GETDATE()
+    sql = re.sub(r"DATEADD\((\w+), ([^,]+), GETDATE\(\)\)",
+                 lambda m: f"strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime', ({m.group(2)}) || ' {m.group(1)}s')",
+                 sql)
+    sql = re.sub(r"DATEDIFF\((millisecond|second), (.+?), GETDATE\(\)\)",
+                 lambda m: f"CAST((julianday('now', 'localtime') - julianday({m.group(2)})) * "
+                           f"{86400000 if m.group(1) == 'millisecond' else 86400} AS INTEGER)",
+                 sql)
+    sql = sql.replace("GETDATE()", NOW_SQL)
+    sql = re.sub(r"\bISNULL\(", "IFNULL(", sql)
+    sql = sql.replace("@@IDENTITY", "last_insert_rowid()")
+    sql = sql.replace("CAST(? AS DATETIME)", "?")
+    sql = sql.replace("CAST(CAST(? AS BIGINT) AS BINARY(8))", "?")
+    sql = sql.replace("MIN_ACTIVE_ROWVERSION()", "(SELECT Value + 1 FROM DbRowVersion)")
+    # Compact date literals ('19000101') compare as text in SQLite
+    sql = re.sub(r"'(\d{4})(\d{2})(\d{2})'", r"'\1-\2-\3 00:00:00.000'", sql)
+    sql = re.sub(r" WITH \((?:NOLOCK|UPDLOCK|HOLDLOCK|ROWLOCK|READPAST)(?:, ?(?:NOLOCK|UPDLOCK|HOLDLOCK|ROWLOCK|READPAST))*\)",
+                 "", sql)
+    sql = re.sub(r"\(VALUES (.+?)\) AS (\w+)\(([\w, ]+)\)", _values_table, sql)
+    return sql
+
+
+def _values_table(m):
+    columns = [c.strip() for c in m.group(3).split(",")]
+    select = ", ".join(f"column{i + 1} AS {c}" for i, c in enumerate(columns))
+    return f"(SELECT {select} FROM (VALUES {m.group(1)})) AS {m.group(2)}"
+
+
+def _top(sql):
+    m = re.match(r"SELECT (DISTINCT )?TOP \(?(\d+)\)? ", sql)
+    if m is None:
+        return sql
+    return f"SELECT {m.group(1) or ''}{sql[m.end():]} LIMIT {m.group(2)}"
+
+
+def _merge(sql):
+    m = re.match(
+        r"MERGE (\w+) AS (\w+) USING (.+) AS (\w+) ON (\w+)\.(\w+) = (\w+)\.(\w+) "
+        r"WHEN MATCHED THEN UPDATE SET (.+?) WHEN NOT MATCHED THEN INSERT \((.+?)\) VALUES \((.+)\)$",
+        sql,
+    )
+    if m is None:
+        raise TranslationError(f"Unsupported MERGE: {sql}")
+    table, alias, source, src_alias = m.group(1), m.group(2), m.group(3), m.group(4)
+    key = m.group(6) if m.group(5) == alias else m.group(8)
+    columns = _split_top(m.group(10), ",")
+    values = _split_top(m.group(11), ",")
+    excluded = {v: f"excluded.{c}" for c, v in zip(columns, values) if v.startswith(f"{src_alias}.")}
+
+    def source_column(ref):
+        if ref.group(0) not in excluded:
+            raise TranslationError(f"MERGE update uses {ref.group(0)}, which is not inserted")
+        return excluded[ref.group(0)]
+    sets = re.sub(rf"\b{src_alias}\.\w+", source_column, m.group(9))
+    sets = re.sub(rf"\b{alias}\.", f"{table}.", sets)
+    return (f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(values)} "
+            f"FROM {source} AS {src_alias} WHERE true ON CONFLICT({key}) DO UPDATE SET {sets}")
+
+
+def _update_from(sql):
+    # UPDATE alias SET ... FROM Table alias [JOIN source alias2 ON cond] [WHERE ...]
+    m = re.match(r"UPDATE (\w+) SET ", sql)
+    from_at = _find_top(sql, "FROM")
+    if m is None or from_at < 0:
+        return sql
+    alias, sets = m.group(1), sql[m.end():from_at]
+    rest = sql[from_at + len(" FROM "):]
+    where_at = _find_top(rest, "WHERE")
+    where = None
+    if where_at >= 0:
+        rest, where = rest[:where_at], rest[where_at + len(" WHERE "):]
+    join_at = _find_top(rest, "JOIN")
+    target = rest if join_at < 0 else rest[:join_at]
+    table, target_alias = target.split()
+    if target_alias != alias:
+        raise TranslationError(f"Unsupported UPDATE ... FROM: {sql}")
+    out = f"UPDATE {table} AS {alias} SET {sets}"
+    conditions = []
+    if join_at >= 0:
+        joined = rest[join_at + len(" JOIN "):]
+        on_at = _find_top(joined, "ON")
+        source, source_alias = joined[:on_at].rsplit(" ", 1)
+        out += f" FROM {source} AS {source_alias}"
+        conditions.append(joined[on_at + len(" ON "):])
+    if where:
+        conditions.append(f"({where})" if conditions else where)
+    if conditions:
+        out += " WHERE " + " AND ".join(conditions)
+    return out
+
+
+def translate(sql):
+    # Returns the list of SQLite statements for one T-SQL batch
+    sql = " ".join(sql.split())
+    statements = []
+    for stmt in _split_top(sql, ";"):
+        if stmt.upper() in ("BEGIN TRANSACTION", "BEGIN TRAN"):
+            continue
+        m = re.match(r"DECLARE @(\w+) TABLE (\(.+\))$", stmt)
+        if m:
+            statements.append(_Statement(f"CREATE TEMP TABLE IF NOT EXISTS var_{m.group(1)} {m.group(2)}", 0))
+            statements.append(_Statement(f"DELETE FROM temp.var_{m.group(1)}", 0))
+            continue
+        stmt = re.sub(r"IF OBJECT_ID\('tempdb\.\.#(\w+)'\) IS NOT NULL DROP TABLE #\w+", r"DROP TABLE IF EXISTS temp.\1", stmt)
+        stmt = re.sub(r"#(\w+)", r"temp.\1", stmt)
+
+        returning, into = None, None
+        m = re.search(r" OUTPUT ((?:inserted|deleted)\.\w+(?:, (?:inserted|deleted)\.\w+)*)(?: INTO @(\w+))?", stmt)
+        if m:
+            returning = ", ".join(c.split(".", 1)[1] for c in m.group(1).split(", "))
+            into = f"temp.var_{m.group(2)}" if m.group(2) else None
+            stmt = stmt[:m.start()] + stmt[m.end():]
+        stmt = re.sub(r"(?<!@)@(\w+)", r"temp.var_\1", stmt)
+
+        stmt = _expressions(stmt)
+        if stmt.startswith("MERGE "):
+            stmt = _merge(stmt)
+        elif stmt.startswith("UPDATE "):
+            stmt = _update_from(stmt)
+        elif stmt.startswith("SELECT "):
+            stmt = _top(stmt)
+        if returning:
+            stmt += f" RETURNING {returning}"
+        statements.append(_Statement(stmt, _count_params(stmt), into))
+    return statements
+
+
+class Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection.raw.cursor()
+        self._rows = None
+        self.rowcount = -1
+        self.description = None
+
+    def execute(self, sql, params=()):
+        params = list(params)
+        self._rows = None
+        self.rowcount = -1
+        for stmt in self.connection.translate(sql):
+            args, params = params[:stmt.params], params[stmt.params:]
+            self._cursor.execute(stmt.sql, args)
+            if stmt.into:
+                rows = self._cursor.fetchall()
+                if rows:
+                    marks = ", ".join("?" * len(rows[0]))
+                    self._cursor.executemany(f"INSERT INTO {stmt.into} VALUES ({marks})", rows)
+                continue
+            if self._cursor.description is not None:
+                # Materialize so the next statement in the batch does not reset it
+                self.description = self._cursor.description
+                self._rows = iter(self._cursor.fetchall()) if " RETURNING " in stmt.sql else self._cursor
+            self.rowcount = self._cursor.rowcount
+        return self
+
+    def executemany(self, sql, seq):
+        statements = self.connection.translate(sql)
+        if len(statements) != 1:
+            raise TranslationError(f"executemany needs a single statement: {sql}")
+        self._cursor.executemany(statements[0].sql, [list(p) for p in seq])
+        self.rowcount = self._cursor.rowcount
+        return self
+
+    def fetchone(self):
+        return next(self._rows, None) if self._rows is not None else None
+
+    def fetchall(self):
+        return list(self._rows) if self._rows is not None else []
+
+    def fetchmany(self, size=1):
+        rows = []
+        if self._rows is not None:
+            for row in self._rows:
+                rows.append(row)
+                if len(rows) >= size:
+                    break
+        return rows
+
+    def close(self):
+        self._cursor.close()
+
+
+class Connection:
+    # Shared by the pool's checkout threads and the DB executor, one user at
+    # a time, like a pyodbc connection.
+    _cache = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, path, timeout=30.0):
+        self.raw = sqlite3.connect(path, timeout=timeout, check_same_thread=False,
+                                   detect_types=sqlite3.PARSE_DECLTYPES)
+        self.raw.execute("PRAGMA foreign_keys = ON")  # for the ON DELETE CASCADE keys
+
+    def translate(self, sql):
+        statements = self._cache.get(sql)
+        if statements is None:
+            statements = translate(sql)
+            with self._cache_lock:
+                self._cache[sql] = statements
+        return statements
+
+    def cursor(self):
+        return Cursor(self)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def interrupt(self):
+        self.raw.interrupt()
+
+    def close(self):
+        self.raw.close()
+
+
+def connect(path):
+    return Connection(path)
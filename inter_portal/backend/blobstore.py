@@ -0,0 +1,268 @@
+import hashlib
+import os
+import time
+from pathlib import Path, PurePosixPath
+
+# Content-addressed storage for uploads. Files live once under
+# uploads/blobs/<aa>/<bb>/<sha256>; the paths stored in SubmissionPath and
+# ResumePath are logical names ("uploads/<user_id>/<name>") mapped to a blob
+# by the StoredFiles table. FileBlobs.RefCount counts those mappings and is
+# updated in the same transaction as the row that references the file.
+
+
+class BlobStore:
+    def __init__(self, root, grace_seconds=3600):
+        self.root = Path(root)
+        self.blob_root = self.root / "blobs"
+        self.grace_seconds = grace_seconds
+
+    def blob_path(self, sha256):
+        return self.blob_root / sha256[:2] / sha256[2:4] / sha256
+
+    def derivative_path(self, sha256, variant):
+        # Thumbnails and the like, made from the blob (see previews.py)
+        return self.blob_path(sha256).with_name(f"{sha256}.{variant}")
+
+    def remove_derivatives(self, sha256):
+        freed = 0
+        path = self.blob_path(sha256)
+        for derivative in path.parent.glob(f"{sha256}.*"):
+            try:
+                freed += derivative.stat().st_size
+                derivative.unlink()
+            except FileNotFoundError:
+                pass
+        return freed
+
+    def put(self, tmp_path, sha256):
+        # Moves a durable temp file into the store, or drops it when the
+        # content is already there. Touching the existing blob keeps the
+        # garbage collector off it until the new reference is committed.
+        path = self.blob_path(sha256)
+        if path.exists():
+            os.utime(path)
+            os.unlink(tmp_path)
+            return path, False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, path)
+        if os.name == "posix":
+            fd = os.open(path.parent, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return path, True
+
+
+# Longest expected gap between put() and the commit of its link_file
+IN_FLIGHT_SECONDS = 300
+
+
+def logical_path(user_id, *parts):
+    # uploads/<user_id>/<parts...>; new uploads use a per-kind prefix
+    # (tasks/<task_id>/<name>, resumes/<internship_id>/<name>) so kinds
+    # cannot collide. Files from before the blob store are flat.
+    return str(PurePosixPath("uploads", str(user_id), *map(str, parts)))
+
+
+# Reference bookkeeping; these take a cursor and leave committing to the caller
+
+def link_file(cursor, path, sha256, size, owner_id, content_type):
+    cursor.execute("SELECT Sha256 FROM StoredFiles WITH (UPDLOCK, HOLDLOCK) WHERE LogicalPath = ?", (path,))
+    row = cursor.fetchone()
+    old = row[0] if row else None
+    if old == sha256:
+        return
+    cursor.execute('''
+        MERGE FileBlobs WITH (HOLDLOCK) AS b
+        USING (SELECT ? AS Sha256, ? AS Size) AS s ON b.Sha256 = s.Sha256
+        WHEN MATCHED THEN UPDATE SET RefCount = b.RefCount + 1, UpdatedAt = GETDATE()
+        WHEN NOT MATCHED THEN INSERT (Sha256, Size, RefCount) VALUES (s.Sha256, s.Size, 1);
+    ''', (sha256, size))
+    if old is None:
+        cursor.execute('''
+            INSERT INTO StoredFiles (LogicalPath, Sha256, OwnerId, ContentType)
+            VALUES (?, ?, ?, ?)
+        ''', (path, sha256, owner_id, content_type))
+    else:
+        cursor.execute('''
+            UPDATE StoredFiles SET Sha256 = ?, OwnerId = ?, ContentType = ?, CreatedAt = GETDATE()
+            WHERE LogicalPath = ?
+        ''', (sha256, owner_id, content_type, path))
+        cursor.execute(
+            "UPDATE FileBlobs SET RefCount = RefCount - 1, UpdatedAt = GETDATE() WHERE Sha256 = ?", (old,)
+        )
+
+
+def unlink_file(cursor, path):
+    cursor.execute("DELETE FROM StoredFiles OUTPUT deleted.Sha256 WHERE LogicalPath = ?", (path,))
+    row = cursor.fetchone()
+    if row:
+        cursor.execute(
+            "UPDATE FileBlobs SET RefCount = RefCount - 1, UpdatedAt = GETDATE() WHERE Sha256 = ?", (row[0],)
+        )
+
+
+def unlink_files(cursor, select_sql, params=()):
+    # Set-based unlink_file for every path returned by select_sql; run it
+    # before deleting the rows that select_sql reads from. Returns the hashes
+    # of the blobs it released, for remove_blobs() once committed.
+    cursor.execute(f"SELECT DISTINCT Sha256 FROM StoredFiles WHERE LogicalPath IN ({select_sql})", params)
+    released = [row[0] for row in cursor.fetchall()]
+    if not released:
+        return released
+    cursor.execute(f'''
+        DECLARE @released TABLE (Sha256 CHAR(64));
+        DELETE FROM StoredFiles OUTPUT deleted.Sha256 INTO @released
+        WHERE LogicalPath IN ({select_sql});
+        UPDATE b SET RefCount = b.RefCount - r.Refs, UpdatedAt = GETDATE()
+        FROM FileBlobs b JOIN (SELECT Sha256, COUNT(*) AS Refs FROM @released GROUP BY Sha256) r
+            ON r.Sha256 = b.Sha256;
+    ''', params)
+    return released
+
+
+def resolve_file(cursor, path):
+    # (sha256, size, content_type, owner_id) for a logical path, or None
+    cursor.execute('''
+        SELECT f.Sha256, b.Size, f.ContentType, f.OwnerId
+        FROM StoredFiles f JOIN FileBlobs b ON b.Sha256 = f.Sha256
+        WHERE f.LogicalPath = ?
+    ''', (path,))
+    return cursor.fetchone()
+
+
+def resolve_files(cursor, paths):
+    # {logical path: (sha256, owner_id, derivatives)} for those of `paths`
+    # that exist
+    if not paths:
+        return {}
+    cursor.execute(f'''
+        SELECT f.LogicalPath, f.Sha256, f.OwnerId, b.Derivatives
+        FROM StoredFiles f JOIN FileBlobs b ON b.Sha256 = f.Sha256
+        WHERE f.LogicalPath IN ({", ".join("?" * len(paths))})
+    ''', list(paths))
+    return {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+
+
+# Maintenance
+
+def collect_garbage(conn, store):
+    # Deletes blobs nobody references any more, plus blob files that never
+    # made it into FileBlobs (e.g. a crash between put() and commit). Both
+    # only once they are older than the grace period.
+    cursor = conn.cursor()
+    cutoff = time.time() - store.grace_seconds
+    removed = 0
+    freed = 0
+
+    cursor.execute('''
+        SELECT Sha256 FROM FileBlobs
+        WHERE RefCount <= 0 AND UpdatedAt < DATEADD(second, -?, GETDATE())
+    ''', (store.grace_seconds,))
+    for (sha256,) in cursor.fetchall():
+        path = store.blob_path(sha256)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            stat = None
+        if stat is not None and stat.st_mtime > cutoff:
+            continue  # re-uploaded recently, a new reference is on its way
+        cursor.execute("DELETE FROM FileBlobs WHERE Sha256 = ? AND RefCount <= 0", (sha256,))
+        deleted = cursor.rowcount
+        conn.commit()
+        if deleted and stat is not None:
+            path.unlink(missing_ok=True)
+            removed += 1
+            freed += stat.st_size + store.remove_derivatives(sha256)
+
+    orphans = []
+    if store.blob_root.exists():
+        for path in store.blob_root.glob("*/*/*"):
+            if not path.is_file() or path.stat().st_mtime >= cutoff:
+                continue
+            if "." not in path.name:
+                orphans.append(path)
+            elif path.name.endswith(".tmp") or not store.blob_path(path.name.split(".")[0]).exists():
+                # A derivative whose blob went while it was being made
+                freed += path.stat().st_size
+                path.unlink(missing_ok=True)
+    for i in range(0, len(orphans), 500):
+        batch = orphans[i:i + 500]
+        cursor.execute(
+            f"SELECT Sha256 FROM FileBlobs WHERE Sha256 IN ({', '.join('?' * len(batch))})",
+            [p.name for p in batch],
+        )
+        known = {row[0] for row in cursor.fetchall()}
+        for path in batch:
+            if path.name not in known:
+                size = path.stat().st_size
+                path.unlink(missing_ok=True)
+                removed += 1
+                freed += size + store.remove_derivatives(path.name)
+    conn.commit()
+    return {"blobs_removed": removed, "bytes_freed": freed}
+
+
+def remove_blobs(conn, store, sha256s, released_at):
+    # Deletes those of the given blobs that nothing references any more,
+    # right away rather than after collect_garbage's grace period. put()
+    # touches a blob it finds already stored, so one modified shortly before
+    # or after released_at may be uploaded again: its row goes (the pending
+    # link_file re-creates it) but the file stays.
+    cursor = conn.cursor()
+    removed = 0
+    freed = 0
+    sha256s = sorted(set(sha256s))
+    for i in range(0, len(sha256s), 500):
+        batch = sha256s[i:i + 500]
+        cursor.execute(
+            f"DELETE FROM FileBlobs OUTPUT deleted.Sha256 "
+            f"WHERE RefCount <= 0 AND Sha256 IN ({', '.join('?' * len(batch))})",
+            batch,
+        )
+        deleted = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        for sha256 in deleted:
+            path = store.blob_path(sha256)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime >= released_at - IN_FLIGHT_SECONDS:
+                continue
+            path.unlink(missing_ok=True)
+            removed += 1
+            freed += stat.st_size + store.remove_derivatives(sha256)
+    return {"blobs_removed": removed, "bytes_freed": freed}
+
+
+def adopt_legacy_files(conn, store):
+    # Moves files saved before the blob store (uploads/<user_id>/<name>) into
+    # it, deduplicating identical content, and normalizes stored paths to the
+    # forward-slash logical form.
+    cursor = conn.cursor()
+    adopted = 0
+    deduplicated = 0
+    for user_dir in sorted(store.root.iterdir()):
+        if not user_dir.is_dir() or not user_dir.name.isdigit():
+            continue
+        for file in sorted(user_dir.iterdir()):
+            if not file.is_file():
+                continue
+            hasher = hashlib.sha256()
+            with open(file, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    hasher.update(chunk)
+            sha256 = hasher.hexdigest()
+            size = file.stat().st_size
+            _, created = store.put(file, sha256)
+            content_type = "application/pdf" if file.suffix.lower() == ".pdf" else None
+            link_file(cursor, logical_path(user_dir.name, file.name), sha256, size, int(user_dir.name), content_type)
+            conn.commit()
+            adopted += 1
+            deduplicated += 0 if created else 1
+    cursor.execute("UPDATE TaskAssignments SET SubmissionPath = REPLACE(SubmissionPath, '\\', '/') WHERE SubmissionPath LIKE '%\\%'")
+    cursor.execute("UPDATE InternshipApplications SET ResumePath = REPLACE(ResumePath, '\\', '/') WHERE ResumePath LIKE '%\\%'")
+    conn.commit()
+    return {"files_adopted": adopted, "duplicates_removed": deduplicated}
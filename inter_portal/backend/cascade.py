@@ -0,0 +1,68 @@
+from blobstore import unlink_files
+from progress import affected_internees, refresh_progress
+from sync import record_deletes
+
+# Deletes of internships and tasks. Their tasks, assignments and applications
+# go with them through the ON DELETE CASCADE keys of migration 7, in the one
+# DELETE statement. What the cascade cannot do, releasing the uploads those
+# rows reference, recounting progress and leaving tombstones for delta sync
+# (sync.py), is set-based too, around it. Each function is a single
+# AsyncConnection.run call, so the transaction holds its locks for a handful
+# of index seeks rather than a chain of event loop round-trips. Committing is
+# left to the caller.
+
+
+def remove_internship(cursor, internship_id):
+    # Returns None when there is no such internship, else a dict with the
+    # deleted row, its task ids, the internees whose tasks went and the
+    # blob hashes released (see blobstore.remove_blobs)
+    cursor.execute('''
+        SELECT InternshipId, Title, Description FROM Internships WITH (UPDLOCK, HOLDLOCK)
+        WHERE InternshipId = ?
+    ''', (internship_id,))
+    internship = cursor.fetchone()
+    if internship is None:
+        return None
+    cursor.execute("SELECT TaskId FROM Tasks WHERE InternshipId = ?", (internship_id,))
+    task_ids = [row[0] for row in cursor.fetchall()]
+    internees = affected_internees(cursor, '''
+        SELECT DISTINCT ta.InterneeId FROM TaskAssignments ta JOIN Tasks t ON t.TaskId = ta.TaskId
+        WHERE t.InternshipId = ?
+    ''', (internship_id,))
+    released = unlink_files(cursor, '''
+        SELECT ta.SubmissionPath FROM TaskAssignments ta JOIN Tasks t ON t.TaskId = ta.TaskId
+        WHERE t.InternshipId = ? AND ta.SubmissionPath IS NOT NULL
+        UNION SELECT ResumePath FROM InternshipApplications
+        WHERE InternshipId = ? AND ResumePath IS NOT NULL
+    ''', (internship_id, internship_id))
+    record_deletes(cursor, '''
+        SELECT 'Internships', ?, NULL
+        UNION ALL SELECT 'Tasks', TaskId, NULL FROM Tasks WHERE InternshipId = ?
+        UNION ALL SELECT 'TaskAssignments', ta.TaskId, ta.InterneeId
+            FROM TaskAssignments ta JOIN Tasks t ON t.TaskId = ta.TaskId WHERE t.InternshipId = ?
+        UNION ALL SELECT 'InternshipApplications', ApplicationId, InterneeId
+            FROM InternshipApplications WHERE InternshipId = ?
+    ''', (internship_id, internship_id, internship_id, internship_id))
+    cursor.execute("DELETE FROM Internships WHERE InternshipId = ?", (internship_id,))
+    refresh_progress(cursor, internees)
+    return {"internship": internship, "task_ids": task_ids, "internees": internees, "released": released}
+
+
+def remove_task(cursor, task_id):
+    # Returns None when there is no such task, else a dict with the
+    # internees it was assigned to and the blob hashes released
+    cursor.execute("SELECT TaskId FROM Tasks WITH (UPDLOCK, HOLDLOCK) WHERE TaskId = ?", (task_id,))
+    if cursor.fetchone() is None:
+        return None
+    internees = affected_internees(cursor, "SELECT DISTINCT InterneeId FROM TaskAssignments WHERE TaskId = ?",
+                                   (task_id,))
+    released = unlink_files(cursor, '''
+        SELECT SubmissionPath FROM TaskAssignments WHERE TaskId = ? AND SubmissionPath IS NOT NULL
+    ''', (task_id,))
+    record_deletes(cursor, '''
+        SELECT 'Tasks', ?, NULL
+        UNION ALL SELECT 'TaskAssignments', TaskId, InterneeId FROM TaskAssignments WHERE TaskId = ?
+    ''', (task_id, task_id))
+    cursor.execute("DELETE FROM Tasks WHERE TaskId = ?", (task_id,))
+    refresh_progress(cursor, internees)
+    return {"internees": internees, "released": released}
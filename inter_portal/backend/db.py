@@ -0,0 +1,154 @@
+import asyncio
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.concurrency import run_in_threadpool
+
+
+class QueryTimeout(Exception):
+    pass
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+def _cancel(raw_conn, cursor):
+    # pyodbc cursors support SQLCancel; sqlite3 (used by the benchmarks) only
+    # has a connection-wide interrupt.
+    try:
+        if hasattr(cursor, "cancel"):
+            cursor.cancel()
+        elif hasattr(raw_conn, "interrupt"):
+            raw_conn.interrupt()
+    except Exception as e:
+        print(f"Query cancel error: {e}")
+
+
+class AsyncConnection:
+    # Awaitable wrapper around a pooled DB-API connection. Every call runs on
+    # the Database's dedicated executor, is bounded by the query timeout and is
+    # cancelled when the client that issued the request goes away.
+    def __init__(self, database, raw, request=None):
+        self.database = database
+        self.raw = raw
+        self.request = request
+
+    async def _run(self, fn, *args, cursor=None):
+        loop = asyncio.get_running_loop()
+        owns_cursor = cursor is None
+        if owns_cursor:
+            cursor = self.raw.cursor()
+        started = loop.time()
+        future = loop.run_in_executor(self.database.executor, fn, cursor, *args)
+        deadline = started + self.database.query_timeout
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                done, _ = await asyncio.wait(
+                    {future}, timeout=max(0.0, min(remaining, self.database.poll_interval))
+                )
+                if done:
+                    return future.result()
+                if remaining <= 0:
+                    error = QueryTimeout(
+                        f"Query exceeded {self.database.query_timeout:g}s timeout"
+                    )
+                elif self.request is not None and await self.request.is_disconnected():
+                    error = ClientDisconnected("Client disconnected during query")
+                else:
+                    continue
+                _cancel(self.raw, cursor)
+                # Wait for the worker thread so the connection is idle before
+                # it is handed back to the pool.
+                await asyncio.wait({future})
+                raise error
+        except asyncio.CancelledError:
+            _cancel(self.raw, cursor)
+            await asyncio.wait({future})
+            raise
+        finally:
+            if self.database.on_query is not None:
+                self.database.on_query(loop.time() - started)
+            if future.done() and not future.cancelled():
+                future.exception()  # mark retrieved
+            if owns_cursor:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+    async def execute(self, sql, params=()):
+        def work(cursor):
+            cursor.execute(sql, params)
+            return cursor.rowcount
+        return await self._run(work)
+
+    async def fetchone(self, sql, params=()):
+        def work(cursor):
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+        return await self._run(work)
+
+    async def fetchall(self, sql, params=()):
+        def work(cursor):
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        return await self._run(work)
+
+    async def stream(self, sql, params=(), batch_size=1000):
+        # Async generator of row batches read with fetchmany, so a result set
+        # is never materialized in full. Each round-trip gets its own timeout.
+        cursor = self.raw.cursor()
+        try:
+            await self._run(lambda c: c.execute(sql, params), cursor=cursor)
+            while True:
+                rows = await self._run(lambda c: c.fetchmany(batch_size), cursor=cursor)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    async def run(self, fn, *args):
+        # Run fn(cursor, *args) on the executor, for multi-statement work that
+        # should not bounce through the event loop between statements.
+        return await self._run(fn, *args)
+
+    async def commit(self):
+        await self._run(lambda cursor: self.raw.commit())
+
+    async def rollback(self):
+        await self._run(lambda cursor: self.raw.rollback())
+
+
+class Database:
+    # Ties the connection pool to a bounded executor reserved for queries.
+    # Pool checkouts wait on the default threadpool instead, so requests queued
+    # for a connection can never starve the threads running queries.
+    # on_query(seconds), if given, is called on the event loop after each call.
+    def __init__(self, pool, max_workers=None, query_timeout=30.0, poll_interval=0.25, on_query=None):
+        self.pool = pool
+        self.query_timeout = query_timeout
+        self.poll_interval = poll_interval
+        self.on_query = on_query
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or pool.max_size, thread_name_prefix="db"
+        )
+
+    async def acquire(self, request=None):
+        raw = await run_in_threadpool(self.pool.acquire)
+        if hasattr(raw, "timeout"):
+            # Server-side guard in case the client-side cancel is lost
+            raw.timeout = int(math.ceil(self.query_timeout))
+        return AsyncConnection(self, raw, request)
+
+    async def release(self, conn, discard=False):
+        await run_in_threadpool(self.pool.release, conn.raw, discard)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.pool.close()
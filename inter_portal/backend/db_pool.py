@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    # Thread-safe pool of DB-API connections (pyodbc in practice).
+    # Connections are validated on borrow when they have been idle for longer
+    # than `validate_after` seconds and are recycled once they are older than
+    # `max_lifetime` seconds.
+    def __init__(
+        self,
+        connect,
+        min_size=2,
+        max_size=10,
+        checkout_timeout=5.0,
+        max_lifetime=1800.0,
+        validate_after=30.0,
+        validation_query="SELECT 1",
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size configuration")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.max_lifetime = max_lifetime
+        self.validate_after = validate_after
+        self.validation_query = validation_query
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conn, created_at, last_used_at), most recent on the right
+        self._created_at = {}  # id(conn) -> created_at for checked-out connections
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+
+        # Counters exposed through stats()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._connects = 0
+        self._connect_errors = 0
+        self._recycled = 0
+        self._validation_failures = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # Connection lifecycle helpers
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._connect_errors += 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._connects += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _is_valid(self, conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.validation_query)
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def warm(self):
+        # Open connections until the pool holds min_size of them
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            conn = self._open()
+            now = time.monotonic()
+            with self._cond:
+                self._idle.append((conn, now, now))
+                self._cond.notify()
+
+    def acquire(self, timeout=None):
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        while True:
+            entry = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeout("Connection pool is closed")
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"Timed out after {timeout:.1f}s waiting for a database connection"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+            now = time.monotonic()
+            if entry is None:
+                conn = self._open()
+                created_at = now
+            else:
+                conn, created_at, last_used_at = entry
+                if now - created_at > self.max_lifetime:
+                    with self._cond:
+                        self._recycled += 1
+                    self._discard(conn)
+                    continue
+                if now - last_used_at > self.validate_after and not self._is_valid(conn):
+                    with self._cond:
+                        self._validation_failures += 1
+                    self._discard(conn)
+                    continue
+
+            waited = time.monotonic() - start
+            with self._cond:
+                self._created_at[id(conn)] = created_at
+                self._checkouts += 1
+                self._wait_total += waited
+                if waited > self._wait_max:
+                    self._wait_max = waited
+            return conn
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            created_at = self._created_at.pop(id(conn), None)
+        if created_at is None:
+            return
+        if not discard:
+            try:
+                # Never hand uncommitted work to the next borrower
+                conn.rollback()
+            except Exception:
+                discard = True
+        now = time.monotonic()
+        if discard or self._closed or now - created_at > self.max_lifetime:
+            if not discard and not self._closed:
+                with self._cond:
+                    self._recycled += 1
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, created_at, now))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._size - idle,
+                "idle": idle,
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "connects": self._connects,
+                "connect_errors": self._connect_errors,
+                "recycled": self._recycled,
+                "validation_failures": self._validation_failures,
+                "wait_time_total_ms": round(self._wait_total * 1000, 3),
+                "wait_time_avg_ms": round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                "wait_time_max_ms": round(self._wait_max * 1000, 3),
+            }
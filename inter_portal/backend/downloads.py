@@ -0,0 +1,60 @@
+import hashlib
+import hmac
+import time
+from urllib.parse import quote
+
+from starlette.responses import FileResponse, Response
+
+# Conditional, range-capable file responses and short-lived signed URLs for
+# /files. Range/If-Range handling and zero-copy transfer (the ASGI pathsend
+# extension, where the server offers it) come from Starlette's FileResponse.
+
+
+# Expiry times are rounded up to a multiple of this, so the same file gets
+# the same URL (and browser cache entry) across list fetches
+EXPIRY_STEP = 300
+
+
+def sign(secret, path, sha256, expires, variant=None):
+    message = f"{path}\n{sha256}\n{expires}"
+    if variant:
+        message += f"\n{variant}"
+    return hmac.new(secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def signed_url(secret, path, sha256, ttl, variant=None):
+    # Pins the content hash so the URL stays valid (and cacheable) for exactly
+    # that content, and needs no database lookup to serve. variant names a
+    # derivative of it instead (see previews.py).
+    step = min(EXPIRY_STEP, max(1, int(ttl)))
+    expires = -(-(int(time.time()) + int(ttl)) // step) * step
+    url = f"/files/{quote(path)}?h={sha256}&expires={expires}"
+    if variant:
+        url += f"&v={variant}"
+    return f"{url}&sig={sign(secret, path, sha256, expires, variant)}"
+
+
+def verify_signature(secret, path, sha256, expires, sig, variant=None):
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sign(secret, path, sha256, expires, variant), sig)
+
+
+def etag_matches(if_none_match, etag):
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def file_response(request, path, stat_result, etag, cache_control, filename=None):
+    headers = {"cache-control": cache_control, "etag": etag}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        path, headers=headers, filename=filename,
+        stat_result=stat_result, content_disposition_type="inline",
+    )
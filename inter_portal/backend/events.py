@@ -0,0 +1,146 @@
+import asyncio
+import itertools
+import json
+import time
+import uuid
+from collections import deque, namedtuple
+
+# In-process fan-out hub for Server-Sent Events. Subscribers listen on
+# channels ("user:42", "role:admin"); every event gets an id of the form
+# "<boot>-<seq>" and is kept in a short per-channel history, so a client that
+# reconnects with Last-Event-ID gets what it missed. When that is not possible
+# (another process, history exhausted, slow consumer) it is told to resync,
+# i.e. refetch, instead. An idle connection costs one small queue.
+
+Event = namedtuple("Event", "seq id type data published_at")
+
+
+class _Subscription:
+    __slots__ = ("channels", "queue", "overflowed")
+
+    def __init__(self, channels, queue_size):
+        self.channels = channels
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+
+def format_event(event):
+    return f"id: {event.id}\nevent: {event.type}\ndata: {event.data}\n\n".encode("utf-8")
+
+
+class EventHub:
+    def __init__(self, history=50, queue_size=100, heartbeat=15.0, max_connections=10000):
+        self.boot = uuid.uuid4().hex[:8]
+        self.history = history
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.max_connections = max_connections
+        self._seq = itertools.count(1)
+        self._subscribers = {}  # channel -> set of _Subscription
+        self._history = {}  # channel -> deque of Event
+        self._connections = 0
+        self.peak_connections = 0
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+        self.resyncs = 0
+
+    def publish(self, channels, event_type, data):
+        # Call from the event loop, after the change is committed
+        seq = next(self._seq)
+        event = Event(
+            seq, f"{self.boot}-{seq}", event_type,
+            json.dumps(data, separators=(",", ":"), default=str), time.time(),
+        )
+        self.published += 1
+        for channel in set(channels):
+            history = self._history.get(channel)
+            if history is None:
+                history = self._history[channel] = deque(maxlen=self.history)
+            history.append(event)
+            for sub in self._subscribers.get(channel, ()):
+                if sub.overflowed:
+                    continue
+                try:
+                    sub.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # Too slow to keep up; it gets a resync and is closed
+                    sub.overflowed = True
+                    self.overflows += 1
+        return event
+
+    def _backlog(self, channels, last_event_id):
+        # Events after last_event_id on these channels, or None when the gap
+        # cannot be filled from history.
+        boot, _, seq = (last_event_id or "").partition("-")
+        if boot != self.boot or not seq.isdigit():
+            return None
+        last_seq = int(seq)
+        missed = []
+        for channel in channels:
+            history = self._history.get(channel)
+            if not history:
+                continue
+            if history.maxlen == len(history) and history[0].seq > last_seq + 1:
+                return None  # older events already dropped
+            missed.extend(e for e in history if e.seq > last_seq)
+        missed.sort(key=lambda e: e.seq)
+        return [e for i, e in enumerate(missed) if i == 0 or e.seq != missed[i - 1].seq]
+
+    @property
+    def at_capacity(self):
+        return self._connections >= self.max_connections
+
+    async def stream(self, channels, last_event_id=None):
+        # Async generator of SSE-encoded bytes for one client; check
+        # at_capacity before starting a response with it.
+        # Backlog and registration happen with no await in between, so every
+        # event is sent exactly once: from history or from the queue.
+        sub = _Subscription(tuple(channels), self.queue_size)
+        backlog = self._backlog(sub.channels, last_event_id) if last_event_id else []
+        for channel in sub.channels:
+            self._subscribers.setdefault(channel, set()).add(sub)
+        self._connections += 1
+        self.peak_connections = max(self.peak_connections, self._connections)
+        try:
+            yield f"retry: 5000\n: connected {self.boot}\n\n".encode("utf-8")
+            if backlog is None:
+                self.resyncs += 1
+                yield b"event: resync\ndata: {}\n\n"
+            else:
+                for event in backlog:
+                    self.delivered += 1
+                    yield format_event(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    if sub.overflowed:
+                        break
+                    yield b": ping\n\n"
+                    continue
+                self.delivered += 1
+                yield format_event(event)
+                if sub.overflowed and sub.queue.empty():
+                    break
+            self.resyncs += 1
+            yield b"event: resync\ndata: {}\n\n"
+        finally:
+            for channel in sub.channels:
+                subs = self._subscribers.get(channel)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subscribers[channel]
+            self._connections -= 1
+
+    def stats(self):
+        return {
+            "connections": self._connections,
+            "peak_connections": self.peak_connections,
+            "channels": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+            "resyncs": self.resyncs,
+        }
@@ -0,0 +1,44 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+async def ndjson_chunks(batches, columns):
+    # One encoded chunk per fetched batch; the ASGI server awaits each send,
+    # so a slow client throttles how fast rows are read from the database.
+    async for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default, separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+
+async def csv_chunks(batches, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [v.isoformat() if isinstance(v, (datetime, date)) else v for v in row] for row in rows
+        )
+        yield buffer.getvalue().encode("utf-8")
+
+
+def export_chunks(fmt, batches, columns):
+    # Returns (chunk generator, media type) for fmt in {"ndjson", "csv"}
+    if fmt == "csv":
+        return csv_chunks(batches, columns), CSV_MEDIA_TYPE
+    return ndjson_chunks(batches, columns), NDJSON_MEDIA_TYPE
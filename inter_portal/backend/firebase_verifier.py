@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import jwt
+from cryptography import x509
+
+from cache import TTLCache
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+
+
+class InvalidIdTokenError(Exception):
+    pass
+
+
+class KeyFetchError(Exception):
+    pass
+
+
+def fetch_google_keys(url=GOOGLE_CERTS_URL, timeout=10):
+    # Returns ({kid: pem_certificate}, max_age_seconds) honouring Cache-Control
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            certs = json.loads(response.read().decode("utf-8"))
+            cache_control = response.headers.get("Cache-Control", "")
+    except Exception as e:
+        raise KeyFetchError(f"Failed to fetch Firebase signing keys: {e}")
+    match = re.search(r"max-age=(\d+)", cache_control)
+    max_age = int(match.group(1)) if match else 3600
+    return certs, max_age
+
+
+class FirebaseTokenVerifier:
+    # Verifies Firebase ID tokens locally. Signing keys are kept in memory and
+    # refreshed in the background before their Cache-Control max-age runs out;
+    # RSA checks run on a small executor and verified tokens are cached until
+    # shortly before they expire. `fetch_keys` can be swapped for a local key
+    # set to run offline. project_id may be a callable, resolved on first use.
+    def __init__(
+        self,
+        project_id,
+        fetch_keys=fetch_google_keys,
+        token_cache_size=10000,
+        token_cache_ttl=300.0,
+        refresh_margin=300.0,
+        min_refresh_interval=60.0,
+        leeway=5,
+        max_workers=2,
+    ):
+        self._project_id = project_id
+        self.fetch_keys = fetch_keys
+        self.refresh_margin = refresh_margin
+        self.min_refresh_interval = min_refresh_interval
+        self.leeway = leeway
+        self.token_cache = TTLCache(maxsize=token_cache_size, ttl=token_cache_ttl)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="firebase-verify")
+        self._keys = {}
+        self._keys_expire_at = 0.0
+        self._last_refresh = 0.0
+        self._refresh_lock = None
+        self._refresh_task = None
+        self.verifications = 0
+        self.failures = 0
+        self.key_refreshes = 0
+        self.key_refresh_failures = 0
+
+    @property
+    def project_id(self):
+        if callable(self._project_id):
+            self._project_id = self._project_id()
+        return self._project_id
+
+    @property
+    def issuer(self):
+        return f"https://securetoken.google.com/{self.project_id}"
+
+    async def refresh_keys(self):
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        started = time.monotonic()
+        async with self._refresh_lock:
+            # Another request may have refreshed while we waited for the lock
+            if self._keys and self._last_refresh >= started:
+                return
+            loop = asyncio.get_running_loop()
+            try:
+                certs, max_age = await loop.run_in_executor(self._executor, self.fetch_keys)
+                keys = {
+                    kid: x509.load_pem_x509_certificate(pem.encode("utf-8")).public_key()
+                    for kid, pem in certs.items()
+                }
+            except Exception as e:
+                self.key_refresh_failures += 1
+                print(f"Firebase key refresh error: {e}")
+                raise
+            self._keys = keys
+            self._keys_expire_at = time.monotonic() + max_age
+            self._last_refresh = time.monotonic()
+            self.key_refreshes += 1
+
+    async def _refresh_loop(self):
+        while True:
+            delay = max(30.0, self._keys_expire_at - time.monotonic() - self.refresh_margin)
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh_keys()
+            except Exception:
+                # Keep serving with the current keys and retry shortly
+                await asyncio.sleep(30.0)
+
+    async def start(self):
+        try:
+            await self.refresh_keys()
+        except Exception:
+            pass  # retried on demand by verify()
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        self._executor.shutdown(wait=False)
+
+    def _decode(self, token, key):
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=["RS256"],
+            audience=self.project_id,
+            issuer=self.issuer,
+            leeway=self.leeway,
+            options={"require": ["exp", "iat", "aud", "iss", "sub"]},
+        )
+        if not claims.get("sub") or len(claims["sub"]) > 128:
+            raise InvalidIdTokenError("Firebase ID token has an invalid subject")
+        if claims.get("auth_time", 0) > time.time() + self.leeway:
+            raise InvalidIdTokenError("Firebase ID token has a future auth_time")
+        claims["uid"] = claims["sub"]
+        return claims
+
+    async def verify(self, token):
+        cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+        claims = self.token_cache.get(cache_key)
+        if claims is not None and claims["exp"] > time.time():
+            return dict(claims)
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            self.failures += 1
+            raise InvalidIdTokenError(f"Malformed Firebase ID token: {e}")
+        kid = header.get("kid")
+        if header.get("alg") != "RS256" or not kid:
+            self.failures += 1
+            raise InvalidIdTokenError("Firebase ID token has an unexpected header")
+
+        now = time.monotonic()
+        if now >= self._keys_expire_at or (
+            kid not in self._keys and now - self._last_refresh >= self.min_refresh_interval
+        ):
+            # Unknown kids only trigger a refetch once per interval, so forged
+            # tokens cannot turn into a stream of certificate downloads.
+            try:
+                await self.refresh_keys()
+            except Exception:
+                if kid not in self._keys:
+                    raise
+                # Google rotates keys well before retiring them; keep going
+                # with the cached set until the next refresh succeeds.
+        key = self._keys.get(kid)
+        if key is None:
+            self.failures += 1
+            raise InvalidIdTokenError("Firebase ID token signed with an unknown key")
+
+        loop = asyncio.get_running_loop()
+        try:
+            claims = await loop.run_in_executor(self._executor, self._decode, token, key)
+        except jwt.PyJWTError as e:
+            self.failures += 1
+            raise InvalidIdTokenError(f"Invalid Firebase ID token: {e}")
+        except InvalidIdTokenError:
+            self.failures += 1
+            raise
+        self.verifications += 1
+        ttl = min(self.token_cache.ttl, claims["exp"] - time.time())
+        if ttl > 0:
+            self.token_cache.set(cache_key, claims, ttl=ttl)
+        return dict(claims)
+
+    def stats(self):
+        return {
+            "keys": len(self._keys),
+            "keys_expire_in_seconds": round(max(0.0, self._keys_expire_at - time.monotonic()), 1),
+            "key_refreshes": self.key_refreshes,
+            "key_refresh_failures": self.key_refresh_failures,
+            "verifications": self.verifications,
+            "failures": self.failures,
+            "token_cache": self.token_cache.stats(),
+        }
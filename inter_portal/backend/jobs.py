@@ -0,0 +1,286 @@
+import asyncio
+import inspect
+import json
+import random
+import time
+from collections import deque
+
+from starlette.concurrency import run_in_threadpool
+
+# Persistent background jobs in the Jobs table (migration 8). A handler calls
+# enqueue() on its own cursor, so the job is committed together with the
+# write that asked for it (or not at all), then JobQueue.notify() to wake a
+# worker instead of waiting for the next poll.
+#
+# Workers claim the highest-priority due job with READPAST, so any number of
+# workers and processes can share the table. A claim is a lease: a job whose
+# worker died goes back to the queue once LockedUntil has passed. A failing
+# job is retried with exponential backoff until it has used MaxAttempts, then
+# kept as failed for inspection. Finished jobs are purged after the retention
+# period; until then their idempotency keys still deduplicate.
+
+LATENCY_SAMPLES = 1000
+
+
+def enqueue(cursor, kind, payload, priority=0, idempotency_key=None, max_attempts=5, delay=0):
+    # Returns the new job's id or, when a job with the same idempotency key
+    # exists, that job's id. Higher priorities run first.
+    cursor.execute('''
+        INSERT INTO Jobs (Kind, Payload, Priority, IdempotencyKey, MaxAttempts, RunAt)
+        OUTPUT inserted.JobId
+        SELECT ?, ?, ?, ?, ?, DATEADD(second, ?, GETDATE())
+        WHERE NOT EXISTS (SELECT 1 FROM Jobs WITH (UPDLOCK, HOLDLOCK) WHERE IdempotencyKey = ?)
+    ''', (kind, json.dumps(payload), priority, idempotency_key, max_attempts, delay, idempotency_key))
+    row = cursor.fetchone()
+    if row is None:
+        cursor.execute("SELECT JobId FROM Jobs WHERE IdempotencyKey = ?", (idempotency_key,))
+        row = cursor.fetchone()
+    return row[0]
+
+
+def claim(cursor, kinds, lease_seconds):
+    # (job_id, kind, payload, attempts, max_attempts, wait_ms) for the next
+    # due job of one of `kinds`, now leased to the caller; None when idle.
+    # The UPDATE rechecks the status, so a job is never handed out twice even
+    # where the lock hints are not honoured.
+    if not kinds:
+        return None
+    while True:
+        cursor.execute(f'''
+            SELECT TOP 1 JobId, DATEDIFF(millisecond, RunAt, GETDATE())
+            FROM Jobs WITH (UPDLOCK, READPAST, ROWLOCK)
+            WHERE Status = 'queued' AND RunAt <= GETDATE() AND Kind IN ({", ".join("?" * len(kinds))})
+            ORDER BY Priority DESC, RunAt, JobId
+        ''', list(kinds))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        job_id, wait_ms = row
+        cursor.execute('''
+            UPDATE Jobs
+            SET Status = 'running', Attempts = Attempts + 1, StartedAt = GETDATE(),
+                LockedUntil = DATEADD(second, ?, GETDATE())
+            OUTPUT inserted.Kind, inserted.Payload, inserted.Attempts, inserted.MaxAttempts
+            WHERE JobId = ? AND Status = 'queued'
+        ''', (lease_seconds, job_id))
+        row = cursor.fetchone()
+        if row is not None:
+            kind, payload, attempts, max_attempts = row
+            return job_id, kind, json.loads(payload), attempts, max_attempts, wait_ms
+
+
+def complete(cursor, job_id):
+    cursor.execute('''
+        UPDATE Jobs SET Status = 'done', FinishedAt = GETDATE(), LockedUntil = NULL, LastError = NULL
+        WHERE JobId = ?
+    ''', (job_id,))
+
+
+def fail(cursor, job_id, error, retry_in=None):
+    # Requeues the job retry_in seconds from now, or marks it failed for good
+    if retry_in is None:
+        cursor.execute('''
+            UPDATE Jobs SET Status = 'failed', FinishedAt = GETDATE(), LockedUntil = NULL, LastError = ?
+            WHERE JobId = ?
+        ''', (error[:2000], job_id))
+    else:
+        cursor.execute('''
+            UPDATE Jobs SET Status = 'queued', RunAt = DATEADD(second, ?, GETDATE()), LockedUntil = NULL,
+                LastError = ?
+            WHERE JobId = ?
+        ''', (retry_in, error[:2000], job_id))
+
+
+def requeue_expired(cursor):
+    # Jobs whose lease ran out (their worker died); the lost run counts as an attempt
+    cursor.execute('''
+        UPDATE Jobs
+        SET Status = CASE WHEN Attempts >= MaxAttempts THEN 'failed' ELSE 'queued' END,
+            FinishedAt = CASE WHEN Attempts >= MaxAttempts THEN GETDATE() ELSE NULL END,
+            RunAt = GETDATE(), LockedUntil = NULL, LastError = 'Lease expired'
+        WHERE Status = 'running' AND LockedUntil < GETDATE()
+    ''')
+    return cursor.rowcount
+
+
+def purge_finished(cursor, retention_seconds):
+    cursor.execute('''
+        DELETE FROM Jobs
+        WHERE Status IN ('done', 'failed') AND FinishedAt < DATEADD(second, -?, GETDATE())
+    ''', (retention_seconds,))
+    return cursor.rowcount
+
+
+def queue_depth(cursor):
+    # [{kind, status, jobs, oldest_seconds}] for everything not yet done
+    cursor.execute('''
+        SELECT Kind, Status, COUNT(*), DATEDIFF(second, MIN(RunAt), GETDATE())
+        FROM Jobs
+        WHERE Status IN ('queued', 'running', 'failed')
+        GROUP BY Kind, Status
+        ORDER BY Kind, Status
+    ''')
+    return [
+        {"kind": kind, "status": job_status, "jobs": count, "oldest_seconds": max(0, oldest or 0)}
+        for kind, job_status, count, oldest in cursor.fetchall()
+    ]
+
+
+def _percentiles(samples):
+    if not samples:
+        return None
+    values = sorted(samples)
+    return {
+        "p50": round(values[len(values) // 2], 1),
+        "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 1),
+        "max": round(values[-1], 1),
+    }
+
+
+class _KindStats:
+    __slots__ = ("succeeded", "retried", "failed", "wait_ms", "run_ms")
+
+    def __init__(self):
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.wait_ms = deque(maxlen=LATENCY_SAMPLES)  # due -> claimed
+        self.run_ms = deque(maxlen=LATENCY_SAMPLES)
+
+
+class JobQueue:
+    # Worker pool for this process. Handlers take the job's payload; plain
+    # functions run in the threadpool, coroutine functions on the event loop.
+    def __init__(
+        self,
+        pool,
+        workers=2,
+        poll_interval=2.0,
+        lease_seconds=300,
+        retry_base=10.0,
+        retry_max=3600.0,
+        retention_seconds=7 * 86400,
+        maintenance_interval=60.0,
+    ):
+        self.pool = pool
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.retention_seconds = retention_seconds
+        self.maintenance_interval = maintenance_interval
+        self.handlers = {}
+        self.running = 0
+        self._stats = {}
+        self._wake = None
+        self._tasks = []
+
+    def handler(self, kind):
+        # @job_queue.handler("blobs.remove")
+        def register(fn):
+            self.handlers[kind] = fn
+            self._stats[kind] = _KindStats()
+            return fn
+        return register
+
+    def notify(self):
+        # Call after committing an enqueue
+        if self._wake is not None:
+            self._wake.set()
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._maintain()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def _db(self, fn, *args):
+        with self.pool.connection() as conn:
+            result = fn(conn.cursor(), *args)
+            conn.commit()
+            return result
+
+    def retry_delay(self, attempts):
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        return round(delay * random.uniform(0.5, 1.0), 1)
+
+    async def _work(self):
+        while True:
+            try:
+                job = await run_in_threadpool(self._db, claim, list(self.handlers), self.lease_seconds)
+            except Exception as e:
+                print(f"Job claim error: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+            await self._run(*job)
+
+    async def _run(self, job_id, kind, payload, attempts, max_attempts, wait_ms):
+        stats = self._stats[kind]
+        stats.wait_ms.append(wait_ms)
+        handler = self.handlers[kind]
+        self.running += 1
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(handler):
+                await handler(payload)
+            else:
+                await run_in_threadpool(handler, payload)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            self.running -= 1
+            stats.run_ms.append((time.perf_counter() - started) * 1000)
+        try:
+            if error is None:
+                await run_in_threadpool(self._db, complete, job_id)
+                stats.succeeded += 1
+            elif attempts < max_attempts:
+                await run_in_threadpool(self._db, fail, job_id, error, self.retry_delay(attempts))
+                stats.retried += 1
+            else:
+                await run_in_threadpool(self._db, fail, job_id, error)
+                stats.failed += 1
+        except Exception as e:
+            # The lease runs out and the job is retried
+            print(f"Job {job_id} bookkeeping error: {e}")
+        if error is not None:
+            print(f"Job {job_id} ({kind}) attempt {attempts}/{max_attempts} failed: {error}")
+
+    async def _maintain(self):
+        while True:
+            try:
+                await run_in_threadpool(self._db, requeue_expired)
+                await run_in_threadpool(self._db, purge_finished, self.retention_seconds)
+            except Exception as e:
+                print(f"Job maintenance error: {e}")
+            await asyncio.sleep(self.maintenance_interval)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "kinds": {
+                kind: {
+                    "succeeded": s.succeeded,
+                    "retried": s.retried,
+                    "failed": s.failed,
+                    "wait_ms": _percentiles(s.wait_ms),
+                    "run_ms": _percentiles(s.run_ms),
+                }
+                for kind, s in self._stats.items()
+            },
+        }
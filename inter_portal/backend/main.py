@@ -1,27 +1,79 @@
-from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile, Body
+from fastapi import FastAPI, HTTPException, Depends, status, Body, Request, Response, Query, Header
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from typing import Optional, List
 from pydantic import BaseModel
 import pyodbc
 import jwt
 from pathlib import Path
-import shutil
 import os
-
-# Import Firebase Admin SDK
-import firebase_admin
-from firebase_admin import auth as firebase_auth, credentials
-
-from fastapi.staticfiles import StaticFiles
+import asyncio
+import time
+import stat
+import functools
+from contextlib import AsyncExitStack, asynccontextmanager
+import json
+
+from db_pool import ConnectionPool, PoolTimeout
+from db import Database, AsyncConnection, QueryTimeout, ClientDisconnected
+from cache import TTLCache
+from result_cache import ResultCache, backend_from_url
+from events import EventHub
+from search import LiveSearchIndex, build_index, INTERNSHIP, TASK
+from metrics import Metrics, MetricsMiddleware, InstrumentedRoute, measure, record, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from firebase_verifier import FirebaseTokenVerifier, InvalidIdTokenError
+from pagination import Keyset, InvalidCursor, MAX_PAGE_SIZE, where_clause
+from export import export_chunks
+from serialization import FastJSONResponse, row_mapper
+from migrations import migrate
+from uploads import receive_upload, io_executor, UploadRejected, UploadTooLarge, UPLOAD_LIMITS
+from downloads import file_response, signed_url, verify_signature
+from assignments import bulk_assign, ASSIGNED
+from progress import refresh_progress, affected_internees, rebuild_progress
+from reviews import update_statuses, APPLICATION_STATUSES, UPDATED
+from blobstore import (BlobStore, logical_path, link_file, unlink_file, resolve_file, resolve_files,
+                       collect_garbage, remove_blobs, adopt_legacy_files)
+from cascade import remove_internship, remove_task
+from jobs import JobQueue, enqueue, queue_depth
+from previews import GENERATE_PREVIEWS, VARIANTS, queue_previews, queue_missing_previews, make_previews
+from admission import AdmissionControl, Overloaded
+from sync import PURGE_TOMBSTONES, changes as sync_changes, purge_tombstones, schedule_tombstone_purge
+
+from starlette.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 
 app = FastAPI()
+# Routes record how long serialization takes (see metrics.py)
+app.router.route_class = InstrumentedRoute
+
+# Firebase Admin SDK, initialized on first call to firebase_app() rather than
+# at import: it takes a few hundred ms to import and needs the service account
+# file, and verifying ID tokens (below) does not use it.
+FIREBASE_CREDENTIALS = os.getenv(
+    "FIREBASE_CREDENTIALS", "c:/Users/PMLS/Downloads/rentelease-77e8b-firebase-adminsdk-fbsvc-b0425f1ea8.json"
+)
 
-# Initialize Firebase Admin SDK
-cred = credentials.Certificate("c:/Users/PMLS/Downloads/rentelease-77e8b-firebase-adminsdk-fbsvc-b0425f1ea8.json")
-firebase_admin.initialize_app(cred)
+@functools.lru_cache(maxsize=None)
+def firebase_app():
+    import firebase_admin
+    from firebase_admin import credentials
+    return firebase_admin.initialize_app(credentials.Certificate(FIREBASE_CREDENTIALS))
+
+def firebase_project_id():
+    # FIREBASE_PROJECT_ID, else the service account's, read without the SDK
+    project_id = os.getenv("FIREBASE_PROJECT_ID")
+    if project_id:
+        return project_id
+    with open(FIREBASE_CREDENTIALS, encoding="utf-8") as f:
+        return json.load(f)["project_id"]
+
+# ID tokens are verified locally against Google's signing keys, which are
+# cached in memory and refreshed in the background (see warm_up).
+firebase_verifier = FirebaseTokenVerifier(
+    firebase_project_id,
+    token_cache_ttl=float(os.getenv("FIREBASE_TOKEN_CACHE_TTL", "300")),
+)
 
 # Configure CORS
 app.add_middleware(
@@ -30,22 +82,233 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor", "X-Sync-Watermark"],
 )
 
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Per-route latency, status and phase metrics, served on /metrics
+metrics = Metrics()
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+# Database connection (DB_CONNECTION_STRING overrides the local default)
+DB_CONNECTION_STRING = os.getenv(
+    "DB_CONNECTION_STRING",
+    "DRIVER={ODBC Driver 17 for SQL Server};"
+    "SERVER=DESKTOP-8BL3MIG\\SQLEXPRESS;"
+    "DATABASE=intern2;"
+    "Trusted_Connection=yes;"
+)
 
-# Database connection
 def get_db_connection():
-    conn = pyodbc.connect(
-       "DRIVER={ODBC Driver 17 for SQL Server};"
-       "SERVER=DESKTOP-8BL3MIG\\SQLEXPRESS;"
-       "DATABASE=intern2;"
-       "Trusted_Connection=yes;"
-    )
+    conn = pyodbc.connect(DB_CONNECTION_STRING)
     return conn
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Connection pool shared by all requests (sizes and timeouts come from the environment)
+db_pool = ConnectionPool(
+    get_db_connection,
+    min_size=int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+    max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+    checkout_timeout=float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", "5")),
+    max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+    validate_after=float(os.getenv("DB_POOL_VALIDATE_AFTER", "30")),
+)
+
+# Queries run on a dedicated executor sized to the pool, with a per-query timeout
+database = Database(
+    db_pool,
+    max_workers=int(os.getenv("DB_EXECUTOR_WORKERS", str(db_pool.max_size))),
+    query_timeout=float(os.getenv("DB_QUERY_TIMEOUT", "30")),
+    on_query=functools.partial(record, "db"),
+)
+metrics.gauge("db_pool_in_use", "Pooled connections checked out.", lambda: db_pool.stats()["in_use"])
+metrics.gauge("db_pool_idle", "Pooled connections idle.", lambda: db_pool.stats()["idle"])
+metrics.gauge("db_pool_waiting", "Requests waiting for a pooled connection.", lambda: db_pool.stats()["waiting"])
+
+# Background work that must survive a restart goes through the Jobs table
+# (see jobs.py); handlers are registered next to the code that enqueues them.
+job_queue = JobQueue(
+    db_pool,
+    workers=int(os.getenv("JOB_WORKERS", "2")),
+    poll_interval=float(os.getenv("JOB_POLL_SECONDS", "2")),
+    lease_seconds=int(os.getenv("JOB_LEASE_SECONDS", "300")),
+    retry_base=float(os.getenv("JOB_RETRY_BASE_SECONDS", "10")),
+    retry_max=float(os.getenv("JOB_RETRY_MAX_SECONDS", "3600")),
+    retention_seconds=int(os.getenv("JOB_RETENTION_SECONDS", str(7 * 86400))),
+)
+metrics.gauge("jobs_running", "Background jobs running in this process.", lambda: job_queue.running)
+
+# Admission control in front of the database (see admission.py). Limits are
+# "N/S" (N requests per S seconds, in bursts of N) or "0" for none, as a pair:
+# per user, and the route's total across users. Routes not listed get
+# RATE_LIMIT_USER_DEFAULT per user and no total. At most
+# ADMISSION_CONCURRENCY requests hold a connection; up to ADMISSION_MAX_QUEUE
+# more wait for ADMISSION_QUEUE_TIMEOUT seconds before being turned away.
+RATE_LIMIT_APPLY = (os.getenv("RATE_LIMIT_APPLY_USER", "5/60"), os.getenv("RATE_LIMIT_APPLY_TOTAL", "50/1"))
+RATE_LIMIT_LOGIN = (os.getenv("RATE_LIMIT_LOGIN_USER", "10/60"), os.getenv("RATE_LIMIT_LOGIN_TOTAL", "0"))
+admission = AdmissionControl(
+    limits={
+        ("POST", "/internships/{internship_id}/apply"): RATE_LIMIT_APPLY,
+        ("POST", "/internships/{internship_id}/apply_with_details"): RATE_LIMIT_APPLY,
+        ("GET", "/internships/available"): (
+            os.getenv("RATE_LIMIT_INTERNSHIPS_AVAILABLE_USER", "30/60"),
+            os.getenv("RATE_LIMIT_INTERNSHIPS_AVAILABLE_TOTAL", "0"),
+        ),
+        ("POST", "/firebase-login"): RATE_LIMIT_LOGIN,
+        ("POST", "/firebase-register"): RATE_LIMIT_LOGIN,
+    },
+    default=(os.getenv("RATE_LIMIT_USER_DEFAULT", "120/60"), "0"),
+    concurrency=int(os.getenv("ADMISSION_CONCURRENCY", str(db_pool.max_size))),
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "100")),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2")),
+    rate_limits_enabled=os.getenv("RATE_LIMITS_ENABLED", "1") == "1",
+)
+metrics.gauge("admission_in_flight", "Requests holding an admission slot.", lambda: admission.gate.active)
+metrics.gauge("admission_queue_length", "Requests waiting for an admission slot.", lambda: admission.gate.queued)
+metrics.counter("admission_shed_total", "Requests turned away by rate limits or a full admission queue.",
+                lambda: admission.shed, labels=("method", "route", "reason"))
+metrics.counter("admission_queued_total", "Requests that waited for an admission slot.",
+                lambda: admission.queued, labels=("method", "route"))
+metrics.counter("admission_queue_wait_seconds_total", "Time requests spent waiting for an admission slot.",
+                lambda: f"{admission.queue_wait_total:.6f}")
+
+def rate_limit_key(request):
+    # The caller's Firebase UID from the app's own token, which is checked so
+    # it cannot be forged; the client address without a valid one
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            firebase_uid = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("firebase_uid")
+            if firebase_uid:
+                return firebase_uid
+        except jwt.PyJWTError:
+            pass
+    return f"ip:{request.client.host if request.client else ''}"
+
+def route_key(request):
+    route = request.scope.get("route")
+    return request.method, route.path if route is not None else request.url.path
+
+def admit(request, rate_limited=True):
+    return admission.admit(*route_key(request), rate_limit_key(request), rate_limited)
+
+# Request-scoped connection: FastAPI caches dependencies per request, so
+# get_current_user and the handler share the same pooled connection.
+async def acquire_db(request: Optional[Request] = None):
+    try:
+        return await database.acquire(request)
+    except PoolTimeout as e:
+        print(f"Database pool timeout: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+# A connection for part of a request, behind admission control. Pass
+# watch=False while the body is unread (polling receive() for disconnects
+# would swallow body chunks), and rate_limited=False when the request has
+# already been counted.
+@asynccontextmanager
+async def db_connection(request: Request, rate_limited=True, watch=True):
+    async with admit(request, rate_limited):
+        conn = await acquire_db(request if watch else None)
+        try:
+            yield conn
+        finally:
+            await database.release(conn)
+
+async def get_db(request: Request):
+    # Multipart uploads are streamed by the handler after auth
+    multipart = request.headers.get("content-type", "").startswith("multipart/")
+    async with db_connection(request, watch=not multipart) as conn:
+        yield conn
+
+# Upload endpoints hold no connection while the body streams: authenticate on
+# a short-lived one, receive and store the file, then take another for the
+# transaction (upload_transaction).
+async def authenticate_upload(request: Request, token: str):
+    async with db_connection(request, watch=False) as db:
+        return await get_current_user(token, db)
+
+def upload_transaction(request: Request):
+    # Already counted against the rate limits by the request's first connection
+    return db_connection(request, rate_limited=False, watch=False)
+
+@app.exception_handler(QueryTimeout)
+async def query_timeout_handler(request: Request, exc: QueryTimeout):
+    print(f"Query timeout on {request.url.path}: {exc}")
+    return JSONResponse(status_code=status.HTTP_504_GATEWAY_TIMEOUT, content={"detail": "Database query timed out"})
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)},
+                        headers={"Retry-After": str(exc.retry_after)})
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+@app.exception_handler(UploadRejected)
+async def upload_rejected_handler(request: Request, exc: UploadRejected):
+    code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE if isinstance(exc, UploadTooLarge) else status.HTTP_400_BAD_REQUEST
+    return JSONResponse(status_code=code, content={"detail": str(exc)})
+
+@app.exception_handler(ClientDisconnected)
+async def client_disconnected_handler(request: Request, exc: ClientDisconnected):
+    # Nobody is listening any more; 499 is what nginx logs for this case
+    return JSONResponse(status_code=499, content={"detail": "Client closed request"})
+
+# Errors that already map to a status (above, or HTTPException itself);
+# catch-all except blocks re-raise these rather than answering 500
+HANDLED_ERRORS = (HTTPException, QueryTimeout, ClientDisconnected, Overloaded)
+
+# Read-through cache for hot list endpoints, invalidated by tags fired from
+# the write endpoints. Use a shared backend (e.g. sqlite:///var/cache/portal.db)
+# when running several workers so invalidations reach all of them.
+result_cache = ResultCache(
+    backend_from_url(
+        os.getenv("RESULT_CACHE_BACKEND", "memory"),
+        int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ),
+    ttls={
+        "internships:available": float(os.getenv("CACHE_TTL_INTERNSHIPS_AVAILABLE", "60")),
+        "internships:all": float(os.getenv("CACHE_TTL_INTERNSHIPS_ALL", "30")),
+        "tasks:admin": float(os.getenv("CACHE_TTL_TASKS_ADMIN", "30")),
+        # Keep well below DOWNLOAD_URL_TTL: entries carry signed submission URLs
+        "tasks:assigned": float(os.getenv("CACHE_TTL_TASKS_ASSIGNED", "30")),
+    },
+)
+
+# Push channel for task and application events (GET /events). The hub is per
+# process: with several workers, run them behind sticky sessions or expect a
+# resync event when a client reconnects to a different one.
+event_hub = EventHub(
+    history=int(os.getenv("EVENTS_HISTORY", "50")),
+    heartbeat=float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15")),
+    max_connections=int(os.getenv("EVENTS_MAX_CONNECTIONS", "10000")),
+)
+metrics.gauge("event_streams_open", "Open /events streams.", lambda: event_hub.stats()["connections"])
+
+# In-process full-text index behind /search, kept current by the write
+# endpoints and rebuilt every SEARCH_REFRESH_SECONDS so that writes made by
+# other workers show up too (0 disables the periodic rebuild).
+search_index = LiveSearchIndex()
+SEARCH_REFRESH_SECONDS = float(os.getenv("SEARCH_REFRESH_SECONDS", "300"))
+SEARCH_BUILD_BATCH_SIZE = int(os.getenv("SEARCH_BUILD_BATCH_SIZE", "5000"))
+search_refresh_task = None
+
+def load_search_index():
+    with db_pool.connection() as conn:
+        return build_index(conn, SEARCH_BUILD_BATCH_SIZE)
+
+async def refresh_search_index():
+    while True:
+        await asyncio.sleep(SEARCH_REFRESH_SECONDS)
+        try:
+            await search_index.rebuild(load_search_index)
+        except Exception as e:
+            # Keep serving the current index and try again next round
+            print(f"Search index rebuild error: {e}")
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 # JWT settings
@@ -53,81 +316,18 @@ SECRET_KEY = "JKH7FrzvIAMgQqZp8LLO4R6X5N96nZn7r5me1Te-z9Q"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Database Schema Creation
-def create_database_schema():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Users table (for both admin and internees)
-    cursor.execute('''
-        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='Users' AND xtype='U')
-        CREATE TABLE Users (
-        UserId INT PRIMARY KEY IDENTITY(1,1),
-		Name VARCHAR(100) NOT NULL,
-		FirebaseUID VARCHAR(100) UNIQUE NOT NULL,
-        Username VARCHAR(50) UNIQUE NOT NULL,
-        Password VARCHAR(100) NULL,
-        Email VARCHAR(100) UNIQUE NOT NULL,
-        Role VARCHAR(10) NOT NULL,  -- 'admin' or 'internee'
-        CreatedAt DATETIME DEFAULT GETDATE()
-        )
-    ''')
-
-    # Internships table
-    cursor.execute('''
-        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='Internships' AND xtype='U')
-        CREATE TABLE Internships (
-            InternshipId INT PRIMARY KEY IDENTITY(1,1),
-            Title VARCHAR(100) NOT NULL,
-            Description TEXT,
-            Status VARCHAR(20) NOT NULL,  -- 'available' or 'not available'
-            CreatedBy INT FOREIGN KEY REFERENCES Users(UserId),
-            CreatedAt DATETIME DEFAULT GETDATE()
-        )
-    ''')
-
-    # Tasks table
-    cursor.execute('''
-        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='Tasks' AND xtype='U')
-        CREATE TABLE Tasks (
-            TaskId INT PRIMARY KEY IDENTITY(1,1),
-            InternshipId INT FOREIGN KEY REFERENCES Internships(InternshipId),
-            Title VARCHAR(100) NOT NULL,
-            Description TEXT,
-            DueDate DATETIME,
-            CreatedBy INT FOREIGN KEY REFERENCES Users(UserId),
-            CreatedAt DATETIME DEFAULT GETDATE()
-        )
-    ''')
-
-    # InternshipApplications table
-    cursor.execute('''
-        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='InternshipApplications' AND xtype='U')
-        CREATE TABLE InternshipApplications (
-            ApplicationId INT PRIMARY KEY IDENTITY(1,1),
-            InternshipId INT FOREIGN KEY REFERENCES Internships(InternshipId),
-            InterneeId INT FOREIGN KEY REFERENCES Users(UserId),
-            Status VARCHAR(20) NOT NULL,  -- 'pending', 'approved', 'rejected'
-            AppliedAt DATETIME DEFAULT GETDATE()
-        )
-    ''')
-
-    # TaskAssignments table
-    cursor.execute('''
-        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='TaskAssignments' AND xtype='U')
-        CREATE TABLE TaskAssignments (
-            AssignmentId INT PRIMARY KEY IDENTITY(1,1),
-            TaskId INT FOREIGN KEY REFERENCES Tasks(TaskId),
-            InterneeId INT FOREIGN KEY REFERENCES Users(UserId),
-            Status VARCHAR(20) NOT NULL,  -- 'pending', 'completed', 'in_progress'
-            SubmissionPath VARCHAR(255),
-            SubmittedAt DATETIME,
-            CreatedAt DATETIME DEFAULT GETDATE()
-        )
-    ''')
+# Resolved users keyed by FirebaseUID, so authenticated requests skip the Users lookup.
+# Invalidate an entry whenever the corresponding Users row changes.
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "60")),
+)
 
-    conn.commit()
-    conn.close()
+# Database Schema Creation (versioned, see migrations.py)
+def create_database_schema(conn):
+    applied = migrate(conn)
+    if applied:
+        print(f"Schema migrated to version {applied[-1]}")
 
 # Pydantic models for request/response
 class UserBase(BaseModel):
@@ -174,9 +374,34 @@ class Task(TaskBase):
     created_by: Optional[int] = None  # Add this
     status: Optional[str] = None
     submission_path: Optional[str] = None
+    submission_url: Optional[str] = None
+    submission_thumbnail_url: Optional[str] = None
+    submission_preview_url: Optional[str] = None
+    submission_text_url: Optional[str] = None
+    assigned_count: Optional[int] = None  # set when create_task auto-assigns
     class Config:
         from_attributes = True
 
+class BulkAssignRequest(BaseModel):
+    internee_ids: List[int] = []
+    approved_applicants: bool = False  # everyone approved for the task's internship
+
+# Row mappers for the list endpoints, compiled once. Those endpoints return
+# list_response(), so their response_model only documents the shape.
+INTERNSHIP_ROW = row_mapper(Internship, internship_id=0, title=1, description=2, status=3, created_by=4,
+                            created_at=5)
+TASK_ROW = row_mapper(Task, task_id=0, title=1, description=2, internship_id=3, due_date=4, created_at=5)
+ASSIGNED_TASK_ROW = row_mapper(Task, task_id=0, title=1, description=2, internship_id=3, due_date=4, created_at=5,
+                               status=6, submission_path=7,
+                               submission_url=lambda row: download_url(row[7], row[9]),
+                               submission_thumbnail_url=lambda row: derivative_url(row[7], row[9], row[10], "thumb"),
+                               submission_preview_url=lambda row: derivative_url(row[7], row[9], row[10], "preview"),
+                               submission_text_url=lambda row: derivative_url(row[7], row[9], row[10], "text"))
+INTERNEE_ROW = row_mapper(User, user_id=0, username=1, email=2, role=3, created_at=4)
+
+def list_response(rows, next_cursor=None):
+    return FastJSONResponse(rows, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
+
 # Helper functions
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -185,8 +410,29 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    conn = None
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncConnection = Depends(get_db)):
+    with measure("auth"):
+        return await authenticate(token, db)
+
+# For endpoints answered from result_cache, and for exports, which stream
+# on a connection of their own: the user comes from user_cache, with a
+# short-lived connection only when it is not there, so a cache hit takes
+# neither a connection nor an admission slot. The request is counted against
+# the rate limits here; the handler's load() then uses
+# db_connection(request, rate_limited=False) on a miss.
+async def get_current_user_lazily(request: Request, token: str = Depends(oauth2_scheme)):
+    admission.check_rate(*route_key(request), rate_limit_key(request))
+    try:
+        firebase_uid = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("firebase_uid")
+    except jwt.PyJWTError:
+        firebase_uid = None  # authenticate() below answers 401
+    user = user_cache.get(firebase_uid) if firebase_uid else None
+    if user is not None:
+        return dict(user)
+    async with db_connection(request, rate_limited=False) as db:
+        return await get_current_user(token, db)
+
+async def authenticate(token, db):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         firebase_uid: str = payload.get("firebase_uid")
@@ -196,14 +442,15 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
                 detail="Invalid authentication credentials"
             )
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
+        user = user_cache.get(firebase_uid)
+        if user is not None:
+            return dict(user)
+
+        row = await db.fetchone("""
             SELECT UserId, Username, Email, Role, CreatedAt 
             FROM Users 
             WHERE FirebaseUID = ?
         """, (firebase_uid,))
-        row = cursor.fetchone()
         
         if row is None:
             raise HTTPException(
@@ -211,32 +458,168 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
                 detail="User not found"
             )
         
-        return {
+        user = {
             "user_id": row[0],
             "username": row[1],
             "email": row[2],
             "role": row[3],
             "created_at": row[4]
         }
-    except jwt.JWTError:
+        user_cache.set(firebase_uid, user)
+        return dict(user)
+    except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, 
             detail="Invalid authentication credentials"
         )
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         print(f"Get current user error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
-    finally:
-        if conn:
-            conn.close()
 
-# Endpoint to create database schema
+# Set RUN_MIGRATIONS=0 when the schema is managed elsewhere (or, as in the
+# benchmarks, already created)
+RUN_MIGRATIONS = os.getenv("RUN_MIGRATIONS", "1") == "1"
+# Set JOB_WORKERS_ENABLED=0 on instances that should only enqueue
+JOB_WORKERS_ENABLED = os.getenv("JOB_WORKERS_ENABLED", "1") == "1"
+
+# Startup does not wait for the database or Google: the process answers
+# /health/live at once and warms up in the background (uploads directory,
+# schema check, connection pool, signing keys, search index, job workers),
+# retrying with backoff while the database is unreachable. /health/ready
+# fails until warm-up is done, so load balancers hold traffic until then.
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "30"))
+warmup_task = None
+warmed_up = False
+
+def prepare_database():
+    # Schema check (one round-trip when it is current), the day's tombstone
+    # purge and min_size pooled connections
+    with db_pool.connection() as conn:
+        if RUN_MIGRATIONS:
+            create_database_schema(conn)
+        schedule_tombstone_purge(conn.cursor())
+        conn.commit()
+    db_pool.warm()
+
+async def warm_up():
+    global search_refresh_task, warmed_up
+    started = time.perf_counter()
+    await run_in_threadpool(UPLOAD_DIR.mkdir, exist_ok=True)
+    delay = 1.0
+    while True:
+        try:
+            await run_in_threadpool(prepare_database)
+            break
+        except Exception as e:
+            print(f"Warm-up database error: {e}; retrying in {delay:g}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+    await firebase_verifier.start()
+    try:
+        await search_index.rebuild(load_search_index)
+    except Exception as e:
+        # Served empty until the periodic rebuild succeeds
+        print(f"Search index build error: {e}")
+    if SEARCH_REFRESH_SECONDS > 0:
+        search_refresh_task = asyncio.create_task(refresh_search_index())
+    if JOB_WORKERS_ENABLED:
+        await job_queue.start()
+    warmed_up = True
+    print(f"Warm-up done in {time.perf_counter() - started:.2f}s")
+
 @app.on_event("startup")
 async def startup_event():
-    create_database_schema()
+    global warmup_task
+    warmup_task = asyncio.create_task(warm_up())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if warmup_task is not None:
+        warmup_task.cancel()
+    if search_refresh_task is not None:
+        search_refresh_task.cancel()
+    await job_queue.stop()
+    await firebase_verifier.stop()
+    database.close()
+
+# Liveness probe: the event loop is running. Needs no database, so a
+# database outage does not get the process restarted.
+@app.get("/health/live")
+async def liveness():
+    return {"status": "alive"}
+
+# Readiness probe: reports pool statistics and fails until warm-up is done
+# and while no healthy connection can be checked out.
+@app.get("/health/ready")
+def readiness():
+    if not warmed_up:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting", "database": db_pool.stats()},
+        )
+    try:
+        with db_pool.connection(timeout=1.0) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    except Exception as e:
+        print(f"Readiness check failed: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "database": db_pool.stats()},
+        )
+    return {"status": "ready", "database": db_pool.stats(), "user_cache": user_cache.stats(),
+            "result_cache": result_cache.stats(), "events": event_hub.stats(),
+            "search": search_index.stats(), "jobs": job_queue.stats(), "admission": admission.stats(),
+            "firebase": firebase_verifier.stats()}
+
+# Prometheus scrape endpoint. Set METRICS_TOKEN to require
+# "Authorization: Bearer <token>". Async so it reads the counters on the
+# event loop thread that updates them.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+@app.get("/metrics", include_in_schema=False)
+async def export_metrics(authorization: Optional[str] = Header(None)):
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+# Server-Sent Events for the signed-in user: task.assigned and
+# application.status for internees, task.submitted and application.submitted
+# for admins. Send Last-Event-ID on reconnect to receive missed events; a
+# "resync" event means they are gone and the client should refetch.
+@app.get("/events")
+async def stream_events(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    last_event_id: Optional[str] = Header(None),
+):
+    # Authenticate on a short-lived connection; the stream itself holds none
+    async with admit(request):
+        db = await acquire_db(request)
+        try:
+            current_user = await get_current_user(token, db)
+        finally:
+            await database.release(db)
+    if event_hub.at_capacity:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open event streams",
+            headers={"Retry-After": "5"},
+        )
+    channels = [f"user:{current_user['user_id']}"]
+    if current_user["role"] == "admin":
+        channels.append("role:admin")
+    return StreamingResponse(
+        event_hub.stream(channels, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # Authentication endpoints
 @app.post("/token")
@@ -252,19 +635,16 @@ class TokenRequest(BaseModel):
     token: str
 
 @app.post("/firebase-login")
-async def firebase_login(token_request: TokenRequest):
+async def firebase_login(token_request: TokenRequest, db: AsyncConnection = Depends(get_db)):
     try:
-        decoded_token = firebase_auth.verify_id_token(token_request.token)
+        decoded_token = await firebase_verifier.verify(token_request.token)
         firebase_uid = decoded_token['uid']
         email = decoded_token.get('email', '')
         name = decoded_token.get('name', '')
         
         print(f"Firebase login attempt for UID: {firebase_uid}")
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT UserId, Username, Email, Role FROM Users WHERE FirebaseUID = ?", (firebase_uid,))
-        user = cursor.fetchone()
+        user = await db.fetchone("SELECT UserId, Username, Email, Role FROM Users WHERE FirebaseUID = ?", (firebase_uid,))
         
         print(f"Database query result for UID {firebase_uid}: {user}")
         
@@ -276,7 +656,7 @@ async def firebase_login(token_request: TokenRequest):
         
         access_token = create_access_token(data={"firebase_uid": firebase_uid})
         return {"access_token": access_token, "token_type": "bearer"}
-    except firebase_auth.InvalidIdTokenError:
+    except InvalidIdTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Firebase ID token",
@@ -289,39 +669,35 @@ async def firebase_login(token_request: TokenRequest):
         )
 
 @app.get("/users/me", response_model=User)
-async def get_current_user(current_user: User = Depends(get_current_user)):
+async def read_current_user(current_user: User = Depends(get_current_user)):
     return current_user
 
 @app.post("/firebase-register", response_model=User)
-async def firebase_register(token: str = Body(...), username: str = Body(...), role: str = Body(...), name: str = Body(...)):
+async def firebase_register(token: str = Body(...), username: str = Body(...), role: str = Body(...), name: str = Body(...), db: AsyncConnection = Depends(get_db)):
     try:
-        decoded_token = firebase_auth.verify_id_token(token)
+        decoded_token = await firebase_verifier.verify(token)
         firebase_uid = decoded_token['uid']
         email = decoded_token.get('email', '')
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         # Check if user already exists
-        cursor.execute("SELECT UserId FROM Users WHERE FirebaseUID = ?", (firebase_uid,))
-        if cursor.fetchone():
+        if await db.fetchone("SELECT UserId FROM Users WHERE FirebaseUID = ?", (firebase_uid,)):
             raise HTTPException(
                 status_code=400,
                 detail="User already registered",
             )
         
         # Insert new user with FirebaseUID and other info, password is NULL
-        cursor.execute("""
+        await db.execute("""
             INSERT INTO Users (Name, FirebaseUID, Username, Password, Email, Role)
             VALUES (?, ?, ?, NULL, ?, ?)
         """, (name, firebase_uid, username, email, role))
-        conn.commit()
+        await db.commit()
+        user_cache.invalidate(firebase_uid)
         
-        cursor.execute("SELECT @@IDENTITY AS ID")
-        user_id = cursor.fetchone()[0]
+        user_id = (await db.fetchone("SELECT @@IDENTITY AS ID"))[0]
         
         return { "user_id": user_id, "username": username, "email": email, "role": role, "created_at": datetime.now() }
-    except firebase_auth.InvalidIdTokenError:
+    except InvalidIdTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Firebase ID token",
@@ -343,166 +719,197 @@ async def firebase_register(token: str = Body(...), username: str = Body(...), r
 
 # Internship endpoints
 @app.get("/internships/available", response_model=List[Internship])
-async def get_available_internships():
-    conn = None
+async def get_available_internships(request: Request):
+    # A connection only on a cache miss
+    async def load():
+        async with db_connection(request) as db:
+            rows = await db.fetchall("""
+                SELECT i.InternshipId, i.Title, i.Description, i.Status, i.CreatedBy, i.CreatedAt
+                FROM Internships i
+                WHERE i.Status = 'available'
+                ORDER BY i.CreatedAt DESC
+            """)
+        return [INTERNSHIP_ROW(row) for row in rows]
+
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT i.InternshipId, i.Title, i.Description, i.Status, i.CreatedBy, i.CreatedAt
-            FROM Internships i
-            WHERE i.Status = 'available'
-            ORDER BY i.CreatedAt DESC
-        """)
-        rows = cursor.fetchall()
-        
-        internships = []
-        for row in rows:
-            internships.append({
-                "internship_id": row[0],
-                "title": row[1],
-                "description": row[2],
-                "status": row[3],
-                "created_by": row[4],
-                "created_at": row[5]
-            })
-        return internships
+        return list_response(
+            await result_cache.get_or_load("internships:available", None, ["internships:list"], load)
+        )
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         print(f"Get available internships error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
-    finally:
-        if conn:
-            conn.close()
+
+# Tasks without a due date sort last, as they did with ORDER BY DueDate DESC
+NO_DUE_DATE = datetime(1900, 1, 1)
 
 @app.get("/tasks/assigned", response_model=List[Task])
-async def get_assigned_tasks(current_user: User = Depends(get_current_user)):
-    conn = None
+async def get_assigned_tasks(
+    request: Request,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    internship_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user_lazily),
+):
+    page = Keyset(("ISNULL(t.DueDate, '19000101')", "ta.AssignmentId"), (datetime, int), limit, cursor)
+    conditions, params = ["ta.InterneeId = ?"], [current_user["user_id"]]
+    if status_filter:
+        conditions.append("ta.Status = ?")
+        params.append(status_filter)
+    if internship_id is not None:
+        conditions.append("t.InternshipId = ?")
+        params.append(internship_id)
+    page.apply(conditions, params)
+
+    async def load():
+        async with db_connection(request, rate_limited=False) as db:
+            rows = await db.fetchall(f"""
+                SELECT {page.top} t.TaskId, t.Title, t.Description, t.InternshipId, t.DueDate, t.CreatedAt,
+                       ta.Status, ta.SubmissionPath, ta.AssignmentId, sf.Sha256, fb.Derivatives
+                FROM Tasks t
+                INNER JOIN TaskAssignments ta ON t.TaskId = ta.TaskId
+                LEFT JOIN StoredFiles sf ON sf.LogicalPath = ta.SubmissionPath
+                LEFT JOIN FileBlobs fb ON fb.Sha256 = sf.Sha256
+                {where_clause(conditions)}
+                ORDER BY {page.order_by}
+            """, params)
+        rows, next_cursor = page.finish(rows, lambda row: (row[4] or NO_DUE_DATE, row[8]))
+        return {"rows": [ASSIGNED_TASK_ROW(row) for row in rows], "next_cursor": next_cursor}
+
+    tags = [f"tasks:internee:{current_user['user_id']}"]
+    if internship_id is not None:
+        tags.append(f"internship:{internship_id}")
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT t.TaskId, t.Title, t.Description, t.InternshipId, t.DueDate, t.CreatedAt,
-                   ta.Status, ta.SubmissionPath
-            FROM Tasks t
-            INNER JOIN TaskAssignments ta ON t.TaskId = ta.TaskId
-            WHERE ta.InterneeId = ?
-            ORDER BY t.DueDate DESC
-        """, (current_user["user_id"],))
-        rows = cursor.fetchall()
-        
-        tasks = []
-        for row in rows:
-            tasks.append({
-                "task_id": row[0],
-                "title": row[1],
-                "description": row[2],
-                "internship_id": row[3],
-                "due_date": row[4],
-                "created_at": row[5],
-                "status": row[6],
-                "submission_path": row[7]
-            })
-        return tasks
+        result = await result_cache.get_or_load(
+            "tasks:assigned", [current_user["user_id"], status_filter, internship_id, limit, cursor], tags, load
+        )
+        return list_response(result["rows"], result["next_cursor"])
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         print(f"Get assigned tasks error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
-    finally:
-        if conn:
-            conn.close()
 
 # Admin endpoints
 @app.get("/internships/all", response_model=List[Internship])
-async def get_all_internships(current_user: User = Depends(get_current_user)):
+async def get_all_internships(
+    request: Request,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    created_by: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user_lazily),
+):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can view all internships")
     
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT InternshipId, Title, Description, Status, CreatedBy, CreatedAt 
-            FROM Internships 
-            ORDER BY CreatedAt DESC
-        """)
-        rows = cursor.fetchall()
-        
-        internships = []
-        for row in rows:
-            internships.append({
-                "internship_id": row[0],
-                "title": row[1],
-                "description": row[2],
-                "status": row[3],
-                "created_by": row[4],
-                "created_at": row[5]
-            })
-        return internships
-    finally:
-        if conn:
-            conn.close()
+    page = Keyset(("CreatedAt", "InternshipId"), (datetime, int), limit, cursor)
+    conditions, params = [], []
+    if status_filter:
+        conditions.append("Status = ?")
+        params.append(status_filter)
+    if created_by is not None:
+        conditions.append("CreatedBy = ?")
+        params.append(created_by)
+    page.apply(conditions, params)
+
+    async def load():
+        async with db_connection(request, rate_limited=False) as db:
+            rows = await db.fetchall(f"""
+                SELECT {page.top} InternshipId, Title, Description, Status, CreatedBy, CreatedAt 
+                FROM Internships 
+                {where_clause(conditions)}
+                ORDER BY {page.order_by}
+            """, params)
+        rows, next_cursor = page.finish(rows, lambda row: (row[5], row[0]))
+        return {"rows": [INTERNSHIP_ROW(row) for row in rows], "next_cursor": next_cursor}
+
+    result = await result_cache.get_or_load(
+        "internships:all", [status_filter, created_by, limit, cursor], ["internships:list"], load
+    )
+    return list_response(result["rows"], result["next_cursor"])
 
 @app.get("/users/internees", response_model=List[User])
-async def get_all_internees(current_user: User = Depends(get_current_user)):
+async def get_all_internees(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db)
+):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can view internees")
     
-    conn = None
+    page = Keyset(("CreatedAt", "UserId"), (datetime, int), limit, cursor)
+    conditions, params = ["Role = 'internee'"], []
+    page.apply(conditions, params)
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT UserId, Username, Email, Role, CreatedAt 
+        rows = await db.fetchall(f"""
+            SELECT {page.top} UserId, Username, Email, Role, CreatedAt 
             FROM Users 
-            WHERE Role = 'internee' 
-            ORDER BY CreatedAt DESC
-        """)
-        rows = cursor.fetchall()
-        
-        internees = []
-        for row in rows:
-            internees.append({
-                "user_id": row[0],
-                "username": row[1],
-                "email": row[2],
-                "role": row[3],
-                "created_at": row[4]
-            })
-        return internees
+            {where_clause(conditions)}
+            ORDER BY {page.order_by}
+        """, params)
+        rows, next_cursor = page.finish(rows, lambda row: (row[4], row[0]))
+        return list_response([INTERNEE_ROW(row) for row in rows], next_cursor)
     except Exception as e:
         print(f"Get internees error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
-    finally:
-        if conn:
-            conn.close()
+
+# Ranked search over internship and task titles and descriptions. Admins see
+# everything; internees see available internships and their own tasks.
+@app.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[str] = Query(None, alias="type", pattern="^(internship|task)$"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db)
+):
+    kinds = {kind} if kind else None
+    allow = None
+    if current_user["role"] != "admin":
+        assigned = set()
+        if kind != INTERNSHIP:
+            assigned = {row[0] for row in await db.fetchall(
+                "SELECT TaskId FROM TaskAssignments WHERE InterneeId = ?", (current_user["user_id"],)
+            )}
+
+        def allow(doc_kind, doc_id, fields):
+            if doc_kind == INTERNSHIP:
+                return fields["status"] == "available"
+            return doc_id in assigned
+
+    total, results = search_index.search(q, kinds=kinds, allow=allow, limit=limit, offset=offset)
+    return {"query": q, "total": total, "limit": limit, "offset": offset, "results": results}
 
 @app.post("/internships/", response_model=Internship)
-async def create_internship(internship: InternshipCreate, current_user: User = Depends(get_current_user)):
+async def create_internship(internship: InternshipCreate, current_user: User = Depends(get_current_user), db: AsyncConnection = Depends(get_db)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can create internships")
     
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
+        await db.execute("""
             INSERT INTO Internships (Title, Description, Status, CreatedBy)
             VALUES (?, ?, ?, ?)
         """, (internship.title, internship.description, internship.status, current_user["user_id"]))
         
-        conn.commit()
-        cursor.execute("SELECT @@IDENTITY AS ID")
-        internship_id = cursor.fetchone()[0]
+        await db.commit()
+        internship_id = (await db.fetchone("SELECT @@IDENTITY AS ID"))[0]
+        await result_cache.invalidate("internships:list")
+        search_index.upsert(INTERNSHIP, internship_id, internship.title, internship.description,
+                            status=internship.status)
         
         return {
             "internship_id": internship_id,
@@ -518,34 +925,44 @@ async def create_internship(internship: InternshipCreate, current_user: User = D
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create internship"
         )
-    finally:
-        if conn:
-            conn.close()
 
 @app.post("/tasks/", response_model=Task)
-async def create_task(task: TaskCreate, current_user: User = Depends(get_current_user)):
+async def create_task(
+    task: TaskCreate,
+    assign_approved: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db)
+):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can create tasks")
     
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         # First verify that the internship exists
-        cursor.execute("SELECT InternshipId FROM Internships WHERE InternshipId = ?", (task.internship_id,))
-        if not cursor.fetchone():
+        if not await db.fetchone("SELECT InternshipId FROM Internships WHERE InternshipId = ?", (task.internship_id,)):
             raise HTTPException(status_code=404, detail="Internship not found")
         
         # Insert the task with CreatedBy
-        cursor.execute("""
+        task_id = (await db.fetchone("""
             INSERT INTO Tasks (InternshipId, Title, Description, DueDate, CreatedBy)
+            OUTPUT inserted.TaskId
             VALUES (?, ?, ?, ?, ?)
-        """, (task.internship_id, task.title, task.description, task.due_date, current_user["user_id"]))
+        """, (task.internship_id, task.title, task.description, task.due_date, current_user["user_id"])))[0]
+
+        # Optionally assign it to the internship's approved cohort in the same transaction
+        assigned_count = None
+        if assign_approved:
+            results = await db.run(bulk_assign, task_id, None, True)
+            assigned_count = sum(1 for _, result in results if result == ASSIGNED)
         
-        conn.commit()
-        cursor.execute("SELECT @@IDENTITY AS ID")
-        task_id = cursor.fetchone()[0]
+        await db.commit()
+        tags = ["tasks:list", f"internship:{task.internship_id}"]
+        if assign_approved:
+            assigned = [i for i, result in results if result == ASSIGNED]
+            tags += [f"tasks:internee:{i}" for i in assigned]
+            for internee_id in assigned:
+                event_hub.publish([f"user:{internee_id}"], "task.assigned", {"task_id": task_id})
+        await result_cache.invalidate(*tags)
+        search_index.upsert(TASK, task_id, task.title, task.description, internship_id=task.internship_id)
         
         return {
             "task_id": task_id,
@@ -556,7 +973,8 @@ async def create_task(task: TaskCreate, current_user: User = Depends(get_current
             "created_at": datetime.now(),
             "created_by": current_user["user_id"],  # Add this
             "status": None,
-            "submission_path": None
+            "submission_path": None,
+            "assigned_count": assigned_count
         }
     except HTTPException:
         raise
@@ -566,44 +984,269 @@ async def create_task(task: TaskCreate, current_user: User = Depends(get_current
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create task"
         )
-    finally:
-        if conn:
-            conn.close()
 
-# File upload handling
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+# File upload handling. Uploads are stored once per distinct content under
+# uploads/blobs; the paths saved in the database are logical names that
+# /uploads/{path} resolves to the shared blob.
+UPLOAD_DIR = Path("uploads")  # created by warm_up
+INCOMING_DIR = UPLOAD_DIR / ".incoming"
+blob_store = BlobStore(UPLOAD_DIR, grace_seconds=float(os.getenv("BLOB_GC_GRACE_SECONDS", "3600")))
+
+async def store_upload(upload):
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(io_executor, blob_store.put, upload.path, upload.sha256)
+
+# Downloads. /files/{logical path} checks ownership (or the admin role) and
+# revalidates cheaply via the blob's content hash as a strong ETag. List
+# endpoints also hand out signed /files URLs that pin the content hash; those
+# skip authentication and the lookup and are cacheable until they expire.
+DOWNLOAD_URL_SECRET = os.getenv("DOWNLOAD_URL_SECRET", SECRET_KEY)
+DOWNLOAD_URL_TTL = int(os.getenv("DOWNLOAD_URL_TTL", "900"))
+# /uploads/{path} serves any upload to anyone who knows its name, with no
+# authentication. It is off by default; set PUBLIC_UPLOADS=1 only while app
+# builds that open /uploads/... directly are still in use (newer ones use the
+# signed /files URLs from the list endpoints).
+PUBLIC_UPLOADS = os.getenv("PUBLIC_UPLOADS", "0") == "1"
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+
+def download_url(path, sha256):
+    # sha256 is None for files saved before the blob store that are not adopted yet
+    return signed_url(DOWNLOAD_URL_SECRET, path, sha256 or "", DOWNLOAD_URL_TTL) if path else None
+
+def derivative_url(path, sha256, derivatives, variant):
+    # derivatives is FileBlobs.Derivatives: None until the previews job ran
+    if not (path and sha256 and derivatives) or variant not in derivatives.split(","):
+        return None
+    return signed_url(DOWNLOAD_URL_SECRET, path, sha256, DOWNLOAD_URL_TTL, variant)
+
+def derivative_filename(name, variant):
+    return f"{Path(name).stem}.{variant}{VARIANTS[variant][1]}"
+
+def legacy_upload_path(path):
+    # uploads/<user_id>/<name> saved before the blob store existed, or None
+    root = UPLOAD_DIR.resolve()
+    candidate = (root.parent / path).resolve()
+    if candidate.parent.parent == root and candidate.parent.name.isdigit():
+        return candidate
+    return None
+
+async def stat_file(path):
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="File not found")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
+    return stat_result
+
+async def open_upload(path, db, variant=None):
+    # (file, stat, etag, owner_id) for a logical upload path, or for a
+    # derivative of it
+    row = await db.run(resolve_file, path)
+    if row:
+        if variant:
+            file = blob_store.derivative_path(row[0], variant)
+            return file, await stat_file(file), f'"{row[0]}.{variant}"', row[3]
+        file = blob_store.blob_path(row[0])
+        return file, await stat_file(file), f'"{row[0]}"', row[3]
+    file = legacy_upload_path(path)
+    if file is None or variant:
+        raise HTTPException(status_code=404, detail="File not found")
+    stat_result = await stat_file(file)
+    return file, stat_result, f'W/"{int(stat_result.st_mtime)}-{stat_result.st_size}"', int(file.parent.name)
+
+@app.get("/files/{file_path:path}")
+async def download_file(
+    file_path: str,
+    request: Request,
+    h: Optional[str] = None,
+    expires: Optional[int] = None,
+    sig: Optional[str] = None,
+    v: Optional[str] = None,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+):
+    # v selects a derivative (thumb, preview, text; see previews.py)
+    if v is not None and v not in VARIANTS:
+        raise HTTPException(status_code=404, detail="File not found")
+    filename = derivative_filename(file_path, v) if v else Path(file_path).name
+    if sig is not None:
+        if h is None or expires is None or not verify_signature(DOWNLOAD_URL_SECRET, file_path, h, expires, sig, v):
+            raise HTTPException(status_code=403, detail="Invalid or expired link")
+        if h:
+            file = blob_store.derivative_path(h, v) if v else blob_store.blob_path(h)
+            etag = f'"{h}.{v}"' if v else f'"{h}"'
+            cache_control = f"private, max-age={max(0, expires - int(time.time()))}, immutable"
+            return file_response(request, file, await stat_file(file), etag, cache_control, filename)
+        if v:
+            raise HTTPException(status_code=404, detail="File not found")
+        file = legacy_upload_path(file_path)
+        if file is None:
+            raise HTTPException(status_code=404, detail="File not found")
+        stat_result = await stat_file(file)
+        etag = f'W/"{int(stat_result.st_mtime)}-{stat_result.st_size}"'
+        return file_response(request, file, stat_result, etag, "private, no-cache", filename)
+
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Connection held only for the lookups, not while the file is sent
+    async with admit(request):
+        db = await acquire_db(request)
+        try:
+            current_user = await get_current_user(token, db)
+            file, stat_result, etag, owner_id = await open_upload(file_path, db, v)
+        finally:
+            await database.release(db)
+    if current_user["role"] != "admin" and current_user["user_id"] != owner_id:
+        raise HTTPException(status_code=403, detail="Not allowed to access this file")
+    # A logical name can be re-pointed by a resubmission, so always revalidate
+    return file_response(request, file, stat_result, etag, "private, no-cache", filename)
+
+class FileUrlsRequest(BaseModel):
+    paths: List[str]
+
+# Fresh signed URLs for logical paths, for clients holding paths without
+# URLs (as /sync returns them: its rows are kept far longer than a signed
+# URL lasts). Paths that are unknown or not the caller's are left out; files
+# saved before the blob store can still be fetched from /files/{path}.
+@app.post("/files/urls")
+async def file_urls(body: FileUrlsRequest, current_user: User = Depends(get_current_user), db: AsyncConnection = Depends(get_db)):
+    if len(body.paths) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PAGE_SIZE} paths per request")
+    files = await db.run(resolve_files, sorted(set(body.paths)))
+    urls = {}
+    for path, (sha256, owner_id, derivatives) in files.items():
+        if current_user["role"] != "admin" and current_user["user_id"] != owner_id:
+            continue
+        # Named like the list endpoints' submission_*/resume_* URLs
+        urls[path] = {
+            "url": download_url(path, sha256),
+            "thumbnail_url": derivative_url(path, sha256, derivatives, "thumb"),
+            "preview_url": derivative_url(path, sha256, derivatives, "preview"),
+            "text_url": derivative_url(path, sha256, derivatives, "text"),
+        }
+    return urls
+
+if PUBLIC_UPLOADS:
+    @app.get("/uploads/{file_path:path}")
+    async def serve_upload(file_path: str, request: Request, db: AsyncConnection = Depends(get_db)):
+        file, stat_result, etag, _ = await open_upload(f"uploads/{file_path}", db)
+        return file_response(request, file, stat_result, etag, "no-cache", Path(file_path).name)
+
+# Blobs released by deletes are removed from disk by a job, not in the
+# request. It is enqueued in the delete's transaction, so it exists exactly
+# when the delete committed; call job_queue.notify() after committing.
+REMOVE_BLOBS = "blobs.remove"
+
+async def queue_blob_removal(db, sha256s, released_at):
+    if sha256s:
+        await db.run(enqueue, REMOVE_BLOBS, {"sha256s": sha256s, "released_at": released_at}, priority=-10)
+
+@job_queue.handler(REMOVE_BLOBS)
+def remove_released_blobs(payload):
+    with db_pool.connection() as conn:
+        return remove_blobs(conn, blob_store, payload["sha256s"], payload["released_at"])
+
+# Thumbnails, previews and text of new uploads (see previews.py), queued by
+# submit_task and apply_with_details; the list URLs appear once it has run
+@job_queue.handler(GENERATE_PREVIEWS)
+async def generate_previews(payload):
+    owners = await run_in_threadpool(make_previews, db_pool, blob_store, payload["sha256"])
+    await result_cache.invalidate(*(f"tasks:internee:{owner}" for owner in owners))
+
+# Drops unreferenced blobs; with adopt_legacy, first moves pre-blob-store
+# uploads into the store. Runs on its own connection, outside the query timeout;
+# auth takes none beyond that (get_current_user_lazily).
+@app.post("/admin/storage/gc")
+async def storage_gc(adopt_legacy: bool = False, current_user: User = Depends(get_current_user_lazily)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can run storage maintenance")
+
+    def run():
+        with db_pool.connection() as conn:
+            result = adopt_legacy_files(conn, blob_store) if adopt_legacy else {}
+            result.update(collect_garbage(conn, blob_store))
+            return result
+    return await run_in_threadpool(run)
+
+# Queues preview generation for up to `limit` stored files that have none,
+# newest first (files uploaded before previews existed)
+@app.post("/admin/storage/previews")
+async def backfill_previews(
+    limit: int = Query(1000, ge=1, le=10000),
+    current_user: User = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db)
+):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can run storage maintenance")
+    queued = await db.run(queue_missing_previews, limit)
+    await db.commit()
+    job_queue.notify()
+    return {"queued": queued}
+
+# Queue depth per job kind and status from the Jobs table, plus this
+# process's worker counts and wait/run latencies
+@app.get("/admin/jobs")
+async def job_status(current_user: User = Depends(get_current_user), db: AsyncConnection = Depends(get_db)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view the job queue")
+    return {"queue": await db.run(queue_depth), **job_queue.stats()}
 
+# Multipart body with a single "file" part; streamed by receive_upload
 @app.post("/tasks/{task_id}/submit")
 async def submit_task(
     task_id: int,
-    file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    token: str = Depends(oauth2_scheme),
 ):
-    if current_user["role"] != "internee":
-        raise HTTPException(status_code=403, detail="Only internees can submit tasks")
-    
-    # Create user-specific directory
-    user_dir = UPLOAD_DIR / str(current_user["user_id"])
-    user_dir.mkdir(exist_ok=True)
-    
-    # Save the file
-    file_path = user_dir / f"{task_id}_{file.filename}"
-    with file_path.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    # Authenticate and check the assignment before receiving anything
+    async with db_connection(request, watch=False) as db:
+        current_user = await get_current_user(token, db)
+        if current_user["role"] != "internee":
+            raise HTTPException(status_code=403, detail="Only internees can submit tasks")
+        assigned = await db.fetchone(
+            "SELECT 1 FROM TaskAssignments WHERE TaskId = ? AND InterneeId = ?",
+            (task_id, current_user["user_id"])
+        )
+    if assigned is None:
+        raise HTTPException(status_code=404, detail="Task not assigned to you")
     
-    # Update task assignment
-    cursor.execute("""
-        UPDATE TaskAssignments
-        SET Status = 'completed', SubmissionPath = ?, SubmittedAt = GETDATE()
-        WHERE TaskId = ? AND InterneeId = ?
-    """, (str(file_path), task_id, current_user["user_id"]))
+    # Stream to disk; returns once the file is durable, then dedupe into the blob store
+    _, upload = await receive_upload(
+        request, "file", INCOMING_DIR, max_bytes=UPLOAD_LIMITS["submission"],
+    )
+    await store_upload(upload)
+    file_path = logical_path(current_user["user_id"], "tasks", task_id, upload.filename)
     
-    conn.commit()
-    conn.close()
+    # Update task assignment and the file references in one transaction. The
+    # assignment is locked first: if it was removed meanwhile, nothing is
+    # linked (the stored blob is an orphan for storage GC).
+    async with upload_transaction(request) as db:
+        previous = await db.fetchone(
+            "SELECT SubmissionPath FROM TaskAssignments WITH (UPDLOCK, HOLDLOCK) WHERE TaskId = ? AND InterneeId = ?",
+            (task_id, current_user["user_id"])
+        )
+        if previous is None:
+            raise HTTPException(status_code=404, detail="Task not assigned to you")
+        await db.run(link_file, file_path, upload.sha256, upload.size, current_user["user_id"], upload.content_type)
+        await db.run(queue_previews, upload.sha256)
+        if previous[0] and previous[0] != file_path:
+            await db.run(unlink_file, previous[0])
+        await db.execute("""
+            UPDATE TaskAssignments
+            SET Status = 'completed', SubmissionPath = ?, SubmittedAt = GETDATE()
+            WHERE TaskId = ? AND InterneeId = ?
+        """, (file_path, task_id, current_user["user_id"]))
+        await db.run(refresh_progress, [current_user["user_id"]])
+        await db.commit()
+    job_queue.notify()
+    await result_cache.invalidate(f"tasks:internee:{current_user['user_id']}")
+    event_hub.publish(["role:admin"], "task.submitted", {
+        "task_id": task_id, "internee_id": current_user["user_id"], "submission_path": file_path,
+    })
     
     return {"message": "Task submitted successfully"}
 
@@ -612,159 +1255,260 @@ async def submit_task(
 async def update_internship(
     internship_id: int,
     internship: InternshipCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db)
 ):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can update internships")
     
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE Internships 
-            SET Title = ?, Description = ?, Status = ?
-            WHERE InternshipId = ?
-            """, (internship.title, internship.description, internship.status, internship_id))
-        
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail="Internship not found")
-            
-        conn.commit()
-        
-        # Get the updated internship
-        cursor.execute("""
-            SELECT InternshipId, Title, Description, Status, CreatedBy, CreatedAt
-            FROM Internships WHERE InternshipId = ?
-        """, (internship_id,))
+    rowcount = await db.execute("""
+        UPDATE Internships 
+        SET Title = ?, Description = ?, Status = ?
+        WHERE InternshipId = ?
+        """, (internship.title, internship.description, internship.status, internship_id))
+    
+    if rowcount == 0:
+        raise HTTPException(status_code=404, detail="Internship not found")
         
-        row = cursor.fetchone()
-        return {
-            "internship_id": row[0],
-            "title": row[1],
-            "description": row[2],
-            "status": row[3],
-            "created_by": row[4],
-            "created_at": row[5]
-        }
-    finally:
-        if conn:
-            conn.close()
+    await db.commit()
+    await result_cache.invalidate("internships:list", f"internship:{internship_id}")
+    search_index.upsert(INTERNSHIP, internship_id, internship.title, internship.description,
+                        status=internship.status)
+    
+    # Get the updated internship
+    row = await db.fetchone("""
+        SELECT InternshipId, Title, Description, Status, CreatedBy, CreatedAt
+        FROM Internships WHERE InternshipId = ?
+    """, (internship_id,))
+    return {
+        "internship_id": row[0],
+        "title": row[1],
+        "description": row[2],
+        "status": row[3],
+        "created_by": row[4],
+        "created_at": row[5]
+    }
 
 @app.delete("/internships/{internship_id}")
-async def delete_internship(internship_id: int, current_user: User = Depends(get_current_user)):
+async def delete_internship(internship_id: int, current_user: User = Depends(get_current_user), db: AsyncConnection = Depends(get_db)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can delete internships")
     
-    conn = None
+    started = time.time()
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Start a transaction
-        cursor.execute("BEGIN TRANSACTION")
-        
-        try:
-            # Get internship details before deletion
-            cursor.execute("""
-                SELECT InternshipId, Title, Description 
-                FROM Internships WHERE InternshipId = ?
-            """, (internship_id,))
-            internship = cursor.fetchone()
-            
-            if not internship:
-                raise HTTPException(status_code=404, detail="Internship not found")
-            
-            # Delete related data
-            cursor.execute("""
-                DELETE FROM TaskAssignments
-                WHERE TaskId IN (SELECT TaskId FROM Tasks WHERE InternshipId = ?)
-            """, (internship_id,))
-            
-            cursor.execute("DELETE FROM Tasks WHERE InternshipId = ?", (internship_id,))
-            cursor.execute("DELETE FROM InternshipApplications WHERE InternshipId = ?", (internship_id,))
-            
-            # Delete the internship
-            cursor.execute("DELETE FROM Internships WHERE InternshipId = ?", (internship_id,))
-            
-            if cursor.rowcount == 0:
-                raise HTTPException(status_code=404, detail="Internship not found")
-            
-            conn.commit()
-            
-            return {
-                "success": True,
-                "data": {
-                    "internship_id": internship[0],
-                    "title": internship[1],
-                    "description": internship[2]
-                },
-                "message": "Internship deleted successfully"
-            }
-            
-        except Exception as e:
-            conn.rollback()
-            print(f"Error deleting internship: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to delete internship and related data"
-            )
-            
+        # Tasks, assignments and applications go with it (see cascade.py)
+        deleted = await db.run(remove_internship, internship_id)
+        if deleted is None:
+            raise HTTPException(status_code=404, detail="Internship not found")
+        await queue_blob_removal(db, deleted["released"], started)
+        await db.commit()
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Unexpected error: {e}")
+        await db.rollback()
+        print(f"Error deleting internship: {e}")
         raise HTTPException(
             status_code=500,
-            detail="Internal server error"
+            detail="Failed to delete internship and related data"
         )
-    finally:
-        if conn:
-            conn.close()
+
+    job_queue.notify()
+    await result_cache.invalidate(
+        "internships:list", "tasks:list", f"internship:{internship_id}",
+        *(f"tasks:internee:{i}" for i in deleted["internees"])
+    )
+    search_index.remove(INTERNSHIP, internship_id)
+    for task_id in deleted["task_ids"]:
+        search_index.remove(TASK, task_id)
+    
+    internship = deleted["internship"]
+    return {
+        "success": True,
+        "data": {
+            "internship_id": internship[0],
+            "title": internship[1],
+            "description": internship[2]
+        },
+        "message": "Internship deleted successfully"
+    }
             
+def application_filters(status_filter, internship_id, internee_id):
+    conditions, params = [], []
+    if status_filter:
+        conditions.append("a.Status = ?")
+        params.append(status_filter)
+    if internship_id is not None:
+        conditions.append("a.InternshipId = ?")
+        params.append(internship_id)
+    if internee_id is not None:
+        conditions.append("a.InterneeId = ?")
+        params.append(internee_id)
+    return conditions, params
+
+APPLICATION_ROW = row_mapper(
+    application_id=0, internship_id=1, internee_id=2, status=3, applied_at=4, internship_title=5,
+    internee_name=6, internee_email=7, name=8, universityname=9, resumepath=10,
+    resume_url=lambda row: download_url(row[10], row[13]), degree=11, semester=12,
+    resume_thumbnail_url=lambda row: derivative_url(row[10], row[13], row[14], "thumb"),
+    resume_preview_url=lambda row: derivative_url(row[10], row[13], row[14], "preview"),
+    resume_text_url=lambda row: derivative_url(row[10], row[13], row[14], "text"),
+)
+
 @app.get("/applications")
-async def get_applications(current_user: User = Depends(get_current_user)):
+async def get_applications(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    internship_id: Optional[int] = None,
+    internee_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db)
+):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can view applications")
-    conn = None
+    page = Keyset(("a.AppliedAt", "a.ApplicationId"), (datetime, int), limit, cursor)
+    conditions, params = application_filters(status_filter, internship_id, internee_id)
+    page.apply(conditions, params)
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT a.ApplicationId, a.InternshipId, a.InterneeId, a.Status, a.AppliedAt,
+        rows = await db.fetchall(f'''
+            SELECT {page.top} a.ApplicationId, a.InternshipId, a.InterneeId, a.Status, a.AppliedAt,
                    i.Title, u.Username, u.Email,
-                   a.Name, a.UniversityName, a.ResumePath, a.Degree, a.Semester
+                   a.Name, a.UniversityName, a.ResumePath, a.Degree, a.Semester, sf.Sha256, fb.Derivatives
             FROM InternshipApplications a
             JOIN Internships i ON a.InternshipId = i.InternshipId
             JOIN Users u ON a.InterneeId = u.UserId
-            ORDER BY a.AppliedAt DESC
-        ''')
-        rows = cursor.fetchall()
-        applications = []
-        for row in rows:
-            applications.append({
-                "application_id": row[0],
-                "internship_id": row[1],
-                "internee_id": row[2],
-                "status": row[3],
-                "applied_at": row[4],
-                "internship_title": row[5],
-                "internee_name": row[6],
-                "internee_email": row[7],
-                "name": row[8],
-                "universityname": row[9],
-                "resumepath": row[10],
-                "degree": row[11],
-                "semester": row[12],
-            })
-        return applications
+            LEFT JOIN StoredFiles sf ON sf.LogicalPath = a.ResumePath
+            LEFT JOIN FileBlobs fb ON fb.Sha256 = sf.Sha256
+            {where_clause(conditions)}
+            ORDER BY {page.order_by}
+        ''', params)
+        rows, next_cursor = page.finish(rows, lambda row: (row[4], row[0]))
+        return list_response([APPLICATION_ROW(row) for row in rows], next_cursor)
     except Exception as e:
         print(f"Get applications error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch applications")
-    finally:
-        if conn:
-            conn.close()
+
+# Delta sync (see sync.py): the rows of the caller's lists created or changed
+# since the watermark, with the ids deleted, in the shapes of
+# /internships/available (or /internships/all), /tasks/assigned and
+# /applications, except for files. Pass the previous response's
+# X-Sync-Watermark as since; without it, or when reset is true, the response
+# is a full snapshot that replaces what the client has. 204 when nothing
+# changed.
+# Synced rows are kept until they change, so they carry the stable logical
+# path, content hash and preview variants of a file instead of signed URLs,
+# which expire after DOWNLOAD_URL_TTL. Clients get URLs from /files/urls, or
+# read /files/{path} (revalidated by the hash as ETag).
+def file_variants(derivatives):
+    return derivatives.split(",") if derivatives else []
+
+SYNCED_TASK_ROW = row_mapper(
+    task_id=0, title=1, description=2, internship_id=3, due_date=4, created_at=5, status=6,
+    submission_path=7, submission_sha256=9, submission_variants=lambda row: file_variants(row[10]),
+)
+SYNCED_APPLICATION_ROW = row_mapper(
+    application_id=0, internship_id=1, internee_id=2, status=3, applied_at=4, internship_title=5,
+    internee_name=6, internee_email=7, name=8, universityname=9, resumepath=10, degree=11, semester=12,
+    resume_sha256=13, resume_variants=lambda row: file_variants(row[14]),
+)
+SYNC_COLLECTIONS = (("internships", INTERNSHIP_ROW), ("tasks", SYNCED_TASK_ROW), ("applications", SYNCED_APPLICATION_ROW))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+
+@app.get("/sync")
+async def delta_sync(
+    since: Optional[int] = Query(None, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db)
+):
+    try:
+        delta = await db.run(sync_changes, current_user["role"], current_user["user_id"], since)
+    except Exception as e:
+        print(f"Sync error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to sync")
+
+    headers = {"X-Sync-Watermark": str(delta["watermark"])}
+    body = {}
+    for name, mapper in SYNC_COLLECTIONS:
+        if name in delta:
+            rows, deleted = delta[name]
+            if rows or deleted or delta["reset"]:
+                body[name] = {"changed": [mapper(row) for row in rows], "deleted": deleted}
+    if not body:
+        return Response(status_code=204, headers=headers)
+    body["reset"] = delta["reset"]
+    return FastJSONResponse(body, headers=headers)
+
+@job_queue.handler(PURGE_TOMBSTONES)
+def purge_sync_tombstones(payload):
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        purged = purge_tombstones(cursor, SYNC_TOMBSTONE_RETENTION_DAYS * 86400)
+        schedule_tombstone_purge(cursor, (datetime.now() + timedelta(days=1)).date(), delay=86400)
+        conn.commit()
+        return purged
+
+# Streaming exports for reporting
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+class ExportResponse(StreamingResponse):
+    # Releases the export's connection however the response ends, including
+    # when the client is gone before the body started
+    def __init__(self, content, connection, **kwargs):
+        super().__init__(content, **kwargs)
+        self.connection = connection
+
+    async def __call__(self, scope, receive, send):
+        async with self.connection:
+            await super().__call__(scope, receive, send)
+
+async def stream_export(request, fmt, filename, sql, params, columns):
+    # The export holds its own connection for as long as the response is
+    # streaming. Authenticate with get_current_user_lazily rather than
+    # get_db, whose connection would stay checked out until the response
+    # ends, two per export. The connection passes admission and is taken
+    # before the response starts, so a busy pool is a 503 rather than a
+    # truncated file.
+    connection = AsyncExitStack()
+    conn = await connection.enter_async_context(db_connection(request, rate_limited=False, watch=False))
+
+    async def batches():
+        async for rows in conn.stream(sql, params, batch_size=EXPORT_BATCH_SIZE):
+            yield rows
+
+    chunks, media_type = export_chunks(fmt, batches(), columns)
+    return ExportResponse(
+        chunks,
+        connection,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+@app.get("/applications/export")
+async def export_applications(
+    request: Request,
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    internship_id: Optional[int] = None,
+    internee_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user_lazily),
+):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can export applications")
+    conditions, params = application_filters(status_filter, internship_id, internee_id)
+    return await stream_export(request, fmt, "applications", f'''
+        SELECT a.ApplicationId, a.InternshipId, a.InterneeId, a.Status, a.AppliedAt,
+               i.Title, u.Username, u.Email,
+               a.Name, a.UniversityName, a.ResumePath, a.Degree, a.Semester
+        FROM InternshipApplications a
+        JOIN Internships i ON a.InternshipId = i.InternshipId
+        JOIN Users u ON a.InterneeId = u.UserId
+        {where_clause(conditions)}
+        ORDER BY a.AppliedAt DESC, a.ApplicationId DESC
+    ''', params, [
+        "application_id", "internship_id", "internee_id", "status", "applied_at",
+        "internship_title", "internee_name", "internee_email",
+        "name", "universityname", "resumepath", "degree", "semester",
+    ])
 
 from pydantic import BaseModel
 
@@ -772,258 +1516,380 @@ class StatusUpdateRequest(BaseModel):
     status: str
 
 @app.put("/applications/{application_id}/status")
-async def update_application_status(application_id: int, status_update: StatusUpdateRequest, current_user: User = Depends(get_current_user)):
+async def update_application_status(application_id: int, status_update: StatusUpdateRequest, current_user: User = Depends(get_current_user), db: AsyncConnection = Depends(get_db)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can update applications")
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
+        row = await db.fetchone("""
             UPDATE InternshipApplications
             SET Status = ?
+            OUTPUT inserted.InterneeId
             WHERE ApplicationId = ?
         """, (status_update.status, application_id))
-        if cursor.rowcount == 0:
+        if row is None:
             raise HTTPException(status_code=404, detail="Application not found")
-        conn.commit()
+        await db.commit()
+        event_hub.publish([f"user:{row[0]}"], "application.status", {
+            "application_id": application_id, "status": status_update.status,
+        })
         return {"message": f"Application {status_update.status} successfully"}
     except Exception as e:
         print(f"Update application status error: {e}")
         raise HTTPException(status_code=500, detail="Failed to update application status")
-    finally:
-        if conn:
-            conn.close()
+
+class StatusChange(BaseModel):
+    application_id: int
+    status: str
+
+class ApplicationFilter(BaseModel):
+    internship_id: Optional[int] = None
+    internee_id: Optional[int] = None
+    status: Optional[str] = None  # current status, e.g. only "pending"
+
+class BatchStatusUpdateRequest(BaseModel):
+    updates: List[StatusChange] = []
+    # Alternatively: set `status` on every application matching `filter`
+    filter: Optional[ApplicationFilter] = None
+    status: Optional[str] = None
+
+# Upper bound on explicit updates per call, and rows per staging round-trip
+REVIEW_BATCH_MAX_ITEMS = int(os.getenv("REVIEW_BATCH_MAX_ITEMS", "10000"))
+REVIEW_BATCH_CHUNK_SIZE = int(os.getenv("REVIEW_BATCH_CHUNK_SIZE", "1000"))
+
+@app.post("/applications/status/batch")
+async def batch_update_application_status(
+    batch: BatchStatusUpdateRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db)
+):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can update applications")
+    if bool(batch.updates) == (batch.filter is not None):
+        raise HTTPException(status_code=400, detail="Provide either updates or filter")
+    if len(batch.updates) > REVIEW_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {REVIEW_BATCH_MAX_ITEMS} updates per batch")
+
+    try:
+        if batch.updates:
+            results, changed = await db.run(
+                update_statuses, [(u.application_id, u.status) for u in batch.updates], REVIEW_BATCH_CHUNK_SIZE
+            )
+        else:
+            if batch.status not in APPLICATION_STATUSES:
+                raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(APPLICATION_STATUSES)}")
+            f = batch.filter
+            conditions, params = application_filters(f.status, f.internship_id, f.internee_id)
+            if not conditions:
+                raise HTTPException(status_code=400, detail="Filter needs at least one criterion")
+            conditions.append("a.Status <> ?")
+            rows = await db.fetchall(f"""
+                UPDATE a SET Status = ?
+                OUTPUT inserted.ApplicationId, inserted.InterneeId, inserted.Status
+                FROM InternshipApplications a
+                {where_clause(conditions)}
+            """, [batch.status, *params, batch.status])
+            results = {row[0]: UPDATED for row in rows}
+            changed = [tuple(row) for row in rows]
+        await db.commit()
+        for application_id, internee_id, new_status in changed:
+            event_hub.publish([f"user:{internee_id}"], "application.status", {
+                "application_id": application_id, "status": new_status,
+            })
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        print(f"Batch update application status error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update application status")
+
+    counts = {}
+    for result in results.values():
+        counts[result] = counts.get(result, 0) + 1
+    return {
+        "counts": counts,
+        "results": [{"application_id": application_id, "result": result} for application_id, result in results.items()],
+    }
 
 @app.post("/internships/{internship_id}/apply")
-async def apply_for_internship(internship_id: int, current_user: User = Depends(get_current_user)):
+async def apply_for_internship(internship_id: int, current_user: User = Depends(get_current_user), db: AsyncConnection = Depends(get_db)):
     if current_user["role"] != "internee":
         raise HTTPException(status_code=403, detail="Only internees can apply")
-    conn = get_db_connection()
-    cursor = conn.cursor()
     # Check if already applied
-    cursor.execute("SELECT * FROM InternshipApplications WHERE InternshipId = ? AND InterneeId = ?", (internship_id, current_user["user_id"]))
-    if cursor.fetchone():
-        conn.close()
+    if await db.fetchone("SELECT * FROM InternshipApplications WHERE InternshipId = ? AND InterneeId = ?", (internship_id, current_user["user_id"])):
         raise HTTPException(status_code=400, detail="Already applied")
-    cursor.execute(
+    await db.execute(
         "INSERT INTO InternshipApplications (InternshipId, InterneeId, Status) VALUES (?, ?, 'pending')",
         (internship_id, current_user["user_id"])
     )
-    conn.commit()
-    conn.close()
+    await db.commit()
+    event_hub.publish(["role:admin"], "application.submitted", {
+        "internship_id": internship_id, "internee_id": current_user["user_id"],
+    })
     return {"message": "Application submitted"}
 
-from fastapi import UploadFile, File, Form
+APPLICATION_FIELDS = ("name", "university_name", "degree", "semester")
 
+# Multipart body with name, university_name, degree, semester and a "resume" PDF
 @app.post("/internships/{internship_id}/apply_with_details")
 async def apply_for_internship_with_details(
     internship_id: int,
-    name: str = Form(...),
-    university_name: str = Form(...),
-    degree: str = Form(...),
-    semester: str = Form(...),
-    resume: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    token: str = Depends(oauth2_scheme),
 ):
+    current_user = await authenticate_upload(request, token)
     if current_user["role"] != "internee":
         raise HTTPException(status_code=403, detail="Only internees can apply")
 
-    if resume.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="Resume must be a PDF file")
-
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Check if already applied
-    cursor.execute("SELECT * FROM InternshipApplications WHERE InternshipId = ? AND InterneeId = ?", (internship_id, current_user["user_id"]))
-    existing_application = cursor.fetchone()
-
-    # Save resume file
-    upload_dir = Path("uploads") / str(current_user["user_id"])
-    upload_dir.mkdir(parents=True, exist_ok=True)
-    resume_path = upload_dir / f"{internship_id}_{resume.filename}"
-
-    with open(resume_path, "wb") as buffer:
-        shutil.copyfileobj(resume.file, buffer)
-
-    # Convert path to posix (forward slashes) for URL compatibility
-    resume_path_str = str(resume_path).replace("\\", "/")
-
-    if existing_application:
-        # Update existing application
-        cursor.execute("""
-            UPDATE InternshipApplications
-            SET Status = 'pending', Name = ?, UniversityName = ?, ResumePath = ?, Degree = ?, Semester = ?, AppliedAt = GETDATE()
-            WHERE InternshipId = ? AND InterneeId = ?
-        """, (name, university_name, resume_path_str, degree, semester, internship_id, current_user["user_id"]))
-    else:
-        # Insert new application
-        cursor.execute("""
-            INSERT INTO InternshipApplications 
-            (InternshipId, InterneeId, Status, Name, UniversityName, ResumePath, Degree, Semester) 
-            VALUES (?, ?, 'pending', ?, ?, ?, ?, ?)
-        """, (internship_id, current_user["user_id"], name, university_name, resume_path_str, degree, semester))
-
-    conn.commit()
-    conn.close()
+    # Save resume file (rejected as soon as the part headers show a non-PDF)
+    fields, upload = await receive_upload(
+        request, "resume", INCOMING_DIR, max_bytes=UPLOAD_LIMITS["resume"],
+        allowed_types={"application/pdf"},
+    )
+    missing = [f for f in APPLICATION_FIELDS if not fields.get(f)]
+    if missing:
+        await run_in_threadpool(upload.path.unlink, True)
+        raise HTTPException(status_code=400, detail=f"Missing form fields: {', '.join(missing)}")
+    name, university_name, degree, semester = (fields[f] for f in APPLICATION_FIELDS)
+    await store_upload(upload)
+
+    async with upload_transaction(request) as db:
+        # Check if already applied
+        existing_application = await db.fetchone("SELECT ResumePath FROM InternshipApplications WHERE InternshipId = ? AND InterneeId = ?", (internship_id, current_user["user_id"]))
+
+        # Logical names are posix (forward slashes) for URL compatibility
+        resume_path_str = logical_path(current_user["user_id"], "resumes", internship_id, upload.filename)
+        await db.run(link_file, resume_path_str, upload.sha256, upload.size, current_user["user_id"], upload.content_type)
+        await db.run(queue_previews, upload.sha256)
+        if existing_application and existing_application[0] and existing_application[0] != resume_path_str:
+            await db.run(unlink_file, existing_application[0])
+
+        if existing_application:
+            # Update existing application
+            await db.execute("""
+                UPDATE InternshipApplications
+                SET Status = 'pending', Name = ?, UniversityName = ?, ResumePath = ?, Degree = ?, Semester = ?, AppliedAt = GETDATE()
+                WHERE InternshipId = ? AND InterneeId = ?
+            """, (name, university_name, resume_path_str, degree, semester, internship_id, current_user["user_id"]))
+        else:
+            # Insert new application
+            await db.execute("""
+                INSERT INTO InternshipApplications 
+                (InternshipId, InterneeId, Status, Name, UniversityName, ResumePath, Degree, Semester) 
+                VALUES (?, ?, 'pending', ?, ?, ?, ?, ?)
+            """, (internship_id, current_user["user_id"], name, university_name, resume_path_str, degree, semester))
+
+        await db.commit()
+    job_queue.notify()
+    event_hub.publish(["role:admin"], "application.submitted", {
+        "internship_id": internship_id, "internee_id": current_user["user_id"],
+    })
 
     return {"message": "Application submitted with details"}
 
 @app.post("/tasks/{task_id}/assign")
-async def assign_task(task_id: int, internee_id: int, current_user: User = Depends(get_current_user)):
+async def assign_task(task_id: int, internee_id: int, current_user: User = Depends(get_current_user), db: AsyncConnection = Depends(get_db)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can assign tasks")
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
+    await db.execute(
         "INSERT INTO TaskAssignments (TaskId, InterneeId, Status) VALUES (?, ?, 'pending')",
         (task_id, internee_id)
     )
-    conn.commit()
-    conn.close()
+    await db.run(refresh_progress, [internee_id])
+    await db.commit()
+    await result_cache.invalidate(f"tasks:internee:{internee_id}")
+    event_hub.publish([f"user:{internee_id}"], "task.assigned", {"task_id": task_id})
     return {"message": "Task assigned"}
 
+# Assign one task to many internees in a single set-based statement; existing
+# assignments are skipped and reported per internee.
+@app.post("/tasks/{task_id}/assign/bulk")
+async def bulk_assign_task(
+    task_id: int,
+    body: BulkAssignRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db)
+):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can assign tasks")
+    if not body.internee_ids and not body.approved_applicants:
+        raise HTTPException(status_code=400, detail="Provide internee_ids or approved_applicants")
+    if not await db.fetchone("SELECT TaskId FROM Tasks WHERE TaskId = ?", (task_id,)):
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    try:
+        results = await db.run(bulk_assign, task_id, body.internee_ids, body.approved_applicants)
+        await db.commit()
+        await result_cache.invalidate(*(f"tasks:internee:{i}" for i, result in results if result == ASSIGNED))
+        for internee_id, result in results:
+            if result == ASSIGNED:
+                event_hub.publish([f"user:{internee_id}"], "task.assigned", {"task_id": task_id})
+    except Exception as e:
+        await db.rollback()
+        print(f"Bulk assign error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to assign task")
+
+    return {
+        "task_id": task_id,
+        "assigned": sum(1 for _, result in results if result == ASSIGNED),
+        "skipped": sum(1 for _, result in results if result != ASSIGNED),
+        "results": [{"internee_id": internee_id, "result": result} for internee_id, result in results],
+    }
+
 # Add more endpoints as needed...
 
 @app.put("/tasks/{task_id}", response_model=Task)
-async def update_task(task_id: int, task: TaskCreate, current_user: User = Depends(get_current_user)):
+async def update_task(task_id: int, task: TaskCreate, current_user: User = Depends(get_current_user), db: AsyncConnection = Depends(get_db)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can update tasks")
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
 
-        # Verify task exists
-        cursor.execute("SELECT TaskId FROM Tasks WHERE TaskId = ?", (task_id,))
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail="Task not found")
-
-        # Update task details
-        cursor.execute("""
-            UPDATE Tasks
-            SET Title = ?, Description = ?, DueDate = ?
-            WHERE TaskId = ?
-        """, (task.title, task.description, task.due_date, task_id))
-
-        conn.commit()
+    # Verify task exists
+    if not await db.fetchone("SELECT TaskId FROM Tasks WHERE TaskId = ?", (task_id,)):
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    # Update task details
+    await db.execute("""
+        UPDATE Tasks
+        SET Title = ?, Description = ?, DueDate = ?
+        WHERE TaskId = ?
+    """, (task.title, task.description, task.due_date, task_id))
+
+    await db.commit()
+    affected = await db.run(affected_internees, "SELECT DISTINCT InterneeId FROM TaskAssignments WHERE TaskId = ?", (task_id,))
+    await result_cache.invalidate(
+        "tasks:list", f"internship:{task.internship_id}", *(f"tasks:internee:{i}" for i in affected)
+    )
 
-        # Return updated task
-        cursor.execute("""
-            SELECT TaskId, Title, Description, InternshipId, DueDate, CreatedAt
-            FROM Tasks WHERE TaskId = ?
-        """, (task_id,))
-        row = cursor.fetchone()
-        return {
-            "task_id": row[0],
-            "title": row[1],
-            "description": row[2],
-            "internship_id": row[3],
-            "due_date": row[4],
-            "created_at": row[5],
-            "status": None,
-            "submission_path": None
-        }
-    finally:
-        if conn:
-            conn.close()
+    # Return updated task
+    row = await db.fetchone("""
+        SELECT TaskId, Title, Description, InternshipId, DueDate, CreatedAt
+        FROM Tasks WHERE TaskId = ?
+    """, (task_id,))
+    search_index.upsert(TASK, task_id, row[1], row[2], internship_id=row[3])
+    return {
+        "task_id": row[0],
+        "title": row[1],
+        "description": row[2],
+        "internship_id": row[3],
+        "due_date": row[4],
+        "created_at": row[5],
+        "status": None,
+        "submission_path": None
+    }
 
 @app.delete("/tasks/{task_id}")
-async def delete_task(task_id: int, current_user: User = Depends(get_current_user)):
+async def delete_task(task_id: int, current_user: User = Depends(get_current_user), db: AsyncConnection = Depends(get_db)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can delete tasks")
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Delete related task assignments
-        cursor.execute("DELETE FROM TaskAssignments WHERE TaskId = ?", (task_id,))
 
-        # Delete the task
-        cursor.execute("DELETE FROM Tasks WHERE TaskId = ?", (task_id,))
+    # Assignments go with the task; their submissions are released (see cascade.py)
+    started = time.time()
+    deleted = await db.run(remove_task, task_id)
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Task not found")
 
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail="Task not found")
-
-        conn.commit()
-        return {"message": "Task deleted successfully"}
-    finally:
-        if conn:
-            conn.close()
+    await queue_blob_removal(db, deleted["released"], started)
+    await db.commit()
+    job_queue.notify()
+    await result_cache.invalidate("tasks:list", *(f"tasks:internee:{i}" for i in deleted["internees"]))
+    search_index.remove(TASK, task_id)
+    return {"message": "Task deleted successfully"}
 
 @app.get("/tasks/admin", response_model=List[Task])
-async def get_admin_tasks(current_user: User = Depends(get_current_user)):
+async def get_admin_tasks(
+    request: Request,
+    internship_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user_lazily),
+):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can view their tasks")
-    conn = None
+    page = Keyset(("t.CreatedAt", "t.TaskId"), (datetime, int), limit, cursor)
+    conditions, params = ["t.CreatedBy = ?"], [current_user["user_id"]]
+    if internship_id is not None:
+        conditions.append("t.InternshipId = ?")
+        params.append(internship_id)
+    page.apply(conditions, params)
+
+    async def load():
+        async with db_connection(request, rate_limited=False) as db:
+            rows = await db.fetchall(f"""
+                SELECT {page.top} t.TaskId, t.Title, t.Description, t.InternshipId, t.DueDate, t.CreatedAt
+                FROM Tasks t
+                {where_clause(conditions)}
+                ORDER BY {page.order_by}
+            """, params)
+        rows, next_cursor = page.finish(rows, lambda row: (row[5], row[0]))
+        return {"rows": [TASK_ROW(row) for row in rows], "next_cursor": next_cursor}
+
+    tags = ["tasks:list"]
+    if internship_id is not None:
+        tags.append(f"internship:{internship_id}")
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT t.TaskId, t.Title, t.Description, t.InternshipId, t.DueDate, t.CreatedAt
-            FROM Tasks t
-            WHERE t.CreatedBy = ?
-            ORDER BY t.CreatedAt DESC
-        """, (current_user["user_id"],))
-        rows = cursor.fetchall()
-        tasks = []
-        for row in rows:
-            tasks.append({
-                "task_id": row[0],
-                "title": row[1],
-                "description": row[2],
-                "internship_id": row[3],
-                "due_date": row[4],
-                "created_at": row[5],
-                "status": None,
-                "submission_path": None
-            })
-        return tasks
+        result = await result_cache.get_or_load(
+            "tasks:admin", [current_user["user_id"], internship_id, limit, cursor], tags, load
+        )
+        return list_response(result["rows"], result["next_cursor"])
+    except HANDLED_ERRORS:
+        raise
     except Exception as e:
         print(f"Get admin tasks error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch admin tasks")
-    finally:
-        if conn:
-            conn.close()
+
+PROGRESS_ROW = row_mapper(internee_id=0, username=1, completed_tasks=2, pending_tasks=3, in_progress_tasks=4, total_tasks=5)
 
 @app.get("/internees/progress")
-async def get_internees_progress(current_user: User = Depends(get_current_user)):
+async def get_internees_progress(current_user: User = Depends(get_current_user), db: AsyncConnection = Depends(get_db)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can view internee progress")
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
+        rows = await db.fetchall("""
             SELECT u.UserId, u.Username,
-                SUM(CASE WHEN ta.Status = 'completed' THEN 1 ELSE 0 END) AS completed_tasks,
-                SUM(CASE WHEN ta.Status = 'pending' THEN 1 ELSE 0 END) AS pending_tasks,
-                COUNT(ta.AssignmentId) AS total_tasks
+                ISNULL(p.Completed, 0) AS completed_tasks,
+                ISNULL(p.Pending, 0) AS pending_tasks,
+                ISNULL(p.InProgress, 0) AS in_progress_tasks,
+                ISNULL(p.Total, 0) AS total_tasks
             FROM Users u
-            LEFT JOIN TaskAssignments ta ON u.UserId = ta.InterneeId
+            LEFT JOIN InterneeProgress p ON p.InterneeId = u.UserId
             WHERE u.Role = 'internee'
-            GROUP BY u.UserId, u.Username
             ORDER BY u.Username
         """)
-        rows = cursor.fetchall()
-        progress_list = []
-        for row in rows:
-            progress_list.append({
-                "internee_id": row[0],
-                "username": row[1],
-                "completed_tasks": row[2],
-                "pending_tasks": row[3],
-                "total_tasks": row[4]
-            })
-        return progress_list
+        return list_response([PROGRESS_ROW(row) for row in rows])
     except Exception as e:
         print(f"Get internees progress error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch internee progress")
-    finally:
-        if conn:
-            conn.close()
+
+# Recounts every internee's counters from TaskAssignments and reports drift;
+# dry_run only reports. Runs on its own connection.
+@app.post("/admin/progress/rebuild")
+async def rebuild_internee_progress(dry_run: bool = False, current_user: User = Depends(get_current_user_lazily)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can rebuild internee progress")
+
+    def run():
+        with db_pool.connection() as conn:
+            return rebuild_progress(conn, dry_run)
+    return await run_in_threadpool(run)
+
+@app.get("/internees/progress/export")
+async def export_internees_progress(
+    request: Request,
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_user_lazily),
+):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can export internee progress")
+    return await stream_export(request, fmt, "internee_progress", """
+        SELECT u.UserId, u.Username,
+            ISNULL(p.Completed, 0) AS completed_tasks,
+            ISNULL(p.Pending, 0) AS pending_tasks,
+            ISNULL(p.InProgress, 0) AS in_progress_tasks,
+            ISNULL(p.Total, 0) AS total_tasks
+        FROM Users u
+        LEFT JOIN InterneeProgress p ON p.InterneeId = u.UserId
+        WHERE u.Role = 'internee'
+        ORDER BY u.Username
+    """, (), ["internee_id", "username", "completed_tasks", "pending_tasks", "in_progress_tasks", "total_tasks"])
 
 
 
@@ -0,0 +1,262 @@
+import contextvars
+import functools
+import inspect
+import time
+from bisect import bisect_left
+
+from fastapi.routing import APIRoute
+
+# Per-route request metrics in the Prometheus text format. Everything is
+# updated from the event loop thread (the middleware, get_current_user,
+# AsyncConnection and the route handlers all run there), so the counters are
+# plain ints and floats with no locks. Metrics are per process; scrape each
+# worker separately.
+#
+# Besides end-to-end latency, each request's time is split into phases:
+#   auth       get_current_user, including its cached user lookup
+#   db         awaiting AsyncConnection calls (executor queueing included)
+#   serialize  from the endpoint returning to the response object being ready
+#              (response_model validation and JSON encoding)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ("auth", "db", "serialize")
+UNMATCHED = "<unmatched>"
+
+
+class RequestTimings:
+    __slots__ = ("auth", "db", "serialize", "db_calls", "returned_at")
+
+    def __init__(self):
+        self.auth = 0.0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.db_calls = 0
+        self.returned_at = None
+
+
+_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def record(phase, seconds):
+    timings = _timings.get()
+    if timings is not None:
+        setattr(timings, phase, getattr(timings, phase) + seconds)
+        if phase == "db":
+            timings.db_calls += 1
+
+
+class measure:
+    # with measure("auth"): ...
+    __slots__ = ("phase", "started")
+
+    def __init__(self, phase):
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        record(self.phase, time.perf_counter() - self.started)
+
+
+class _RouteStats:
+    __slots__ = ("buckets", "duration_sum", "count", "phase_sums", "db_calls")
+
+    def __init__(self, n_buckets):
+        self.buckets = [0] * (n_buckets + 1)  # last one is +Inf
+        self.duration_sum = 0.0
+        self.count = 0
+        self.phase_sums = [0.0] * len(PHASES)
+        self.db_calls = 0
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Metrics:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bucket_bounds = tuple(buckets)
+        self._routes = {}  # (method, route) -> _RouteStats
+        self._responses = {}  # (method, route, status) -> count
+        self._errors = {}  # (method, route, status) -> count
+        self._active = {}  # id(scope) -> scope, for the in-flight gauge
+        self._gauges = []  # (name, help, callable)
+        self._counters = []  # (name, help, callable, label names)
+
+    def gauge(self, name, help_text, read):
+        # Extra gauge read at scrape time, e.g. connection pool usage
+        self._gauges.append((name, help_text, read))
+
+    def counter(self, name, help_text, read, labels=()):
+        # Counter kept elsewhere and read at scrape time; with labels, read()
+        # returns {(label values): count}
+        self._counters.append((name, help_text, read, tuple(labels)))
+
+    def observe(self, method, route, status_code, seconds, timings, failed):
+        stats = self._routes.get((method, route))
+        if stats is None:
+            stats = self._routes[(method, route)] = _RouteStats(len(self.bucket_bounds))
+        stats.buckets[bisect_left(self.bucket_bounds, seconds)] += 1
+        stats.duration_sum += seconds
+        stats.count += 1
+        stats.phase_sums[0] += timings.auth
+        stats.phase_sums[1] += timings.db
+        stats.phase_sums[2] += timings.serialize
+        stats.db_calls += timings.db_calls
+        key = (method, route, status_code)
+        self._responses[key] = self._responses.get(key, 0) + 1
+        if failed or status_code >= 500:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def render(self):
+        lines = []
+        lines += ["# HELP http_requests_total Requests completed, by route template and status.",
+                  "# TYPE http_requests_total counter"]
+        for (method, route, code), count in sorted(self._responses.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{_label(route)}",status="{code}"}} {count}')
+
+        lines += ["# HELP http_request_errors_total Requests that failed with a 5xx or an unhandled exception.",
+                  "# TYPE http_request_errors_total counter"]
+        for (method, route, code), count in sorted(self._errors.items()):
+            lines.append(
+                f'http_request_errors_total{{method="{method}",route="{_label(route)}",status="{code}"}} {count}'
+            )
+
+        in_flight = {}
+        for scope in list(self._active.values()):
+            route = scope.get("route")
+            key = (scope["method"], route.path if route is not None else UNMATCHED)
+            in_flight[key] = in_flight.get(key, 0) + 1
+        lines += ["# HELP http_requests_in_flight Requests currently being handled, including open streams.",
+                  "# TYPE http_requests_in_flight gauge"]
+        for (method, route), count in sorted(in_flight.items()):
+            lines.append(f'http_requests_in_flight{{method="{method}",route="{_label(route)}"}} {count}')
+
+        lines += ["# HELP http_request_duration_seconds Time until the last byte of the response was sent.",
+                  "# TYPE http_request_duration_seconds histogram"]
+        phases = []
+        db_calls = []
+        for (method, route), stats in sorted(self._routes.items()):
+            labels = f'method="{method}",route="{_label(route)}"'
+            cumulative = 0
+            for bound, count in zip(self.bucket_bounds, stats.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.duration_sum:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {stats.count}")
+            for phase, total in zip(PHASES, stats.phase_sums):
+                phases.append(f'http_request_phase_seconds_sum{{{labels},phase="{phase}"}} {total:.6f}')
+                phases.append(f'http_request_phase_seconds_count{{{labels},phase="{phase}"}} {stats.count}')
+            db_calls.append(f"http_request_db_calls_total{{{labels}}} {stats.db_calls}")
+
+        lines += ["# HELP http_request_phase_seconds Time spent in auth, database calls and serialization.",
+                  "# TYPE http_request_phase_seconds summary"] + phases
+        lines += ["# HELP http_request_db_calls_total Database round-trips made while handling requests.",
+                  "# TYPE http_request_db_calls_total counter"] + db_calls
+
+        for name, help_text, read, labels in self._counters:
+            try:
+                value = read()
+            except Exception as e:
+                print(f"Metrics counter {name} error: {e}")
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            if not labels:
+                lines.append(f"{name} {value}")
+                continue
+            for values, count in sorted(value.items()):
+                pairs = ",".join(f'{label}="{_label(v)}"' for label, v in zip(labels, values))
+                lines.append(f"{name}{{{pairs}}} {count}")
+
+        for name, help_text, read in self._gauges:
+            try:
+                value = read()
+            except Exception as e:
+                print(f"Metrics gauge {name} error: {e}")
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    # Pure ASGI middleware, so streaming responses are timed to their last
+    # chunk. The route template is read from scope["route"] once routing has
+    # happened; unmatched paths share one label to keep cardinality bounded.
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        status_code = 500
+        failed = False
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.metrics._active[id(scope)] = scope
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            del self.metrics._active[id(scope)]
+            _timings.reset(token)
+            route = scope.get("route")
+            self.metrics.observe(
+                scope["method"], route.path if route is not None else UNMATCHED,
+                status_code, elapsed, timings, failed,
+            )
+
+
+def _mark_return(endpoint):
+    # Notes when the endpoint returned, so the route handler can attribute
+    # the rest of its time to serialization.
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            timings = _timings.get()
+            if timings is not None:
+                timings.returned_at = time.perf_counter()
+            return result
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            timings = _timings.get()
+            if timings is not None:
+                timings.returned_at = time.perf_counter()
+            return result
+    return wrapper
+
+
+class InstrumentedRoute(APIRoute):
+    # Set as app.router.route_class before any route is declared
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _mark_return(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timings = _timings.get()
+            if timings is not None and timings.returned_at is not None:
+                timings.serialize += time.perf_counter() - timings.returned_at
+                timings.returned_at = None
+            return response
+        return timed_handler
@@ -0,0 +1,396 @@
+import time
+
+# Forward-only schema migrations. Every statement is guarded so it can run
+# against databases created by the old create_database_schema() (or patched
+# by hand) without failing. Append new migrations; never edit applied ones.
+
+
+def _cascading_foreign_key(table, column, parent, parent_key):
+    # Replaces the table's (unnamed, NO ACTION) key to parent with a named
+    # ON DELETE CASCADE one; a no-op once that exists
+    name = f"FK_{table}_{parent}"
+    return f'''
+        IF NOT EXISTS (SELECT * FROM sys.foreign_keys WHERE name = '{name}')
+        BEGIN
+            DECLARE @old SYSNAME = (
+                SELECT TOP 1 name FROM sys.foreign_keys
+                WHERE parent_object_id = OBJECT_ID('dbo.{table}') AND referenced_object_id = OBJECT_ID('dbo.{parent}')
+            );
+            DECLARE @drop NVARCHAR(300) = N'ALTER TABLE dbo.{table} DROP CONSTRAINT ' + QUOTENAME(@old);
+            IF @old IS NOT NULL EXEC sp_executesql @drop;
+            ALTER TABLE dbo.{table} ADD CONSTRAINT {name}
+                FOREIGN KEY ({column}) REFERENCES dbo.{parent} ({parent_key}) ON DELETE CASCADE;
+        END
+    '''
+
+
+MIGRATIONS = [
+    (1, "baseline tables", [
+        '''
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='Users' AND xtype='U')
+        CREATE TABLE Users (
+            UserId INT PRIMARY KEY IDENTITY(1,1),
+            Name VARCHAR(100) NOT NULL,
+            FirebaseUID VARCHAR(100) UNIQUE NOT NULL,
+            Username VARCHAR(50) UNIQUE NOT NULL,
+            Password VARCHAR(100) NULL,
+            Email VARCHAR(100) UNIQUE NOT NULL,
+            Role VARCHAR(10) NOT NULL,  -- 'admin' or 'internee'
+            CreatedAt DATETIME DEFAULT GETDATE()
+        )
+        ''',
+        '''
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='Internships' AND xtype='U')
+        CREATE TABLE Internships (
+            InternshipId INT PRIMARY KEY IDENTITY(1,1),
+            Title VARCHAR(100) NOT NULL,
+            Description TEXT,
+            Status VARCHAR(20) NOT NULL,  -- 'available' or 'not available'
+            CreatedBy INT FOREIGN KEY REFERENCES Users(UserId),
+            CreatedAt DATETIME DEFAULT GETDATE()
+        )
+        ''',
+        '''
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='Tasks' AND xtype='U')
+        CREATE TABLE Tasks (
+            TaskId INT PRIMARY KEY IDENTITY(1,1),
+            InternshipId INT FOREIGN KEY REFERENCES Internships(InternshipId),
+            Title VARCHAR(100) NOT NULL,
+            Description TEXT,
+            DueDate DATETIME,
+            CreatedBy INT FOREIGN KEY REFERENCES Users(UserId),
+            CreatedAt DATETIME DEFAULT GETDATE()
+        )
+        ''',
+        '''
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='InternshipApplications' AND xtype='U')
+        CREATE TABLE InternshipApplications (
+            ApplicationId INT PRIMARY KEY IDENTITY(1,1),
+            InternshipId INT FOREIGN KEY REFERENCES Internships(InternshipId),
+            InterneeId INT FOREIGN KEY REFERENCES Users(UserId),
+            Status VARCHAR(20) NOT NULL,  -- 'pending', 'approved', 'rejected'
+            AppliedAt DATETIME DEFAULT GETDATE()
+        )
+        ''',
+        '''
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='TaskAssignments' AND xtype='U')
+        CREATE TABLE TaskAssignments (
+            AssignmentId INT PRIMARY KEY IDENTITY(1,1),
+            TaskId INT FOREIGN KEY REFERENCES Tasks(TaskId),
+            InterneeId INT FOREIGN KEY REFERENCES Users(UserId),
+            Status VARCHAR(20) NOT NULL,  -- 'pending', 'completed', 'in_progress'
+            SubmissionPath VARCHAR(255),
+            SubmittedAt DATETIME,
+            CreatedAt DATETIME DEFAULT GETDATE()
+        )
+        ''',
+    ]),
+
+    # Columns written by apply_with_details that were only ever added by hand
+    (2, "application detail columns", [
+        "IF COL_LENGTH('InternshipApplications', 'Name') IS NULL ALTER TABLE InternshipApplications ADD Name VARCHAR(100) NULL",
+        "IF COL_LENGTH('InternshipApplications', 'UniversityName') IS NULL ALTER TABLE InternshipApplications ADD UniversityName VARCHAR(200) NULL",
+        "IF COL_LENGTH('InternshipApplications', 'ResumePath') IS NULL ALTER TABLE InternshipApplications ADD ResumePath VARCHAR(255) NULL",
+        "IF COL_LENGTH('InternshipApplications', 'Degree') IS NULL ALTER TABLE InternshipApplications ADD Degree VARCHAR(100) NULL",
+        "IF COL_LENGTH('InternshipApplications', 'Semester') IS NULL ALTER TABLE InternshipApplications ADD Semester VARCHAR(20) NULL",
+    ]),
+
+    # TEXT is deprecated, cannot be compared or indexed and is always stored off-row
+    (3, "TEXT columns to VARCHAR(MAX)", [
+        '''
+        IF EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID('Internships')
+                   AND name = 'Description' AND system_type_id = TYPE_ID('text'))
+        ALTER TABLE Internships ALTER COLUMN Description VARCHAR(MAX) NULL
+        ''',
+        '''
+        IF EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID('Tasks')
+                   AND name = 'Description' AND system_type_id = TYPE_ID('text'))
+        ALTER TABLE Tasks ALTER COLUMN Description VARCHAR(MAX) NULL
+        ''',
+    ]),
+
+    # Indexes for the current query shapes (filters first, then the keyset
+    # order used by the list endpoints, INCLUDE for the selected columns).
+    (4, "covering indexes for hot queries", [
+        # /tasks/assigned, /internees/progress
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_TaskAssignments_InterneeId')
+        CREATE INDEX IX_TaskAssignments_InterneeId ON TaskAssignments (InterneeId)
+            INCLUDE (TaskId, Status, SubmissionPath)
+        ''',
+        # submit_task, delete_task, the delete_internship cascade
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_TaskAssignments_TaskId_InterneeId')
+        CREATE INDEX IX_TaskAssignments_TaskId_InterneeId ON TaskAssignments (TaskId, InterneeId)
+        ''',
+        # duplicate check in apply_for_internship / apply_with_details
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_InternshipApplications_InternshipId_InterneeId')
+        CREATE INDEX IX_InternshipApplications_InternshipId_InterneeId
+            ON InternshipApplications (InternshipId, InterneeId) INCLUDE (Status)
+        ''',
+        # /applications keyset order and internee filter
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_InternshipApplications_AppliedAt')
+        CREATE INDEX IX_InternshipApplications_AppliedAt
+            ON InternshipApplications (AppliedAt DESC, ApplicationId DESC)
+            INCLUDE (InternshipId, InterneeId, Status)
+        ''',
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_InternshipApplications_InterneeId')
+        CREATE INDEX IX_InternshipApplications_InterneeId ON InternshipApplications (InterneeId)
+        ''',
+        # /users/internees, /internees/progress
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Users_Role')
+        CREATE INDEX IX_Users_Role ON Users (Role, CreatedAt DESC, UserId DESC)
+            INCLUDE (Username, Email)
+        ''',
+        # /internships/available
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Internships_Status')
+        CREATE INDEX IX_Internships_Status ON Internships (Status, CreatedAt DESC, InternshipId DESC)
+            INCLUDE (Title, CreatedBy)
+        ''',
+        # /internships/all keyset order
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Internships_CreatedAt')
+        CREATE INDEX IX_Internships_CreatedAt ON Internships (CreatedAt DESC, InternshipId DESC)
+        ''',
+        # /tasks/admin
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Tasks_CreatedBy')
+        CREATE INDEX IX_Tasks_CreatedBy ON Tasks (CreatedBy, CreatedAt DESC, TaskId DESC)
+            INCLUDE (InternshipId, DueDate, Title)
+        ''',
+        # create_task existence check, delete_internship cascade
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Tasks_InternshipId')
+        CREATE INDEX IX_Tasks_InternshipId ON Tasks (InternshipId)
+        ''',
+    ]),
+
+    # Content-addressed upload storage (see blobstore.py)
+    (5, "upload blob store", [
+        '''
+        IF OBJECT_ID('dbo.FileBlobs', 'U') IS NULL
+        CREATE TABLE FileBlobs (
+            Sha256 CHAR(64) PRIMARY KEY,
+            Size BIGINT NOT NULL,
+            RefCount INT NOT NULL,
+            CreatedAt DATETIME NOT NULL DEFAULT GETDATE(),
+            UpdatedAt DATETIME NOT NULL DEFAULT GETDATE()
+        )
+        ''',
+        '''
+        IF OBJECT_ID('dbo.StoredFiles', 'U') IS NULL
+        CREATE TABLE StoredFiles (
+            LogicalPath VARCHAR(255) PRIMARY KEY,
+            Sha256 CHAR(64) NOT NULL FOREIGN KEY REFERENCES FileBlobs(Sha256),
+            OwnerId INT NOT NULL,
+            ContentType VARCHAR(100) NULL,
+            CreatedAt DATETIME NOT NULL DEFAULT GETDATE()
+        )
+        ''',
+        # Garbage collection only ever looks at unreferenced blobs
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_FileBlobs_Unreferenced')
+        CREATE INDEX IX_FileBlobs_Unreferenced ON FileBlobs (UpdatedAt) WHERE RefCount <= 0
+        ''',
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_StoredFiles_Sha256')
+        CREATE INDEX IX_StoredFiles_Sha256 ON StoredFiles (Sha256)
+        ''',
+    ]),
+
+    # Maintained per-internee task counters (see progress.py), seeded from the
+    # current assignments
+    (6, "internee progress counters", [
+        '''
+        IF OBJECT_ID('dbo.InterneeProgress', 'U') IS NULL
+        CREATE TABLE InterneeProgress (
+            InterneeId INT PRIMARY KEY,
+            Total INT NOT NULL,
+            Completed INT NOT NULL,
+            Pending INT NOT NULL,
+            InProgress INT NOT NULL,
+            UpdatedAt DATETIME NOT NULL DEFAULT GETDATE()
+        )
+        ''',
+        '''
+        INSERT INTO InterneeProgress (InterneeId, Total, Completed, Pending, InProgress)
+        SELECT u.UserId, COUNT(ta.AssignmentId),
+               ISNULL(SUM(CASE WHEN ta.Status = 'completed' THEN 1 ELSE 0 END), 0),
+               ISNULL(SUM(CASE WHEN ta.Status = 'pending' THEN 1 ELSE 0 END), 0),
+               ISNULL(SUM(CASE WHEN ta.Status = 'in_progress' THEN 1 ELSE 0 END), 0)
+        FROM Users u LEFT JOIN TaskAssignments ta ON ta.InterneeId = u.UserId
+        WHERE u.Role = 'internee'
+          AND NOT EXISTS (SELECT 1 FROM InterneeProgress p WHERE p.InterneeId = u.UserId)
+        GROUP BY u.UserId
+        ''',
+    ]),
+
+    # Deleting an internship or task takes its dependent rows with it in one
+    # statement (see cascade.py); the child sides are indexed by migration 4
+    (7, "cascading deletes", [
+        _cascading_foreign_key("Tasks", "InternshipId", "Internships", "InternshipId"),
+        _cascading_foreign_key("TaskAssignments", "TaskId", "Tasks", "TaskId"),
+        _cascading_foreign_key("InternshipApplications", "InternshipId", "Internships", "InternshipId"),
+    ]),
+
+    # Persistent background jobs (see jobs.py). Workers seek the queue index
+    # on Status; idempotency keys are unique while the job is kept.
+    (8, "job queue", [
+        '''
+        IF OBJECT_ID('dbo.Jobs', 'U') IS NULL
+        CREATE TABLE Jobs (
+            JobId BIGINT PRIMARY KEY IDENTITY(1,1),
+            Kind VARCHAR(100) NOT NULL,
+            Payload VARCHAR(MAX) NOT NULL,
+            Priority INT NOT NULL DEFAULT 0,
+            IdempotencyKey VARCHAR(200) NULL,
+            Status VARCHAR(10) NOT NULL DEFAULT 'queued',  -- queued, running, done, failed
+            Attempts INT NOT NULL DEFAULT 0,
+            MaxAttempts INT NOT NULL,
+            RunAt DATETIME NOT NULL DEFAULT GETDATE(),
+            LockedUntil DATETIME NULL,
+            LastError VARCHAR(2000) NULL,
+            CreatedAt DATETIME NOT NULL DEFAULT GETDATE(),
+            StartedAt DATETIME NULL,
+            FinishedAt DATETIME NULL
+        )
+        ''',
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Jobs_Queue')
+        CREATE INDEX IX_Jobs_Queue ON Jobs (Status, Priority DESC, RunAt, JobId) INCLUDE (Kind, LockedUntil, FinishedAt)
+        ''',
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'UX_Jobs_IdempotencyKey')
+        CREATE UNIQUE INDEX UX_Jobs_IdempotencyKey ON Jobs (IdempotencyKey) WHERE IdempotencyKey IS NOT NULL
+        ''',
+    ]),
+
+    # Variants made from each blob by the previews job (see previews.py);
+    # NULL until it has run
+    (9, "upload derivatives", [
+        '''
+        IF COL_LENGTH('dbo.FileBlobs', 'Derivatives') IS NULL
+        ALTER TABLE FileBlobs ADD Derivatives VARCHAR(100) NULL
+        ''',
+    ]),
+
+    # Change tracking for delta sync (see sync.py). Adding a ROWVERSION
+    # column writes every row once.
+    (10, "delta sync tracking", [
+        "IF COL_LENGTH('dbo.Internships', 'RowVer') IS NULL ALTER TABLE Internships ADD RowVer ROWVERSION",
+        "IF COL_LENGTH('dbo.Tasks', 'RowVer') IS NULL ALTER TABLE Tasks ADD RowVer ROWVERSION",
+        "IF COL_LENGTH('dbo.TaskAssignments', 'RowVer') IS NULL ALTER TABLE TaskAssignments ADD RowVer ROWVERSION",
+        "IF COL_LENGTH('dbo.InternshipApplications', 'RowVer') IS NULL ALTER TABLE InternshipApplications ADD RowVer ROWVERSION",
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Internships_RowVer')
+        CREATE INDEX IX_Internships_RowVer ON Internships (RowVer)
+        ''',
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Tasks_RowVer')
+        CREATE INDEX IX_Tasks_RowVer ON Tasks (RowVer)
+        ''',
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_InternshipApplications_RowVer')
+        CREATE INDEX IX_InternshipApplications_RowVer ON InternshipApplications (RowVer)
+        ''',
+        # Assignments are read per internee, through IX_TaskAssignments_InterneeId
+        '''
+        IF OBJECT_ID('dbo.Tombstones', 'U') IS NULL
+        CREATE TABLE Tombstones (
+            TombstoneId BIGINT PRIMARY KEY IDENTITY(1,1),
+            TableName VARCHAR(30) NOT NULL,
+            RowId INT NOT NULL,
+            InterneeId INT NULL,
+            RowVer ROWVERSION,
+            DeletedAt DATETIME NOT NULL DEFAULT GETDATE()
+        )
+        ''',
+        '''
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Tombstones_RowVer')
+        CREATE INDEX IX_Tombstones_RowVer ON Tombstones (RowVer) INCLUDE (TableName, RowId, InterneeId)
+        ''',
+        '''
+        IF OBJECT_ID('dbo.SyncHorizon', 'U') IS NULL
+        CREATE TABLE SyncHorizon (
+            Id INT PRIMARY KEY,
+            PurgedThrough BIGINT NOT NULL
+        )
+        ''',
+        "IF NOT EXISTS (SELECT * FROM SyncHorizon) INSERT INTO SyncHorizon (Id, PurgedThrough) VALUES (1, 0)",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    # One round-trip; 0 when the version table does not exist yet
+    cursor = conn.cursor()
+    cursor.execute('''
+        IF OBJECT_ID('dbo.SchemaVersions', 'U') IS NULL
+            SELECT 0
+        ELSE
+            SELECT ISNULL(MAX(Version), 0) FROM dbo.SchemaVersions
+    ''')
+    version = cursor.fetchone()[0]
+    conn.commit()
+    return version
+
+
+def migrate(conn, migrations=MIGRATIONS):
+    # Applies pending migrations and returns the versions that were applied.
+    # Returns immediately, without any DDL, when the schema is current.
+    if current_version(conn) >= migrations[-1][0]:
+        return []
+
+    cursor = conn.cursor()
+    # Serialize runners across workers/processes for the whole session
+    cursor.execute('''
+        DECLARE @result INT
+        EXEC @result = sp_getapplock @Resource = 'schema_migrations', @LockMode = 'Exclusive',
+                                     @LockOwner = 'Session', @LockTimeout = 60000
+        SELECT @result
+    ''')
+    if cursor.fetchone()[0] < 0:
+        raise RuntimeError("Timed out waiting for the schema migration lock")
+    applied = []
+    try:
+        cursor.execute('''
+            IF OBJECT_ID('dbo.SchemaVersions', 'U') IS NULL
+            CREATE TABLE dbo.SchemaVersions (
+                Version INT PRIMARY KEY,
+                Name VARCHAR(200) NOT NULL,
+                AppliedAt DATETIME NOT NULL DEFAULT GETDATE(),
+                DurationMs INT NOT NULL
+            )
+        ''')
+        conn.commit()
+        cursor.execute("SELECT Version FROM dbo.SchemaVersions")
+        done = {row[0] for row in cursor.fetchall()}
+
+        for version, name, statements in migrations:
+            if version in done:
+                continue
+            start = time.perf_counter()
+            try:
+                for statement in statements:
+                    cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO dbo.SchemaVersions (Version, Name, DurationMs) VALUES (?, ?, ?)",
+                    (version, name, int((time.perf_counter() - start) * 1000)),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            print(f"Applied schema migration {version}: {name}")
+            applied.append(version)
+    finally:
+        cursor.execute("EXEC sp_releaseapplock @Resource = 'schema_migrations', @LockOwner = 'Session'")
+        conn.commit()
+    return applied
@@ -0,0 +1,78 @@
+import base64
+import json
+from datetime import datetime
+
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, types):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise InvalidCursor("Malformed cursor")
+        return [datetime.fromisoformat(v) if t is datetime else t(v) for v, t in zip(payload, types)]
+    except InvalidCursor:
+        raise
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
+
+
+def where_clause(conditions):
+    return "WHERE " + " AND ".join(conditions) if conditions else ""
+
+
+class Keyset:
+    # Descending keyset pagination over `columns` (the last one must be
+    # unique). The cursor holds the sort key of the last row returned, so a
+    # page is a bounded index seek no matter how deep it is.
+    def __init__(self, columns, types, limit=None, cursor=None):
+        self.columns = columns
+        self.types = types
+        self.limit = limit
+        self.after = decode_cursor(cursor, types) if cursor else None
+
+    @property
+    def top(self):
+        # limit is validated as an int by the endpoint, so it is safe to inline
+        return f"TOP {int(self.limit) + 1}" if self.limit else ""
+
+    @property
+    def order_by(self):
+        return ", ".join(f"{c} DESC" for c in self.columns)
+
+    def apply(self, conditions, params):
+        # Appends "(c1, c2, ...) < (v1, v2, ...)" spelled out for T-SQL
+        if self.after is None:
+            return
+        terms = []
+        for i, column in enumerate(self.columns):
+            parts = [f"{c} = {self._param(v)}" for c, v in zip(self.columns[:i], self.after[:i])]
+            parts.append(f"{column} < {self._param(self.after[i])}")
+            terms.append("(" + " AND ".join(parts) + ")")
+            params.extend(self.after[:i])
+            params.append(self.after[i])
+        conditions.append("(" + " OR ".join(terms) + ")")
+
+    @staticmethod
+    def _param(value):
+        # Compare as DATETIME: pyodbc binds datetime2, which does not compare
+        # equal to DATETIME values with 1/300s precision.
+        return "CAST(? AS DATETIME)" if isinstance(value, datetime) else "?"
+
+    def finish(self, rows, key):
+        # Trims the look-ahead row and returns (rows, next_cursor)
+        if not self.limit or len(rows) <= self.limit:
+            return rows, None
+        rows = rows[: self.limit]
+        return rows, encode_cursor(key(rows[-1]))
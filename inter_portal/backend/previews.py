@@ -0,0 +1,191 @@
+import importlib.util
+import io
+import os
+
+from jobs import enqueue
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # no image thumbnails
+    Image = None
+# pymupdf takes about 0.2 s to import, so only the previews job loads it;
+# without it there are no PDF pages or text
+HAVE_PYMUPDF = importlib.util.find_spec("pymupdf") is not None
+
+# Smaller stand-ins for uploaded files, so list screens and the preview
+# dialog do not download multi-MB originals: a thumbnail and a preview-sized
+# JPEG of images and of a PDF's first page, plus the text of PDFs. A job
+# makes them after the upload commits and stores them next to the blob as
+# <sha256>.<variant>. They are content-addressed like the blob, so they never
+# change and are shared by every logical path with that content.
+# FileBlobs.Derivatives lists the variants made ("" when there are none);
+# list endpoints check it before handing out a URL.
+
+GENERATE_PREVIEWS = "previews.generate"
+
+# variant: (media type, file extension for downloads)
+VARIANTS = {
+    "thumb": ("image/jpeg", ".jpg"),
+    "preview": ("image/jpeg", ".jpg"),
+    "text": ("text/plain", ".txt"),
+}
+THUMB_SIZE = 320
+PREVIEW_SIZE = 1280
+JPEG_QUALITY = 80
+TEXT_MAX_PAGES = 20
+TEXT_MAX_CHARS = 200_000
+
+
+def _enqueue(cursor, sha256, created_at, priority=0):
+    # One job per stored copy of the content: a blob removed and uploaded
+    # again gets a new CreatedAt
+    return enqueue(cursor, GENERATE_PREVIEWS, {"sha256": sha256}, priority=priority,
+                   idempotency_key=f"previews:{sha256}:{created_at:%Y%m%d%H%M%S%f}")
+
+
+def queue_previews(cursor, sha256):
+    # Call after link_file, in the same transaction
+    cursor.execute("SELECT Derivatives, CreatedAt FROM FileBlobs WHERE Sha256 = ?", (sha256,))
+    row = cursor.fetchone()
+    if row is None or row[0] is not None:
+        return None
+    return _enqueue(cursor, sha256, row[1])
+
+
+def queue_missing_previews(cursor, limit):
+    # Backfill for blobs stored before previews existed, queued behind new uploads
+    cursor.execute(f'''
+        SELECT TOP {int(limit)} Sha256, CreatedAt FROM FileBlobs
+        WHERE Derivatives IS NULL AND RefCount > 0
+        ORDER BY CreatedAt DESC
+    ''')
+    rows = cursor.fetchall()
+    for sha256, created_at in rows:
+        _enqueue(cursor, sha256, created_at, priority=-5)
+    return len(rows)
+
+
+def sniff(path):
+    # "pdf", "image" or None, from the file's first bytes rather than the
+    # client's content type
+    with open(path, "rb") as f:
+        head = f.read(12)
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if (head.startswith((b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n", b"GIF87a", b"GIF89a"))
+            or (head[:4] == b"RIFF" and head[8:12] == b"WEBP")):
+        return "image"
+    return None
+
+
+def _fit(image, size):
+    image = image.copy()
+    image.thumbnail((size, size))
+    return image
+
+
+def _jpeg(image):
+    # Baseline, not progressive: a few percent larger but decodes about
+    # twice as fast on the client
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def image_derivatives(path):
+    # No preview for images that already fit: the original is as small
+    with Image.open(path) as image:
+        fits = max(image.size) <= PREVIEW_SIZE
+        # JPEGs decode straight at 1/2 to 1/8 scale, most of the saving on
+        # phone photos
+        image.draft("RGB", (PREVIEW_SIZE, PREVIEW_SIZE))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        preview = _fit(image, PREVIEW_SIZE)
+        derivatives = {"thumb": _jpeg(_fit(preview, THUMB_SIZE))}
+        if not fits:
+            derivatives["preview"] = _jpeg(preview)
+        return derivatives
+
+
+def pdf_derivatives(path):
+    import pymupdf
+    derivatives = {}
+    with pymupdf.open(path) as doc:
+        if doc.needs_pass or doc.page_count == 0:
+            return derivatives
+        page = doc[0]
+        longest = max(page.rect.width, page.rect.height)
+        for variant, size in (("thumb", THUMB_SIZE), ("preview", PREVIEW_SIZE)):
+            pixmap = page.get_pixmap(matrix=pymupdf.Matrix(size / longest, size / longest), alpha=False)
+            derivatives[variant] = pixmap.tobytes("jpeg", jpg_quality=JPEG_QUALITY)
+        text = "\n".join(page.get_text() for page in doc.pages(0, min(doc.page_count, TEXT_MAX_PAGES)))
+        text = text.strip()[:TEXT_MAX_CHARS]
+        if text:
+            derivatives["text"] = text.encode("utf-8")
+    return derivatives
+
+
+def render_derivatives(path):
+    # {variant: bytes}; empty for other content, when the library for it is
+    # not installed, or when the file cannot be decoded (retrying would not help)
+    kind = sniff(path)
+    try:
+        if kind == "image" and Image is not None:
+            return image_derivatives(path)
+        if kind == "pdf" and HAVE_PYMUPDF:
+            return pdf_derivatives(path)
+    except Exception as e:
+        print(f"Preview generation failed for {path.name}: {e}")
+    return {}
+
+
+def make_previews(pool, store, sha256):
+    # Job body. The connection is not held while rendering. Returns the ids
+    # of the users whose files share the content, for cache invalidation.
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT Derivatives FROM FileBlobs WHERE Sha256 = ?", (sha256,))
+        row = cursor.fetchone()
+    if row is None or row[0] is not None:
+        return []
+    source = store.blob_path(sha256)
+    if not source.exists():
+        return []
+
+    derivatives = render_derivatives(source)
+    for variant, data in derivatives.items():
+        path = store.derivative_path(sha256, variant)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    # Files left behind by a blob removed meanwhile go with the next storage GC
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE FileBlobs SET Derivatives = ? WHERE Sha256 = ?",
+                       (",".join(sorted(derivatives)), sha256))
+        # Touch the rows whose preview URLs just appeared so /sync resends them
+        cursor.execute('''
+            UPDATE ta SET SubmissionPath = ta.SubmissionPath
+            FROM TaskAssignments ta JOIN StoredFiles sf ON sf.LogicalPath = ta.SubmissionPath
+            WHERE sf.Sha256 = ?
+        ''', (sha256,))
+        cursor.execute('''
+            UPDATE a SET ResumePath = a.ResumePath
+            FROM InternshipApplications a JOIN StoredFiles sf ON sf.LogicalPath = a.ResumePath
+            WHERE sf.Sha256 = ?
+        ''', (sha256,))
+        cursor.execute("SELECT DISTINCT OwnerId FROM StoredFiles WHERE Sha256 = ?", (sha256,))
+        owners = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+    return owners
@@ -0,0 +1,88 @@
+# Per-internee task counters in InterneeProgress, so /internees/progress reads
+# one row per internee instead of aggregating every assignment ever made.
+#
+# Writers call refresh_progress() with the internees whose assignments they
+# changed, in the same transaction. It recounts just those internees through
+# IX_TaskAssignments_InterneeId, which is cheap and, unlike +/-1 deltas,
+# needs no knowledge of an assignment's previous status.
+
+COUNTS_SQL = '''
+    COUNT(ta.AssignmentId) AS Total,
+    ISNULL(SUM(CASE WHEN ta.Status = 'completed' THEN 1 ELSE 0 END), 0) AS Completed,
+    ISNULL(SUM(CASE WHEN ta.Status = 'pending' THEN 1 ELSE 0 END), 0) AS Pending,
+    ISNULL(SUM(CASE WHEN ta.Status = 'in_progress' THEN 1 ELSE 0 END), 0) AS InProgress
+'''
+
+MERGE_SQL = '''
+    MERGE InterneeProgress WITH (HOLDLOCK) AS p
+    USING ({source}) AS s ON p.InterneeId = s.InterneeId
+    WHEN MATCHED THEN UPDATE SET Total = s.Total, Completed = s.Completed, Pending = s.Pending,
+        InProgress = s.InProgress, UpdatedAt = GETDATE()
+    WHEN NOT MATCHED THEN INSERT (InterneeId, Total, Completed, Pending, InProgress)
+        VALUES (s.InterneeId, s.Total, s.Completed, s.Pending, s.InProgress);
+'''
+
+# Every internee's counters computed from scratch; also used by migration 6
+FULL_COUNTS_SQL = f'''
+    SELECT u.UserId AS InterneeId, {COUNTS_SQL}
+    FROM Users u LEFT JOIN TaskAssignments ta ON ta.InterneeId = u.UserId
+    WHERE u.Role = 'internee'
+    GROUP BY u.UserId
+'''
+
+# VALUES row constructors are limited to 1000 rows
+REFRESH_CHUNK = 1000
+
+
+def refresh_progress(cursor, internee_ids):
+    ids = sorted({i for i in internee_ids if i is not None})
+    for start in range(0, len(ids), REFRESH_CHUNK):
+        chunk = ids[start:start + REFRESH_CHUNK]
+        source = f'''
+            SELECT ids.InterneeId, {COUNTS_SQL}
+            FROM (VALUES {", ".join("(?)" for _ in chunk)}) AS ids(InterneeId)
+            LEFT JOIN TaskAssignments ta ON ta.InterneeId = ids.InterneeId
+            GROUP BY ids.InterneeId
+        '''
+        cursor.execute(MERGE_SQL.format(source=source), chunk)
+
+
+def affected_internees(cursor, select_sql, params=()):
+    # Internee ids from select_sql, for capturing who a delete will touch
+    cursor.execute(select_sql, params)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def rebuild_progress(conn, dry_run=False):
+    # Recomputes every counter from TaskAssignments, reports the rows that had
+    # drifted and, unless dry_run, rewrites them.
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT ISNULL(s.InterneeId, p.InterneeId),
+               p.Total, p.Completed, p.Pending, p.InProgress,
+               s.Total, s.Completed, s.Pending, s.InProgress
+        FROM ({FULL_COUNTS_SQL}) AS s
+        FULL OUTER JOIN InterneeProgress p ON p.InterneeId = s.InterneeId
+        WHERE s.InterneeId IS NULL OR p.InterneeId IS NULL
+           OR p.Total <> s.Total OR p.Completed <> s.Completed
+           OR p.Pending <> s.Pending OR p.InProgress <> s.InProgress
+    ''')
+    drift = []
+    for row in cursor.fetchall():
+        stored = None if row[1] is None else dict(zip(("total", "completed", "pending", "in_progress"), row[1:5]))
+        actual = None if row[5] is None else dict(zip(("total", "completed", "pending", "in_progress"), row[5:9]))
+        # No stored row for an internee with no assignments reads as zero anyway
+        if stored is None and actual["total"] == 0:
+            continue
+        drift.append({"internee_id": row[0], "stored": stored, "actual": actual})
+
+    if not dry_run:
+        cursor.execute(MERGE_SQL.format(source=FULL_COUNTS_SQL))
+        cursor.execute('''
+            DELETE FROM InterneeProgress
+            WHERE InterneeId NOT IN (SELECT UserId FROM Users WHERE Role = 'internee')
+        ''')
+        conn.commit()
+    else:
+        conn.rollback()
+    return {"drifted": len(drift), "fixed": 0 if dry_run else len(drift), "rows": drift}
@@ -0,0 +1,276 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+
+from starlette.concurrency import run_in_threadpool
+
+import serialization
+
+# Read-through cache for endpoint results, invalidated by tags such as
+# "internships:list" or "tasks:internee:42". Values are stored as JSON bytes so
+# the memory budget is exact and any backend can hold them; a cached result
+# comes back with datetimes as ISO strings, which response models parse and
+# plain JSON responses render exactly as before.
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode(value):
+    return serialization.dumps(value)
+
+
+class MemoryBackend:
+    # Per-process LRU bounded by the total size of the stored payloads
+    blocking = False
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (expires_at, payload, tags)
+        self._tags = {}  # tag -> set of keys
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, payload, ttl, tags):
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (time.monotonic() + ttl, payload, tags)
+            self.bytes += len(payload)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if self._remove(key):
+                        self.invalidations += 1
+
+    def _remove(self, key):
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self.bytes -= len(entry[1])
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._data),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class SQLiteBackend:
+    # Shared by every worker process on the host through one SQLite file, so
+    # an invalidation in one worker is seen by all. Stands in for a networked
+    # store such as Redis; same interface.
+    blocking = True
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        conn = self._conn()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, payload BLOB NOT NULL, expires_at REAL NOT NULL, size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entry_tags (tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key));
+            CREATE INDEX IF NOT EXISTS ix_entries_expires_at ON entries (expires_at);
+        ''')
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # a cache; losing it on a crash is fine
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute("SELECT payload, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] <= time.time():
+            self._delete(["key = ?"], (key,))
+            self.expirations += 1
+            return None
+        return row[0]
+
+    def set(self, key, payload, ttl, tags):
+        if len(payload) > self.max_bytes:
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, payload, expires_at, size) VALUES (?, ?, ?, ?)",
+                (key, payload, time.time() + ttl, len(payload)),
+            )
+            conn.execute("DELETE FROM entry_tags WHERE key = ?", (key,))
+            conn.executemany("INSERT OR IGNORE INTO entry_tags (tag, key) VALUES (?, ?)", [(t, key) for t in tags])
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                # Drop the entries closest to expiry first
+                rows = conn.execute("SELECT key, size FROM entries ORDER BY expires_at").fetchall()
+                victims = []
+                for victim, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    victims.append(victim)
+                    total -= size
+                conn.executemany("DELETE FROM entries WHERE key = ?", [(v,) for v in victims])
+                conn.executemany("DELETE FROM entry_tags WHERE key = ?", [(v,) for v in victims])
+                self.evictions += len(victims)
+
+    def invalidate(self, tags):
+        tags = list(tags)
+        if tags:
+            marks = ", ".join("?" * len(tags))
+            self.invalidations += self._delete(
+                [f"key IN (SELECT key FROM entry_tags WHERE tag IN ({marks}))"], tags
+            )
+
+    def _delete(self, conditions, params):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            keys = [row[0] for row in conn.execute(f"SELECT key FROM entries WHERE {' AND '.join(conditions)}", params)]
+            conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in keys])
+            conn.executemany("DELETE FROM entry_tags WHERE key = ?", [(k,) for k in keys])
+        return len(keys)
+
+    def stats(self):
+        entries, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            # Counted by this process only
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+def backend_from_url(url, max_bytes):
+    # "memory" or "sqlite:///path/to/cache.db"
+    if url == "memory":
+        return MemoryBackend(max_bytes)
+    if url.startswith("sqlite:///"):
+        path = url[len("sqlite:///"):]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return SQLiteBackend(path, max_bytes)
+    raise ValueError(f"Unknown result cache backend: {url}")
+
+
+class ResultCache:
+    def __init__(self, backend, ttls=None, default_ttl=30.0):
+        self.backend = backend
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        # Bumped by invalidate(); a load that raced with an invalidation of one
+        # of its tags is returned but not stored.
+        self._generations = {}
+        self.hits = {}
+        self.misses = {}
+
+    async def _call(self, fn, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    async def get_or_load(self, namespace, key, tags, load):
+        # `key` is anything JSON-serializable identifying the result within
+        # the namespace (user id, filters, page cursor...).
+        full_key = f"{namespace}:{json.dumps(key, sort_keys=True, default=_default)}"
+        payload = await self._call(self.backend.get, full_key)
+        if payload is not None:
+            self._count(self.hits, namespace)
+            return serialization.loads(payload)
+        self._count(self.misses, namespace)
+
+        tags = tuple(tags)
+        with self._lock:
+            before = [self._generations.get(t, 0) for t in tags]
+        value = await load()
+        with self._lock:
+            current = before == [self._generations.get(t, 0) for t in tags]
+        if current:
+            ttl = self.ttls.get(namespace, self.default_ttl)
+            await self._call(self.backend.set, full_key, encode(value), ttl, tags)
+        return value
+
+    async def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+        await self._call(self.backend.invalidate, tags)
+
+    def _count(self, counter, namespace):
+        with self._lock:
+            counter[namespace] = counter.get(namespace, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            hits = sum(self.hits.values())
+            misses = sum(self.misses.values())
+            per_endpoint = {
+                ns: {"hits": self.hits.get(ns, 0), "misses": self.misses.get(ns, 0),
+                     "ttl_seconds": self.ttls.get(ns, self.default_ttl)}
+                for ns in sorted(set(self.hits) | set(self.misses) | set(self.ttls))
+            }
+        stats = self.backend.stats()
+        stats.update({
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "endpoints": per_endpoint,
+        })
+        return stats
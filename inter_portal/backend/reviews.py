@@ -0,0 +1,64 @@
+# Batch application status changes. update_statuses runs on the DB executor
+# through AsyncConnection.run and leaves committing to the caller.
+
+APPLICATION_STATUSES = ("pending", "approved", "rejected")
+
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+NOT_FOUND = "not_found"
+INVALID_STATUS = "invalid_status"
+
+
+def update_statuses(cursor, changes, chunk_size=1000):
+    # Applies [(application_id, status)] with one UPDATE ... FROM against a
+    # staged temp table. The last change wins for a repeated id. Returns
+    # ({application_id: result}, [(application_id, internee_id, status)] for
+    # the rows that changed).
+    results = {}
+    staged = {}
+    for application_id, status in changes:
+        if status in APPLICATION_STATUSES:
+            staged[application_id] = status
+            results.pop(application_id, None)
+        else:
+            results[application_id] = INVALID_STATUS
+            staged.pop(application_id, None)
+    if not staged:
+        return results, []
+
+    cursor.execute("IF OBJECT_ID('tempdb..#StatusBatch') IS NOT NULL DROP TABLE #StatusBatch")
+    cursor.execute("CREATE TABLE #StatusBatch (ApplicationId INT PRIMARY KEY, Status VARCHAR(20) NOT NULL)")
+    try:
+        if hasattr(cursor, "fast_executemany"):
+            cursor.fast_executemany = True
+        rows = sorted(staged.items())
+        for i in range(0, len(rows), chunk_size):
+            cursor.executemany(
+                "INSERT INTO #StatusBatch (ApplicationId, Status) VALUES (?, ?)", rows[i:i + chunk_size]
+            )
+
+        cursor.execute('''
+            UPDATE a SET Status = b.Status
+            OUTPUT inserted.ApplicationId, inserted.InterneeId, inserted.Status
+            FROM InternshipApplications a JOIN #StatusBatch b ON b.ApplicationId = a.ApplicationId
+            WHERE a.Status <> b.Status
+        ''')
+        changed = [tuple(row) for row in cursor.fetchall()]
+        updated = {row[0] for row in changed}
+        cursor.execute('''
+            SELECT b.ApplicationId FROM #StatusBatch b
+            WHERE NOT EXISTS (SELECT 1 FROM InternshipApplications a WHERE a.ApplicationId = b.ApplicationId)
+        ''')
+        missing = {row[0] for row in cursor.fetchall()}
+    finally:
+        # Guarded so a failure that already lost the table is not masked
+        cursor.execute("IF OBJECT_ID('tempdb..#StatusBatch') IS NOT NULL DROP TABLE #StatusBatch")
+
+    for application_id in staged:
+        if application_id in updated:
+            results[application_id] = UPDATED
+        elif application_id in missing:
+            results[application_id] = NOT_FOUND
+        else:
+            results[application_id] = UNCHANGED
+    return results, changed
@@ -0,0 +1,268 @@
+import asyncio
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+
+# In-memory inverted index over internship and task titles and descriptions,
+# ranked with BM25. Title terms count TITLE_BOOST times, so a match in the
+# title outranks the same match buried in a description. The last query token
+# also matches as a prefix ("pyth" finds "python"), for search-as-you-type.
+#
+# Each posting holds its term's BM25 weight for that document, precomputed
+# against a reference average document length, so a query only multiplies by
+# idf and adds. The weights are recomputed when the average drifts more than
+# REWEIGH_DRIFT from the reference, and on every rebuild.
+#
+# The index lives in one process. Write endpoints keep it current through
+# LiveSearchIndex.upsert/remove; a periodic rebuild from the tables picks up
+# writes made by other workers.
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+TITLE_BOOST = 2
+MIN_PREFIX = 2
+MAX_EXPANSIONS = 50
+SNIPPET_CHARS = 160
+REWEIGH_DRIFT = 0.2
+
+INTERNSHIP = "internship"
+TASK = "task"
+
+INTERNSHIPS_SQL = "SELECT InternshipId, Title, Description, Status FROM Internships"
+TASKS_SQL = "SELECT TaskId, Title, Description, InternshipId FROM Tasks"
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def snippet(text):
+    text = " ".join((text or "").split())
+    return text if len(text) <= SNIPPET_CHARS else text[:SNIPPET_CHARS].rsplit(" ", 1)[0] + "…"
+
+
+class SearchIndex:
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}  # term -> {docno: BM25 term weight}
+        self._docnos = {}  # (kind, id) -> docno
+        self._docs = {}  # docno -> (kind, id, fields, {term: tf}, length)
+        self._next_docno = 0
+        self._total_length = 0
+        self._avg_length = None  # reference for the stored weights; None while bulk loading
+        self._vocab = []  # sorted terms, for prefix lookups; None while stale
+
+    def __len__(self):
+        return len(self._docs)
+
+    def upsert(self, kind, doc_id, title, description, **fields):
+        # Adds or replaces one document; `fields` come back with each hit
+        self.remove(kind, doc_id)
+        terms = Counter(tokenize(description))
+        for term in tokenize(title):
+            terms[term] += TITLE_BOOST
+        terms = dict(terms)
+        length = sum(terms.values())
+
+        docno = self._next_docno
+        self._next_docno += 1
+        fields.update(title=title, snippet=snippet(description))
+        self._docnos[(kind, doc_id)] = docno
+        self._docs[docno] = (kind, doc_id, fields, terms, length)
+        self._total_length += length
+        if self._avg_length == 0:
+            self._avg_length = length or None
+        norm = self._norm(length)
+        all_postings = self._postings
+        for term, tf in terms.items():
+            postings = all_postings.get(term)
+            if postings is None:
+                postings = all_postings[term] = {}
+                if self._vocab is not None:
+                    insort(self._vocab, term)
+            postings[docno] = tf if norm is None else tf * (self.k1 + 1) / (tf + norm)
+        if self._avg_length is not None and abs(self._total_length / len(self._docs) - self._avg_length) \
+                > REWEIGH_DRIFT * self._avg_length:
+            self.reweigh()
+
+    def remove(self, kind, doc_id):
+        docno = self._docnos.pop((kind, doc_id), None)
+        if docno is None:
+            return False
+        _, _, _, terms, length = self._docs.pop(docno)
+        self._total_length -= length
+        for term in terms:
+            postings = self._postings[term]
+            del postings[docno]
+            if not postings:
+                del self._postings[term]
+                if self._vocab is not None:
+                    del self._vocab[bisect_left(self._vocab, term)]
+        return True
+
+    def _norm(self, length):
+        if self._avg_length is None:
+            return None
+        return self.k1 * (1 - self.b + self.b * length / self._avg_length)
+
+    def reweigh(self):
+        # Recomputes every posting's weight against the current average length
+        self._avg_length = self._total_length / len(self._docs) if self._docs else 0
+        k1, postings = self.k1, self._postings
+        for docno, (_, _, _, terms, length) in self._docs.items():
+            norm = self._norm(length) if self._avg_length else k1
+            for term, tf in terms.items():
+                postings[term][docno] = tf * (k1 + 1) / (tf + norm)
+
+    def bulk_load(self):
+        # For loading many documents: postings keep raw term frequencies and
+        # the vocabulary is left unsorted until finish_bulk_load().
+        self._avg_length = None
+        self._vocab = None
+
+    def finish_bulk_load(self):
+        self.reweigh()
+
+    def _expand(self, prefix):
+        if self._vocab is None:
+            self._vocab = sorted(self._postings)
+        terms = []
+        i = bisect_left(self._vocab, prefix)
+        while i < len(self._vocab) and self._vocab[i].startswith(prefix) and len(terms) < MAX_EXPANSIONS:
+            terms.append(self._vocab[i])
+            i += 1
+        return terms
+
+    def search(self, query, kinds=None, allow=None, limit=20, offset=0, prefix=True):
+        # Returns (total, hits) for the page [offset, offset + limit). `allow`
+        # is an optional predicate on (kind, id, fields) applied before ranking.
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._docs:
+            return 0, []
+        if self._avg_length is None:
+            self.finish_bulk_load()
+        n = len(self._docs)
+
+        scores = {}
+        for position, token in enumerate(tokens):
+            if prefix and position == len(tokens) - 1 and len(token) >= MIN_PREFIX:
+                terms = self._expand(token)
+            else:
+                terms = [token] if token in self._postings else []
+            if len(terms) == 1:
+                matches = self._postings[terms[0]]
+                idf = math.log(1 + (n - len(matches) + 0.5) / (len(matches) + 0.5))
+                matches = {docno: idf * weight for docno, weight in matches.items()}
+            else:
+                # A token matching several terms by prefix counts once, at its best
+                matches = {}
+                for term in terms:
+                    postings = self._postings[term]
+                    idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for docno, weight in postings.items():
+                        score = idf * weight
+                        if score > matches.get(docno, 0.0):
+                            matches[docno] = score
+            if not scores:
+                scores = matches
+            else:
+                if len(matches) > len(scores):
+                    scores, matches = matches, scores
+                for docno, score in matches.items():
+                    scores[docno] = scores.get(docno, 0.0) + score
+
+        if kinds is not None or allow is not None:
+            docs = self._docs
+            scores = {
+                docno: score for docno, score in scores.items()
+                if (kinds is None or docs[docno][0] in kinds)
+                and (allow is None or allow(docs[docno][0], docs[docno][1], docs[docno][2]))
+            }
+        top = heapq.nlargest(offset + limit, scores, key=scores.__getitem__)
+        hits = []
+        for docno in top[offset:]:
+            kind, doc_id, fields, _, _ = self._docs[docno]
+            hits.append({"type": kind, "id": doc_id, "score": round(scores[docno], 4), **fields})
+        return len(scores), hits
+
+    def stats(self):
+        return {
+            "documents": len(self._docs),
+            "terms": len(self._postings),
+            "postings": sum(len(p) for p in self._postings.values()),
+        }
+
+
+def build_index(conn, batch_size=5000):
+    # Streams both tables with fetchmany so the full result sets are never
+    # held in memory at once. Runs off the event loop.
+    index = SearchIndex()
+    index.bulk_load()
+    cursor = conn.cursor()
+    cursor.execute(INTERNSHIPS_SQL)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for internship_id, title, description, status in rows:
+            index.upsert(INTERNSHIP, internship_id, title, description, status=status)
+    cursor.execute(TASKS_SQL)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for task_id, title, description, internship_id in rows:
+            index.upsert(TASK, task_id, title, description, internship_id=internship_id)
+    conn.rollback()
+    index.finish_bulk_load()
+    return index
+
+
+class LiveSearchIndex:
+    # The index the app serves from. A rebuild runs in the background and is
+    # swapped in when done; writes applied meanwhile are replayed onto the new
+    # index first, so none are lost. Call everything from the event loop.
+    def __init__(self):
+        self.index = SearchIndex()
+        self._pending = None
+        self._lock = None
+        self.rebuilds = 0
+        self.last_rebuild_seconds = None
+
+    def upsert(self, kind, doc_id, title, description, **fields):
+        self.index.upsert(kind, doc_id, title, description, **fields)
+        if self._pending is not None:
+            self._pending.append(("upsert", (kind, doc_id, title, description), fields))
+
+    def remove(self, kind, doc_id):
+        self.index.remove(kind, doc_id)
+        if self._pending is not None:
+            self._pending.append(("remove", (kind, doc_id), {}))
+
+    def search(self, *args, **kwargs):
+        return self.index.search(*args, **kwargs)
+
+    async def rebuild(self, build):
+        # `build` is a blocking callable returning a fresh SearchIndex
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            self._pending = []
+            started = loop.time()
+            try:
+                index = await loop.run_in_executor(None, build)
+                for op, args, fields in self._pending:
+                    getattr(index, op)(*args, **fields)
+                self.index = index
+            finally:
+                self._pending = None
+            self.rebuilds += 1
+            self.last_rebuild_seconds = round(loop.time() - started, 3)
+
+    def stats(self):
+        stats = self.index.stats()
+        stats.update(rebuilds=self.rebuilds, last_rebuild_seconds=self.last_rebuild_seconds)
+        return stats
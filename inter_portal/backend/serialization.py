@@ -0,0 +1,76 @@
+import json
+from datetime import date, datetime
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # falls back to the json module, same output
+    orjson = None
+
+# Fast path for list endpoints. Rows from our own queries are trusted, so
+# instead of building dicts by hand, validating them against the response
+# model and encoding the result, a mapper compiled once per query turns each
+# row into the final dict and FastJSONResponse encodes the list in one call.
+# The model is checked once, when the mapper is built: every required field
+# must be mapped, nothing else may be, and keys come out in model order, so
+# the JSON is what response_model would have produced.
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def loads(payload):
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+class FastJSONResponse(JSONResponse):
+    # Encodes datetimes natively; content is used as-is (no jsonable_encoder)
+    def render(self, content):
+        return dumps(content)
+
+
+def row_mapper(model=None, **columns):
+    # row_mapper(Internship, internship_id=0, title=1, created_at=5, ...)
+    # maps each field to a column index or to a callable taking the row.
+    # Fields of `model` left out must have a default, which is emitted as is.
+    names = list(columns)
+    defaults = {}
+    if model is not None:
+        unknown = [name for name in columns if name not in model.model_fields]
+        if unknown:
+            raise ValueError(f"{model.__name__} has no field(s) {', '.join(unknown)}")
+        names = []
+        for name, field in model.model_fields.items():
+            if name in columns:
+                names.append(name)
+            elif field.is_required():
+                raise ValueError(f"{model.__name__}.{name} is required but not mapped")
+            else:
+                names.append(name)
+                defaults[name] = field.get_default(call_default_factory=True)
+
+    namespace = {}
+    items = []
+    for name in names:
+        if name in defaults:
+            namespace[f"_default_{name}"] = defaults[name]
+            items.append(f"{name!r}: _default_{name}")
+        elif callable(columns[name]):
+            namespace[f"_compute_{name}"] = columns[name]
+            items.append(f"{name!r}: _compute_{name}(row)")
+        else:
+            items.append(f"{name!r}: row[{int(columns[name])}]")
+    return eval(f"lambda row: {{{', '.join(items)}}}", namespace)
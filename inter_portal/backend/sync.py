@@ -0,0 +1,147 @@
+from datetime import date
+
+from jobs import enqueue
+
+# Delta sync for the mobile client. Internships, Tasks, TaskAssignments and
+# InternshipApplications carry a ROWVERSION column (migration 10), which SQL
+# Server bumps on every insert and update, so the write endpoints need no
+# changes to be tracked. Deletes leave a row in Tombstones (written by
+# cascade.py, the only place these tables are deleted from).
+#
+# A watermark W means "every change below W has been seen". A sync reads the
+# rows and tombstones in [since, W) where W = MIN_ACTIVE_ROWVERSION(): every
+# version below that is committed, so nothing still in flight is skipped.
+# Tombstones are purged after a retention period; a client whose watermark
+# is older than the newest purged tombstone gets a full snapshot instead
+# (reset), as does one with no watermark.
+
+PURGE_TOMBSTONES = "sync.purge_tombstones"
+
+# rowversion compared with a BIGINT parameter, sargably
+ROWVER_PARAM = "CAST(CAST(? AS BIGINT) AS BINARY(8))"
+
+
+def record_deletes(cursor, select_sql, params=()):
+    # select_sql yields (TableName, RowId, InterneeId) for rows about to be
+    # deleted. RowId is the id the list endpoints expose (TaskId for an
+    # assignment); InterneeId scopes a tombstone to that internee.
+    cursor.execute(f"INSERT INTO Tombstones (TableName, RowId, InterneeId) {select_sql}", params)
+
+
+def watermark(cursor):
+    cursor.execute("SELECT CAST(MIN_ACTIVE_ROWVERSION() AS BIGINT)")
+    return cursor.fetchone()[0]
+
+
+def _deleted(cursor, table, since, upper, internee_id=None):
+    scope = " AND InterneeId = ?" if internee_id is not None else ""
+    cursor.execute(f'''
+        SELECT RowId FROM Tombstones
+        WHERE RowVer >= {ROWVER_PARAM} AND RowVer < {ROWVER_PARAM} AND TableName = ?{scope}
+    ''', [since, upper, table] + ([internee_id] if internee_id is not None else []))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def internship_changes(cursor, since, upper, available_only):
+    # (rows, deleted ids); rows have INTERNSHIP_ROW's columns. With
+    # available_only, an internship that stopped being available is deleted.
+    cursor.execute(f'''
+        SELECT InternshipId, Title, Description, Status, CreatedBy, CreatedAt
+        FROM Internships
+        WHERE RowVer >= {ROWVER_PARAM} AND RowVer < {ROWVER_PARAM}
+    ''', (since, upper))
+    rows = cursor.fetchall()
+    deleted = _deleted(cursor, "Internships", since, upper) if since else []
+    if available_only:
+        if since:
+            deleted += [row[0] for row in rows if row[3] != "available"]
+        rows = [row for row in rows if row[3] == "available"]
+    return rows, deleted
+
+
+def assigned_task_changes(cursor, since, upper, internee_id):
+    # Rows have the columns of /tasks/assigned (ASSIGNED_TASK_ROW); a task
+    # counts as changed when its assignment or the task itself changed
+    cursor.execute(f'''
+        SELECT t.TaskId, t.Title, t.Description, t.InternshipId, t.DueDate, t.CreatedAt,
+               ta.Status, ta.SubmissionPath, ta.AssignmentId, sf.Sha256, fb.Derivatives
+        FROM TaskAssignments ta
+        INNER JOIN Tasks t ON t.TaskId = ta.TaskId
+        LEFT JOIN StoredFiles sf ON sf.LogicalPath = ta.SubmissionPath
+        LEFT JOIN FileBlobs fb ON fb.Sha256 = sf.Sha256
+        WHERE ta.InterneeId = ?
+          AND (ta.RowVer >= {ROWVER_PARAM} OR t.RowVer >= {ROWVER_PARAM})
+          AND ta.RowVer < {ROWVER_PARAM} AND t.RowVer < {ROWVER_PARAM}
+    ''', (internee_id, since, since, upper, upper))
+    rows = cursor.fetchall()
+    deleted = _deleted(cursor, "TaskAssignments", since, upper, internee_id) if since else []
+    return rows, deleted
+
+
+def application_changes(cursor, since, upper):
+    # Rows have the columns of /applications (APPLICATION_ROW); renaming an
+    # internship changes its applications' internship_title
+    cursor.execute(f'''
+        SELECT a.ApplicationId, a.InternshipId, a.InterneeId, a.Status, a.AppliedAt,
+               i.Title, u.Username, u.Email,
+               a.Name, a.UniversityName, a.ResumePath, a.Degree, a.Semester, sf.Sha256, fb.Derivatives
+        FROM InternshipApplications a
+        JOIN Internships i ON a.InternshipId = i.InternshipId
+        JOIN Users u ON a.InterneeId = u.UserId
+        LEFT JOIN StoredFiles sf ON sf.LogicalPath = a.ResumePath
+        LEFT JOIN FileBlobs fb ON fb.Sha256 = sf.Sha256
+        WHERE a.ApplicationId IN (
+                SELECT ApplicationId FROM InternshipApplications WHERE RowVer >= {ROWVER_PARAM}
+                UNION
+                SELECT c.ApplicationId FROM Internships p
+                JOIN InternshipApplications c ON c.InternshipId = p.InternshipId
+                WHERE p.RowVer >= {ROWVER_PARAM})
+          AND a.RowVer < {ROWVER_PARAM} AND i.RowVer < {ROWVER_PARAM}
+    ''', (since, since, upper, upper))
+    rows = cursor.fetchall()
+    deleted = _deleted(cursor, "InternshipApplications", since, upper) if since else []
+    return rows, deleted
+
+
+def changes(cursor, role, user_id, since):
+    # {"watermark", "reset", collection: (rows, deleted ids)} for the user's
+    # lists: available internships and assigned tasks for internees, all
+    # internships and applications for admins
+    upper = watermark(cursor)
+    cursor.execute("SELECT PurgedThrough FROM SyncHorizon WHERE Id = 1")
+    row = cursor.fetchone()
+    reset = not since or since > upper or (row is not None and since <= row[0])
+    if reset:
+        since = 0
+    result = {"watermark": upper, "reset": reset}
+    if role == "admin":
+        result["internships"] = internship_changes(cursor, since, upper, available_only=False)
+        result["applications"] = application_changes(cursor, since, upper)
+    else:
+        result["internships"] = internship_changes(cursor, since, upper, available_only=True)
+        result["tasks"] = assigned_task_changes(cursor, since, upper, user_id)
+    return result
+
+
+def purge_tombstones(cursor, retention_seconds):
+    # Drops tombstones older than the retention period and moves the horizon
+    # past them; returns how many went
+    cursor.execute('''
+        SELECT CAST(MAX(RowVer) AS BIGINT) FROM Tombstones
+        WHERE DeletedAt < DATEADD(second, -?, GETDATE())
+    ''', (retention_seconds,))
+    purged_through = cursor.fetchone()[0]
+    if purged_through is None:
+        return 0
+    cursor.execute("UPDATE SyncHorizon SET PurgedThrough = ? WHERE Id = 1 AND PurgedThrough < ?",
+                   (purged_through, purged_through))
+    cursor.execute(f"DELETE FROM Tombstones WHERE RowVer <= {ROWVER_PARAM}", (purged_through,))
+    return cursor.rowcount
+
+
+def schedule_tombstone_purge(cursor, day=None, delay=0):
+    # One purge job per day however many instances start; the job queues
+    # the next day's
+    day = day or date.today()
+    return enqueue(cursor, PURGE_TOMBSTONES, {"day": day.isoformat()}, priority=-10,
+                   idempotency_key=f"{PURGE_TOMBSTONES}:{day.isoformat()}", delay=delay)
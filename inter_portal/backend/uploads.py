@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# Size limits per upload kind, in bytes
+UPLOAD_LIMITS = {
+    "submission": int(os.getenv("UPLOAD_MAX_SUBMISSION_BYTES", str(50 * 1024 * 1024))),
+    "resume": int(os.getenv("UPLOAD_MAX_RESUME_BYTES", str(10 * 1024 * 1024))),
+}
+# Room for multipart framing and the small text fields that accompany a file
+FORM_OVERHEAD_BYTES = 64 * 1024
+FLUSH_BYTES = 1024 * 1024
+
+# File writes and fsyncs run here, never on the event loop
+io_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("UPLOAD_IO_WORKERS", "4")), thread_name_prefix="upload-io"
+)
+
+# path is a durable temp file; the caller moves it into place (see blobstore)
+ReceivedUpload = namedtuple("ReceivedUpload", "path size sha256 filename content_type")
+
+
+class UploadRejected(Exception):
+    pass
+
+
+class UploadTooLarge(UploadRejected):
+    pass
+
+
+def safe_filename(filename):
+    # Keep only the final path component; clients control this value
+    name = Path(filename.replace("\\", "/")).name.strip()
+    return name or "upload"
+
+
+class _Sink:
+    # Temp file + running checksum for the single file part of a form
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.file = open(tmp_path, "wb")
+        self.hasher = hashlib.sha256()
+
+    def write(self, data):
+        self.hasher.update(data)
+        self.file.write(data)
+
+    def finish(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+    def discard(self):
+        try:
+            self.file.close()
+        except Exception:
+            pass
+        try:
+            os.unlink(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+async def receive_upload(request, file_field, tmp_dir, max_bytes, allowed_types=None):
+    # Streams a multipart/form-data body: text fields are collected in memory
+    # (bounded), the file part goes chunk by chunk to a temp file in tmp_dir
+    # and is fsynced. Returns (fields, ReceivedUpload); nothing is left on
+    # disk if it raises.
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadRejected("Expected a multipart/form-data body")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + FORM_OVERHEAD_BYTES:
+        raise UploadTooLarge(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+
+    loop = asyncio.get_running_loop()
+    tmp_dir = Path(tmp_dir)
+    await loop.run_in_executor(io_executor, lambda: tmp_dir.mkdir(parents=True, exist_ok=True))
+
+    state = {
+        "header_field": b"", "header_value": b"", "headers": {},
+        "name": None, "filename": None, "part_type": None,
+        "value": bytearray(), "form_bytes": 0, "file_bytes": 0,
+    }
+    fields = {}
+    pending = bytearray()
+    sink = None
+    upload_meta = {}
+    errors = []
+
+    def on_part_begin():
+        state["headers"] = {}
+        state["value"] = bytearray()
+
+    def on_header_field(data, start, end):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["header_field"].lower()] = state["header_value"]
+        state["header_field"] = b""
+        state["header_value"] = b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        state["name"] = disposition.get(b"name", b"").decode("utf-8", "replace")
+        filename = disposition.get(b"filename")
+        state["filename"] = filename.decode("utf-8", "replace") if filename is not None else None
+        state["part_type"] = state["headers"].get(b"content-type", b"application/octet-stream").decode("latin-1")
+        if state["name"] == file_field and state["filename"] is not None:
+            if upload_meta:
+                errors.append(UploadRejected(f"Only one '{file_field}' file is accepted"))
+            elif allowed_types and state["part_type"] not in allowed_types:
+                errors.append(UploadRejected(f"File must be one of: {', '.join(sorted(allowed_types))}"))
+            upload_meta.update(filename=safe_filename(state["filename"]), content_type=state["part_type"])
+
+    def on_part_data(data, start, end):
+        if state["name"] == file_field and state["filename"] is not None:
+            state["file_bytes"] += end - start
+            if state["file_bytes"] > max_bytes:
+                errors.append(UploadTooLarge(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit"))
+                return
+            pending.extend(data[start:end])
+        else:
+            state["form_bytes"] += end - start
+            if state["form_bytes"] > FORM_OVERHEAD_BYTES:
+                errors.append(UploadRejected("Form fields are too large"))
+                return
+            state["value"].extend(data[start:end])
+
+    def on_part_end():
+        if not (state["name"] == file_field and state["filename"] is not None):
+            fields[state["name"]] = state["value"].decode("utf-8", "replace")
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    tmp_path = tmp_dir / f"{uuid.uuid4().hex}.part"
+    try:
+        sink = await loop.run_in_executor(io_executor, _Sink, tmp_path)
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if errors:
+                raise errors[0]
+            if len(pending) >= FLUSH_BYTES:
+                data = bytes(pending)
+                pending.clear()
+                # Awaiting the write before reading on is the backpressure
+                await loop.run_in_executor(io_executor, sink.write, data)
+        parser.finalize()
+        if errors:
+            raise errors[0]
+        if not upload_meta:
+            raise UploadRejected(f"Missing '{file_field}' file")
+        if pending:
+            await loop.run_in_executor(io_executor, sink.write, bytes(pending))
+            pending.clear()
+        await loop.run_in_executor(io_executor, sink.finish)
+    except BaseException:
+        if sink is not None:
+            await asyncio.shield(loop.run_in_executor(io_executor, sink.discard))
+        raise
+
+    return fields, ReceivedUpload(
+        tmp_path, state["file_bytes"], sink.hasher.hexdigest(),
+        upload_meta["filename"], upload_meta["content_type"],
+    )
@@ -156,7 +156,10 @@ class _AdminApplicationsScreenState extends State<AdminApplicationsScreen> {
                                   const SizedBox(width: 8),
                                   TextButton(
                                     onPressed: () async {
-                                      final url = '${InternshipService.baseUrl}/${application['resumepath'] ?? ''}';
+                                      // Signed, short-lived link; no auth header needed
+                                      final url = application['resume_url'] != null
+                                          ? '${InternshipService.baseUrl}${application['resume_url']}'
+                                          : '${InternshipService.baseUrl}/${application['resumepath'] ?? ''}';
                                       if (await canLaunchUrl(Uri.parse(url))) {
                                         await launchUrl(Uri.parse(url));
                                       } else {